@@ -0,0 +1 @@
+"""End-to-end latency benchmark: mock backends + gesimuleerde Pi clients (zie README.md)."""
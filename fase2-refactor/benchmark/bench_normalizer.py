@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: TTS text normalizer (huidig vs de oude multi-pass versie).
+
+normalize_for_tts draait per zin op het kritieke pad vóór elke Fish request.
+Dit script normaliseert een corpus van LLM outputs per zin (zoals de TTS
+pipeline dat doet) met beide implementaties en rapporteert µs per zin
+(p50/p95), de speedup en de zinnen waar de uitkomst verschilt (nieuwe
+regels voor tijden, bedragen, eenheden en rangtelwoorden). Vooraf wordt
+EXPECTED gecontroleerd; bij een afwijking stopt het script met exit code 1.
+
+Corpus: standaard een ingebouwde set NerdCarX antwoorden. Met --corpus een
+eigen bestand: tekst (één output per regel), JSONL (veld text/response/
+content) of een verbose debug log (debug.log_file, regels "└─ response:").
+
+Gebruik (vanuit fase2-refactor/):
+    python -m benchmark.bench_normalizer
+    python -m benchmark.bench_normalizer --corpus logs/conversation.log --rounds 50
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from num2words import num2words
+
+from .stats import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "orchestrator"))
+
+from app.utils.text_normalization import (  # noqa: E402
+    NL_LETTER_SOUNDS,
+    SKIP_ACRONYMS,
+    TextNormalizer,
+    number_to_words,
+    split_into_sentences,
+)
+
+DEFAULT_CORPUS = [
+    "Hoi! Ik ben NerdCarX, een kleine robotauto. Ik kan rijden, kijken en praten. Wat wil je vandaag samen doen?",
+    "Oké, ik ga slapen. Zeg 'hey Jarvis' als je me weer nodig hebt.",
+    "Ik zie een bureau met een laptop, twee koffiemokken en een plant (waarschijnlijk een cactus).",
+    "Ik zie 3 mensen en 1 hond in de kamer. De hond ligt op een rode mat.",
+    "Het is nu 14:35. Over 25 minuten begint je meeting.",
+    "De batterij staat op 78%. Dat is genoeg voor ongeveer 2.5 uur rijden.",
+    "Ik draai op een Raspberry Pi 5 met 8 GB geheugen, en mijn brein draait op een GPU in de desktop.",
+    "De LLM draait in Docker, de STT gebruikt Voxtral en de TTS is Fish Audio.",
+    "Dat kost €3,50 in de winkel, of $4 online.",
+    "Ik kan maximaal 5 km/u rijden. Dat is ongeveer 1.4 meter per seconde.",
+    "Het is vandaag 21°C buiten, dus lekker weer om naar buiten te gaan!",
+    "Dit is de 3e keer dat je dat vraagt. Geen probleem hoor!",
+    "Sorry, dat begreep ik niet helemaal. Kun je het nog een keer zeggen?",
+    "De API gaf een fout terug (code 503). Ik probeer het zo opnieuw.",
+    "Python is een programmeertaal. Ik ben er zelf ook in geschreven!",
+    "Goedemorgen! Je hebt om 09:00 een afspraak en om 12:30 lunch.",
+    "In 1969 landde de eerste mens op de maan. Dat was een reis van 384400 km.",
+    "Ik ben blij! Ik ben een beetje moe. Ik ben nieuwsgierig wat je gaat doen.",
+    "Een OK teken en een TV aan de muur, verder zie ik niets bijzonders.",
+    "Vooruit rijden gaat met 20 cm per stap; ik heb net 12 stappen gedaan.",
+    "De route is 3,5 km en de batterij zakt 6,5% per uur.",
+    "Dat kost 10 m.b.t. de rest, dus om 24:00 ben ik klaar.",
+]
+
+# Vaste verwachtingen voor de regels (input → output van de TextNormalizer)
+EXPECTED = {
+    "Het is nu 14:35.": "Het is nu veertien uur vijfendertig.",
+    "Om 24:00 ga ik slapen.": "Om vierentwintig uur ga ik slapen.",
+    "Dat kost €3,50.": "Dat kost drie euro vijftig.",
+    "Nog 1.5 meter.": "Nog één komma vijf meter.",
+    "Nog 3,5 km.": "Nog drie komma vijf kilometer.",
+    "De batterij zakt 6,5%.": "De batterij zakt zes komma vijf procent.",
+    "Het is 10 m.": "Het is tien meter.",
+    "Dat kost 10 m.b.t. de rest.": "Dat kost tien m.b.t. de rest.",
+    "Dit is de 3e keer.": "Dit is de derde keer.",
+}
+
+
+# ----------------------------------------------------------------------
+# Oude implementatie (vóór TextNormalizer), bevroren als referentie
+# ----------------------------------------------------------------------
+
+LEGACY_WORD_REPLACEMENTS = {
+    r'\bDocker\b': 'dokker',
+    r'\bPython\b': 'paiton',
+    r'\bdesktop\b': 'desktob',
+}
+
+
+def legacy_normalize_for_tts(text: str) -> str:
+    text = re.sub(r'\s*\(', ', ', text, count=1)
+    text = re.sub(r'[()]', '', text)
+
+    def spell_acronym(match):
+        acronym = match.group(0)
+        if acronym in SKIP_ACRONYMS:
+            return acronym
+        return '-'.join(NL_LETTER_SOUNDS.get(c, c) for c in acronym)
+
+    text = re.sub(r'\b[A-Z]{2,}\b', spell_acronym, text)
+
+    for pattern, replacement in LEGACY_WORD_REPLACEMENTS.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+
+    def replace_number(match):
+        num_str = match.group(0)
+        try:
+            if '.' in num_str:
+                parts = num_str.split('.')
+                whole = num2words(int(parts[0]), lang='nl')
+                decimal = ' '.join(num2words(int(d), lang='nl') for d in parts[1])
+                return f"{whole} komma {decimal}"
+            return num2words(int(num_str), lang='nl')
+        except (ValueError, OverflowError):
+            return num_str
+
+    return re.sub(r'\b\d+(?:\.\d+)?\b', replace_number, text)
+
+
+# ----------------------------------------------------------------------
+
+
+def load_corpus(path: str) -> list[str]:
+    """LLM outputs uit een tekst, JSONL of verbose debug log bestand."""
+    outputs = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "└─ response:" in line:
+            outputs.append(line.split("└─ response:", 1)[1].strip())
+        elif line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            text = record.get("text") or record.get("response") or record.get("content")
+            if isinstance(text, str):
+                outputs.append(text)
+        elif not line.startswith(("─", "[")):
+            outputs.append(line)
+    return outputs
+
+
+def time_per_sentence(normalize: Callable[[str], str], sentences: list[str], rounds: int) -> list[float]:
+    """µs per zin, beste van `rounds` rondes (minst verstoord door de rest van het systeem)."""
+    best = [float("inf")] * len(sentences)
+    for _ in range(rounds):
+        for i, sentence in enumerate(sentences):
+            t0 = time.perf_counter()
+            normalize(sentence)
+            best[i] = min(best[i], (time.perf_counter() - t0) * 1e6)
+    return best
+
+
+def check_expected(normalizer: TextNormalizer) -> list[tuple[str, str, str]]:
+    """(input, verwacht, uitkomst) voor elke EXPECTED regel die afwijkt."""
+    results = [(text, expected, normalizer.normalize(text)) for text, expected in EXPECTED.items()]
+    return [result for result in results if result[1] != result[2]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TTS text normalizer micro-benchmark")
+    parser.add_argument("--corpus", help="LLM outputs: tekst, JSONL of verbose debug log")
+    parser.add_argument("--rounds", type=int, default=20, help="Herhalingen per zin (beste telt)")
+    parser.add_argument("--diffs", type=int, default=10, help="Aantal verschillen om te tonen")
+    args = parser.parse_args()
+
+    outputs = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    sentences = [sentence for output in outputs for sentence in split_into_sentences(output)]
+    if not sentences:
+        raise SystemExit("Geen zinnen in het corpus")
+
+    normalizer = TextNormalizer()
+    failures = check_expected(normalizer)
+    if failures:
+        for text, expected, actual in failures:
+            print(f"  ❌ {text}\n    verwacht: {expected}\n    uitkomst: {actual}")
+        raise SystemExit(1)
+
+    # Koud: eerste keer, zonder getallen in de memo cache (compile telt apart)
+    number_to_words.cache_clear()
+    t0 = time.perf_counter()
+    TextNormalizer()
+    compile_us = (time.perf_counter() - t0) * 1e6
+    cold = [0.0] * len(sentences)
+    for i, sentence in enumerate(sentences):
+        t0 = time.perf_counter()
+        normalizer.normalize(sentence)
+        cold[i] = (time.perf_counter() - t0) * 1e6
+
+    results = {
+        "legacy": time_per_sentence(legacy_normalize_for_tts, sentences, args.rounds),
+        "cold": cold,
+        "warm": time_per_sentence(normalizer.normalize, sentences, args.rounds),
+    }
+
+    print(f"\n{len(outputs)} outputs, {len(sentences)} zinnen, {args.rounds} rondes  "
+          f"(compile {compile_us:.0f} µs, eenmalig)")
+    print(f"  {'':<10}{'p50':>8}{'p95':>8}{'max':>8}{'totaal':>10}  (µs per zin)")
+    for label, values in results.items():
+        print(f"  {label:<10}{percentile(values, 50):>8.1f}{percentile(values, 95):>8.1f}"
+              f"{max(values):>8.1f}{sum(values):>10.0f}")
+    speedup = sum(results["legacy"]) / sum(results["warm"])
+    print(f"  speedup (legacy / warm): {speedup:.1f}x")
+    info = number_to_words.cache_info()
+    print(f"  number memo: {info.currsize} getallen, hits {info.hits}, misses {info.misses}")
+
+    diffs = [(s, legacy_normalize_for_tts(s), normalizer.normalize(s)) for s in sentences]
+    diffs = [d for d in diffs if d[1] != d[2]]
+    print(f"\n{len(diffs)} zinnen anders genormaliseerd (nieuwe regels)")
+    for sentence, old, new in diffs[:args.diffs]:
+        print(f"  - {sentence}\n    oud:   {old}\n    nieuw: {new}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
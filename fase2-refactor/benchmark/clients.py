@@ -0,0 +1,408 @@
+"""
+Gesimuleerde Pi clients (WebSocket) en REST clients.
+
+Alle latencies worden gemeten vanaf het moment dat de upload klaar is
+(= de gebruiker is uitgesproken), zoals de Pi dat ervaart:
+
+- first_audio_ms: eerste audio chunk / SSE audio event binnen
+- response_ms:    tekst response binnen
+- turn_ms:        laatste audio chunk binnen (einde turn)
+- interrupt_ms:   barge-in verstuurd → bevestiging (turn gecanceld op de desktop)
+"""
+import asyncio
+import base64
+import io
+import json
+import random
+import struct
+import time
+import uuid
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import websockets
+
+# Binary frame header, zie orchestrator/app/websocket/protocol.py
+BINARY_MAGIC = b"NX"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct(">2sBBBBIHH")
+FRAME_AUDIO_PROCESS = 1
+FRAME_AUDIO_CHUNK = 2
+FRAME_AUDIO_FRAME = 3
+FLAG_IS_LAST = 1
+CODEC_WAV = 0
+CODEC_PCM_S16LE = 1
+
+TURN_TIMEOUT = 60.0
+
+
+@dataclass
+class Utterance:
+    """Een opgenomen (of gegenereerde) zin om te versturen."""
+    name: str
+    wav: bytes
+    pcm: bytes
+    sample_rate: int
+    channels: int
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.pcm) / (2 * self.channels * self.sample_rate)
+
+    @classmethod
+    def from_wav(cls, name: str, data: bytes) -> "Utterance":
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"{name}: alleen 16-bit WAV wordt ondersteund")
+            return cls(name, data, wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+
+    def variant(self, n: int) -> "Utterance":
+        """
+        Zelfde audio met één sample iets aangepast (1 LSB).
+
+        Echte spraak is nooit bit-identiek; zonder variant zou de STT cache
+        van de orchestrator elke herhaling gratis beantwoorden.
+        """
+        if len(self.pcm) < 2:
+            return self
+        last = (struct.unpack_from("<h", self.pcm, len(self.pcm) - 2)[0] + n) % 32768
+        pcm = self.pcm[:-2] + struct.pack("<h", last)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm)
+        return Utterance(self.name, buffer.getvalue(), pcm, self.sample_rate, self.channels)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Utterance":
+        return cls.from_wav(path.name, path.read_bytes())
+
+    @classmethod
+    def synthetic(cls, duration_s: float = 2.0, sample_rate: int = 16000) -> "Utterance":
+        """Ruis-achtig signaal als er geen opnames zijn (de STT mock luistert toch niet)."""
+        samples = int(duration_s * sample_rate)
+        pcm = b"".join(struct.pack("<h", (i * 7919) % 2000 - 1000) for i in range(samples))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(pcm)
+        return cls("synthetic", buffer.getvalue(), pcm, sample_rate, 1)
+
+
+@dataclass
+class TurnResult:
+    """Metingen van één turn."""
+    transport: str
+    client: str
+    ok: bool
+    upload_ms: float = 0.0
+    first_audio_ms: Optional[float] = None
+    response_ms: Optional[float] = None
+    turn_ms: Optional[float] = None
+    interrupt_ms: Optional[float] = None
+    audio_chunks: int = 0
+    error: str = ""
+
+
+def _ms_since(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000
+
+
+def _binary_frame(frame_type: int, codec: int, conv_id: str, meta: dict, audio: bytes, index: int = 0) -> bytes:
+    conv = conv_id.encode("utf-8")
+    meta_bytes = json.dumps(meta).encode("utf-8") if meta else b""
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, frame_type, 0, codec, index, len(conv), len(meta_bytes)
+    )
+    return header + conv + meta_bytes + audio
+
+
+def _is_last_chunk(frame: bytes) -> bool:
+    magic, version, frame_type, flags, *_ = BINARY_HEADER.unpack_from(frame)
+    return frame_type == FRAME_AUDIO_CHUNK and bool(flags & FLAG_IS_LAST)
+
+
+class SimulatedPi:
+    """
+    Eén Pi over /ws: hello negotiation, daarna turns na elkaar.
+
+    upload:
+        "json"   - audio_process met base64 WAV
+        "binary" - audio_process als binary frame
+        "stream" - audio_start / audio_frame (20ms PCM) / audio_end
+    realtime: frames in het tempo van de microfoon versturen (alleen "stream")
+    barge_in_rate: fractie van de turns die na de eerste audio chunk onderbroken wordt
+    """
+
+    def __init__(
+        self,
+        url: str,
+        name: str,
+        upload: str = "binary",
+        realtime: bool = False,
+        expect_audio: bool = True,
+        frame_ms: int = 20,
+        unique_audio: bool = True,
+        barge_in_rate: float = 0.0
+    ):
+        self.url = url.rstrip("/")
+        self.name = name
+        self.conversation_id = f"bench-{name}"
+        self.upload = upload
+        self.realtime = realtime
+        self.expect_audio = expect_audio
+        self.frame_ms = frame_ms
+        self.unique_audio = unique_audio
+        self.barge_in_rate = barge_in_rate
+        self._random = random.Random(name)  # Reproduceerbaar per client
+        self.binary_audio = False
+
+    async def run(self, utterances: list[Utterance], turns: int, think_s: float) -> list[TurnResult]:
+        results = []
+        try:
+            async with websockets.connect(
+                f"{self.url}/ws?conversation_id={self.conversation_id}", max_size=None
+            ) as ws:
+                await self._hello(ws)
+                for turn in range(turns):
+                    utterance = pick_utterance(utterances, turn, self.unique_audio)
+                    results.append(await self._turn(ws, utterance))
+                    if think_s:
+                        await asyncio.sleep(think_s)
+        except Exception as e:
+            results.append(TurnResult("ws", self.name, ok=False, error=f"connect: {e}"))
+        return results
+
+    async def _hello(self, ws) -> None:
+        await ws.send(json.dumps({
+            "type": "hello",
+            "conversation_id": self.conversation_id,
+            "timestamp": time.time(),
+            "payload": {"binary_audio": self.upload != "json", "binary_versions": [1], "codecs": ["wav"]}
+        }))
+        reply = json.loads(await asyncio.wait_for(ws.recv(), timeout=5))
+        self.binary_audio = bool(reply.get("payload", {}).get("binary_audio"))
+
+    async def _function_result(self, ws, request: dict) -> None:
+        payload = request.get("payload", {})
+        await ws.send(json.dumps({
+            "type": "function_result",
+            "conversation_id": self.conversation_id,
+            "timestamp": time.time(),
+            "payload": {"name": payload.get("name", ""), "request_id": payload.get("request_id", ""), "result": "ok"}
+        }))
+
+    async def _turn(self, ws, utterance: Utterance) -> TurnResult:
+        result = TurnResult("ws", self.name, ok=False)
+        t0 = time.perf_counter()
+        await self._upload(ws, utterance)
+        result.upload_ms = _ms_since(t0)
+
+        t_end = time.perf_counter()
+        deadline = t_end + TURN_TIMEOUT
+        t_interrupt: Optional[float] = None
+        try:
+            while True:
+                raw = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.perf_counter()))
+                if isinstance(raw, bytes):
+                    is_audio, is_last = True, _is_last_chunk(raw)
+                else:
+                    message = json.loads(raw)
+                    kind = message.get("type")
+                    if kind == "error":
+                        result.error = message.get("payload", {}).get("message", "error")
+                        return result
+                    if kind == "function_request":
+                        # Zoals de Pi: remote tool (OLED, sleep) direct bevestigen
+                        await self._function_result(ws, message)
+                        continue
+                    if kind == "interrupt":
+                        result.interrupt_ms = _ms_since(t_interrupt)
+                        break
+                    if kind == "response" and result.response_ms is None:
+                        result.response_ms = _ms_since(t_end)
+                        if not self.expect_audio:
+                            break
+                    is_audio = kind == "audio_chunk"
+                    is_last = is_audio and message.get("payload", {}).get("is_last", False)
+
+                if is_audio and t_interrupt is None:
+                    result.audio_chunks += 1
+                    if result.first_audio_ms is None:
+                        result.first_audio_ms = _ms_since(t_end)
+                        if self._random.random() < self.barge_in_rate:
+                            # Gebruiker praat door de eerste zin heen
+                            t_interrupt = time.perf_counter()
+                            await ws.send(json.dumps({
+                                "type": "interrupt",
+                                "conversation_id": self.conversation_id,
+                                "timestamp": time.time(),
+                                "payload": {"played_index": 0}
+                            }))
+                            continue
+                    if is_last:
+                        break
+        except asyncio.TimeoutError:
+            result.error = "timeout"
+            return result
+
+        if t_interrupt is None:
+            result.turn_ms = _ms_since(t_end)
+        result.ok = True
+        return result
+
+    async def _upload(self, ws, utterance: Utterance) -> None:
+        if self.upload == "stream":
+            await self._stream_upload(ws, utterance)
+        elif self.upload == "binary" and self.binary_audio:
+            await ws.send(_binary_frame(
+                FRAME_AUDIO_PROCESS, CODEC_WAV, self.conversation_id, {"language": "nl"}, utterance.wav
+            ))
+        else:
+            await ws.send(json.dumps({
+                "type": "audio_process",
+                "conversation_id": self.conversation_id,
+                "timestamp": time.time(),
+                "payload": {"audio_base64": base64.b64encode(utterance.wav).decode(), "language": "nl"}
+            }))
+
+    async def _stream_upload(self, ws, utterance: Utterance) -> None:
+        stream_id = uuid.uuid4().hex[:8]
+        await ws.send(json.dumps({
+            "type": "audio_start",
+            "conversation_id": self.conversation_id,
+            "payload": {
+                "stream_id": stream_id,
+                "sample_rate": utterance.sample_rate,
+                "channels": utterance.channels,
+                "language": "nl"
+            }
+        }))
+
+        frame_bytes = int(utterance.sample_rate * utterance.channels * 2 * self.frame_ms / 1000)
+        for index, offset in enumerate(range(0, len(utterance.pcm), frame_bytes)):
+            pcm = utterance.pcm[offset:offset + frame_bytes]
+            if self.binary_audio:
+                await ws.send(_binary_frame(
+                    FRAME_AUDIO_FRAME, CODEC_PCM_S16LE, self.conversation_id,
+                    {"stream_id": stream_id}, pcm, index
+                ))
+            else:
+                await ws.send(json.dumps({
+                    "type": "audio_frame",
+                    "conversation_id": self.conversation_id,
+                    "payload": {"stream_id": stream_id, "index": index, "audio_base64": base64.b64encode(pcm).decode()}
+                }))
+            if self.realtime:
+                await asyncio.sleep(self.frame_ms / 1000)
+
+        await ws.send(json.dumps({
+            "type": "audio_end",
+            "conversation_id": self.conversation_id,
+            "payload": {"stream_id": stream_id}
+        }))
+
+
+class RestClient:
+    """
+    REST varianten van een turn.
+
+    "rest_streaming": /conversation/streaming met tekst (SSE audio events)
+    "rest_audio":     /audio-conversation met WAV (alles in één response)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        name: str,
+        mode: str = "rest_streaming",
+        message: str = "Hoi robot, wat kun je allemaal?",
+        unique_audio: bool = True
+    ):
+        self.url = url.rstrip("/")
+        self.name = name
+        self.mode = mode
+        self.message = message
+        self.unique_audio = unique_audio
+        self.conversation_id = f"bench-{name}"
+
+    async def run(self, utterances: list[Utterance], turns: int, think_s: float) -> list[TurnResult]:
+        results = []
+        async with httpx.AsyncClient(base_url=self.url, timeout=TURN_TIMEOUT) as client:
+            for turn in range(turns):
+                try:
+                    if self.mode == "rest_audio":
+                        result = await self._audio_turn(
+                            client, pick_utterance(utterances, turn, self.unique_audio)
+                        )
+                    else:
+                        result = await self._streaming_turn(client)
+                except httpx.HTTPError as e:
+                    result = TurnResult(self.mode, self.name, ok=False, error=str(e) or type(e).__name__)
+                results.append(result)
+                if think_s:
+                    await asyncio.sleep(think_s)
+        return results
+
+    async def _streaming_turn(self, client: httpx.AsyncClient) -> TurnResult:
+        result = TurnResult(self.mode, self.name, ok=False)
+        t0 = time.perf_counter()
+        body = {"message": self.message, "conversation_id": self.conversation_id}
+
+        async with client.stream("POST", "/conversation/streaming", json=body) as resp:
+            resp.raise_for_status()
+            event = None
+            async for line in resp.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                    if event == "audio":
+                        result.audio_chunks += 1
+                        if result.first_audio_ms is None:
+                            result.first_audio_ms = _ms_since(t0)
+                    elif event == "metadata":
+                        result.response_ms = _ms_since(t0)
+                    elif event == "done":
+                        result.turn_ms = _ms_since(t0)
+                        result.ok = True
+                elif line.startswith("data: ") and event == "error":
+                    result.error = json.loads(line[6:]).get("error", "error")
+        return result
+
+    async def _audio_turn(self, client: httpx.AsyncClient, utterance: Utterance) -> TurnResult:
+        result = TurnResult(self.mode, self.name, ok=False)
+        t0 = time.perf_counter()
+        resp = await client.post(
+            "/audio-conversation",
+            files={"audio": (utterance.name, utterance.wav, "audio/wav")},
+            data={"conversation_id": self.conversation_id, "language": "nl", "return_format": "json"}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+
+        result.turn_ms = result.response_ms = _ms_since(t0)
+        if data.get("audio_base64"):
+            result.first_audio_ms = result.turn_ms
+            result.audio_chunks = 1
+        result.ok = True
+        return result
+
+
+def pick_utterance(utterances: list[Utterance], turn: int, unique: bool) -> Utterance:
+    utterance = utterances[turn % len(utterances)]
+    return utterance.variant(uuid.uuid4().int % 1000 + 1) if unique else utterance
+
+
+def load_utterances(paths: list[str]) -> list[Utterance]:
+    """WAV bestanden (of directories met WAVs); zonder paden één synthetische zin."""
+    utterances = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+        utterances.extend(Utterance.from_file(file) for file in files)
+    return utterances or [Utterance.synthetic()]
@@ -0,0 +1,312 @@
+"""
+Lokale stand-ins voor Ollama, Voxtral (vLLM) en Fish Audio.
+
+Zelfde endpoints en response formaten als de echte backends, met
+instelbare latency en jitter. Zo meet de benchmark alleen de orchestrator
+(hot path, pooling, streaming), niet de GPU.
+
+Standalone draaien (bijv. om een Docker orchestrator tegen te testen):
+
+    python -m benchmark.mock_backends --llm-first-token-ms 250 --tts-ms-per-char 6
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import random
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+DEFAULT_REPLY = (
+    "Hoi! Ik ben NerdCarX, een kleine robotauto. "
+    "Ik kan rijden, kijken en praten. "
+    "Wat wil je vandaag samen doen?"
+)
+DEFAULT_TRANSCRIPT = "Hoi robot, wat kun je allemaal?"
+
+TTS_SAMPLE_RATE = 44100
+
+
+@dataclass
+class Latency:
+    """Vaste vertraging + jitter (ms), plus optioneel een deel per eenheid."""
+    base_ms: float = 0.0
+    jitter_ms: float = 0.0
+    per_unit_ms: float = 0.0
+
+    def seconds(self, units: float = 0) -> float:
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.base_ms + jitter + self.per_unit_ms * units) / 1000
+
+    async def sleep(self, units: float = 0) -> None:
+        await asyncio.sleep(self.seconds(units))
+
+
+@dataclass
+class MockSettings:
+    """Latency profiel van alle drie de backends."""
+    # Ollama: prompt eval tot eerste token, daarna per token (~4 karakters)
+    llm_first_token: Latency = field(default_factory=lambda: Latency(250, 50))
+    llm_per_token_ms: float = 15.0
+    llm_reply: str = DEFAULT_REPLY
+    tool_call_rate: float = 0.0          # Fractie van turns met een show_emotion call
+    tool_call_text: bool = True          # Antwoord tekst in dezelfde generation als de tool call
+    # Voxtral: vast + per seconde audio
+    stt: Latency = field(default_factory=lambda: Latency(150, 30, 40))
+    stt_transcript: str = DEFAULT_TRANSCRIPT
+    # Fish: vast + per karakter, audio duur ~70ms per karakter
+    tts: Latency = field(default_factory=lambda: Latency(80, 20, 6))
+    tts_audio_ms_per_char: float = 70.0
+
+
+def silent_wav(duration_s: float, sample_rate: int = TTS_SAMPLE_RATE) -> bytes:
+    """WAV met stilte van de gevraagde duur (grootte komt overeen met echte TTS)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(b"\x00\x00" * int(duration_s * sample_rate))
+    return buffer.getvalue()
+
+
+def audio_seconds(data_url: str) -> float:
+    """Duur van de audio in een data URL (WAV header, of via soundfile voor FLAC/Ogg)."""
+    audio = base64.b64decode(data_url.split(",", 1)[1])
+    try:
+        with wave.open(io.BytesIO(audio), "rb") as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError):
+        pass
+    try:
+        import soundfile
+        return soundfile.info(io.BytesIO(audio)).duration
+    except Exception:
+        return len(audio) / 32000  # Schatting: 16kHz mono 16-bit
+
+
+def create_ollama_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI()
+
+    def tool_call_for(body: dict) -> list[dict]:
+        last = body["messages"][-1] if body.get("messages") else {}
+        if not body.get("tools") or last.get("role") == "tool":
+            return []
+        if random.random() >= settings.tool_call_rate:
+            return []
+        emotion = random.choice(["happy", "curious", "excited"])
+        return [{"function": {"name": "show_emotion", "arguments": {"emotion": emotion}}}]
+
+    def counts(body: dict) -> dict:
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        return {"prompt_eval_count": prompt_chars // 4, "eval_count": len(settings.llm_reply) // 4}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        tool_calls = tool_call_for(body)
+        tokens = [settings.llm_reply[i:i + 4] for i in range(0, len(settings.llm_reply), 4)]
+        if tool_calls and not settings.tool_call_text:
+            tokens = []
+
+        if not body.get("stream"):
+            await settings.llm_first_token.sleep()
+            await asyncio.sleep(settings.llm_per_token_ms * len(tokens) / 1000)
+            return {
+                "model": body.get("model", "mock"),
+                "message": {
+                    "role": "assistant",
+                    "content": "".join(tokens),
+                    "tool_calls": tool_calls
+                },
+                "done": True,
+                **counts(body)
+            }
+
+        async def generate():
+            await settings.llm_first_token.sleep()
+            for token in tokens:
+                yield json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n"
+                await asyncio.sleep(settings.llm_per_token_ms / 1000)
+            if tool_calls:
+                message = {"role": "assistant", "content": "", "tool_calls": tool_calls}
+                yield json.dumps({"message": message, "done": False}) + "\n"
+            done = {"message": {"role": "assistant", "content": ""}, "done": True, **counts(body)}
+            yield json.dumps(done) + "\n"
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "ministral-3:14b"}]}
+
+    return app
+
+
+def create_voxtral_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        # Audio zit als data URL in de eerste content part
+        audio_url = body["messages"][0]["content"][0]["audio_url"]["url"]
+        await settings.stt.sleep(audio_seconds(audio_url))
+        return {"choices": [{"message": {"role": "assistant", "content": settings.stt_transcript}}]}
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    @app.get("/v1/models")
+    async def models():
+        return {"data": [{"id": "mistralai/Voxtral-Mini-3B-2507"}]}
+
+    return app
+
+
+def split_text(text: str, chunk_length: int) -> list[str]:
+    """Tekst in stukken van max chunk_length tekens (op spaties), zoals Fish per segment genereert."""
+    pieces, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > chunk_length:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    return pieces + [current] if current else pieces
+
+
+def create_fish_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/tts")
+    async def tts(request: Request):
+        body = await request.json()
+        text = body.get("text", "")
+        if not body.get("streaming"):
+            await settings.tts.sleep(len(text))
+            audio = silent_wav(len(text) * settings.tts_audio_ms_per_char / 1000)
+            return Response(audio, media_type="audio/wav")
+
+        async def generate():
+            # Fish streaming: alleen ruwe PCM per segment (de WAV header filtert Fish zelf weg)
+            for i, piece in enumerate(split_text(text, body.get("chunk_length", 200))):
+                if i == 0:
+                    await settings.tts.sleep(len(piece))
+                else:
+                    await asyncio.sleep(settings.tts.per_unit_ms * len(piece) / 1000)
+                samples = int(len(piece) * settings.tts_audio_ms_per_char / 1000 * TTS_SAMPLE_RATE)
+                yield b"\x00\x00" * samples
+
+        return StreamingResponse(generate(), media_type="audio/wav")
+
+    @app.get("/v1/health")
+    async def health():
+        return {}
+
+    return app
+
+
+class MockBackends:
+    """
+    Start de drie mocks in achtergrond threads (eigen event loops).
+
+    Usage:
+        with MockBackends(MockSettings(), ports=(18434, 18150, 18250)) as mocks:
+            env = mocks.env()  # OLLAMA_URL, VOXTRAL_URL, TTS_URL
+    """
+
+    def __init__(self, settings: MockSettings, host: str = "127.0.0.1", ports: tuple = (18434, 18150, 18250)):
+        self.settings = settings
+        self.host = host
+        self.ports = ports
+        self._servers: list[uvicorn.Server] = []
+        self._threads: list[threading.Thread] = []
+
+    def env(self) -> dict:
+        ollama, voxtral, tts = (f"http://{self.host}:{port}" for port in self.ports)
+        return {"OLLAMA_URL": ollama, "VOXTRAL_URL": voxtral, "TTS_URL": tts}
+
+    def start(self) -> None:
+        apps = (
+            create_ollama_app(self.settings),
+            create_voxtral_app(self.settings),
+            create_fish_app(self.settings),
+        )
+        for app, port in zip(apps, self.ports):
+            server = uvicorn.Server(uvicorn.Config(app, host=self.host, port=port, log_level="error"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            self._servers.append(server)
+            self._threads.append(thread)
+
+        deadline = time.time() + 10
+        while not all(server.started for server in self._servers):
+            if time.time() > deadline:
+                raise RuntimeError("Mock backends starten niet (poort bezet?)")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.should_exit = True
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def __enter__(self) -> "MockBackends":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    """CLI opties voor het latency profiel (gedeeld met benchmark.run)."""
+    group = parser.add_argument_group("mock backends")
+    group.add_argument("--llm-first-token-ms", type=float, default=250)
+    group.add_argument("--llm-per-token-ms", type=float, default=15)
+    group.add_argument("--stt-ms", type=float, default=150)
+    group.add_argument("--stt-ms-per-second", type=float, default=40)
+    group.add_argument("--tts-ms", type=float, default=80)
+    group.add_argument("--tts-ms-per-char", type=float, default=6)
+    group.add_argument("--jitter", type=float, default=0.2, help="Jitter als fractie van de basis latency")
+    group.add_argument("--tool-call-rate", type=float, default=0.0)
+    group.add_argument("--tool-call-no-text", action="store_true",
+                       help="Tool call zonder tekst (forceert de tweede LLM pass)")
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        llm_first_token=Latency(args.llm_first_token_ms, args.llm_first_token_ms * args.jitter),
+        llm_per_token_ms=args.llm_per_token_ms,
+        tool_call_rate=args.tool_call_rate,
+        tool_call_text=not args.tool_call_no_text,
+        stt=Latency(args.stt_ms, args.stt_ms * args.jitter, args.stt_ms_per_second),
+        tts=Latency(args.tts_ms, args.tts_ms * args.jitter, args.tts_ms_per_char),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Ollama/Voxtral/Fish backends")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ports", type=int, nargs=3, default=[18434, 18150, 18250],
+                        metavar=("OLLAMA", "VOXTRAL", "TTS"))
+    add_latency_arguments(parser)
+    cli_args = parser.parse_args()
+
+    with MockBackends(settings_from_args(cli_args), cli_args.host, tuple(cli_args.ports)) as backends:
+        for name, url in backends.env().items():
+            print(f"{name}={url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
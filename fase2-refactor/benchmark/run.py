@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark voor de orchestrator.
+
+Start (standaard) de mock backends en een orchestrator proces, laat N
+gesimuleerde Pi clients tegelijk turns doen en rapporteert time-to-first-
+audio, turn latency (p50/p95/p99), throughput en CPU/geheugen van de
+orchestrator.
+
+Gebruik (vanuit fase2-refactor/):
+    python -m benchmark.run --clients 8 --turns 10
+    python -m benchmark.run --transport ws,rest_streaming --upload stream --realtime
+    python -m benchmark.run --url http://localhost:8200 --pid $(pgrep -f app.main)
+    python -m benchmark.run --wav opnames/ --json results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from .clients import RestClient, SimulatedPi, TurnResult, load_utterances
+from .mock_backends import add_latency_arguments
+from .stats import ProcessSampler, summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+ORCHESTRATOR_DIR = ROOT / "orchestrator"
+
+TRANSPORTS = ("ws", "rest_streaming", "rest_audio")
+
+
+def wait_for(url: str, timeout: float = 30.0) -> None:
+    """Poll een URL tot hij 200 geeft."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} niet bereikbaar na {timeout:.0f}s")
+
+
+def start_mocks(args: argparse.Namespace) -> subprocess.Popen:
+    """Mocks in een eigen proces, zodat ze geen CPU van de orchestrator meting lenen."""
+    ollama, voxtral, tts = args.mock_ports
+    command = [
+        sys.executable, "-m", "benchmark.mock_backends",
+        "--ports", str(ollama), str(voxtral), str(tts),
+        "--llm-first-token-ms", str(args.llm_first_token_ms),
+        "--llm-per-token-ms", str(args.llm_per_token_ms),
+        "--stt-ms", str(args.stt_ms),
+        "--stt-ms-per-second", str(args.stt_ms_per_second),
+        "--tts-ms", str(args.tts_ms),
+        "--tts-ms-per-char", str(args.tts_ms_per_char),
+        "--jitter", str(args.jitter),
+        "--tool-call-rate", str(args.tool_call_rate),
+    ]
+    if args.tool_call_no_text:
+        command.append("--tool-call-no-text")
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    wait_for(f"http://127.0.0.1:{ollama}/api/tags")
+    wait_for(f"http://127.0.0.1:{voxtral}/health")
+    wait_for(f"http://127.0.0.1:{tts}/v1/health")
+    return process
+
+
+def start_orchestrator(args: argparse.Namespace, log_path: Path) -> subprocess.Popen:
+    ollama, voxtral, tts = args.mock_ports
+    env = dict(os.environ)
+    if not args.real_backends:
+        env.update({
+            "OLLAMA_URL": f"http://127.0.0.1:{ollama}",
+            "VOXTRAL_URL": f"http://127.0.0.1:{voxtral}",
+            "TTS_URL": f"http://127.0.0.1:{tts}",
+        })
+
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ORCHESTRATOR_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    wait_for(f"http://127.0.0.1:{args.port}/health")
+    return process
+
+
+def make_client(transport: str, url: str, name: str, args: argparse.Namespace):
+    if transport == "ws":
+        ws_url = url.replace("http://", "ws://").replace("https://", "wss://")
+        return SimulatedPi(
+            ws_url, name, upload=args.upload, realtime=args.realtime,
+            expect_audio=not args.no_audio, unique_audio=not args.identical_audio,
+            barge_in_rate=args.barge_in_rate
+        )
+    return RestClient(url, name, mode=transport, unique_audio=not args.identical_audio)
+
+
+async def run_load(args: argparse.Namespace, url: str, pid: Optional[int]) -> dict:
+    utterances = load_utterances(args.wav)
+    transports = args.transport.split(",")
+
+    # Warmup: één turn per transport (connection pools, model load), niet gemeten
+    await asyncio.gather(*(
+        make_client(transport, url, f"warmup-{transport}", args).run(utterances, 1, 0)
+        for transport in transports
+    ))
+
+    clients = [
+        make_client(transport, url, f"{transport}-{i}", args)
+        for transport in transports
+        for i in range(args.clients)
+    ]
+
+    sampler = ProcessSampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+
+    t0 = time.perf_counter()
+    per_client = await asyncio.gather(*(client.run(utterances, args.turns, args.think) for client in clients))
+    wall_s = time.perf_counter() - t0
+
+    results: list[TurnResult] = [result for client_results in per_client for result in client_results]
+    report = {
+        "config": {
+            "clients_per_transport": args.clients,
+            "turns_per_client": args.turns,
+            "transports": transports,
+            "upload": args.upload,
+            "realtime_upload": args.realtime,
+            "identical_audio": args.identical_audio,
+            "utterances": [u.name for u in utterances],
+            "mock_backends": not args.real_backends and not args.url,
+        },
+        "wall_s": round(wall_s, 2),
+        "results": summarize(results, wall_s),
+        "process": sampler.stop() if sampler else {},
+    }
+
+    # Server-side spans (zie /traces), STT cache, tool, admission en speculatie counters als de orchestrator ze heeft
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=5) as client:
+            resp = await client.get("/traces", params={"limit": 0})
+            if resp.status_code == 200:
+                report["server_spans"] = resp.json().get("latency", {})
+            resp = await client.get("/status")
+            if resp.status_code == 200:
+                for key in ("stt_cache", "tts_cache", "tools", "admission"):
+                    if key in resp.json():
+                        report[key] = resp.json()[key]
+            resp = await client.get("/ws/clients")
+            if resp.status_code == 200:
+                for key in ("speculation", "interrupts"):
+                    if key in resp.json():
+                        report[key] = resp.json()[key]
+    except httpx.HTTPError:
+        pass
+
+    return report
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:>8.0f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(report: dict) -> None:
+    config = report["config"]
+    print(f"\n{'=' * 72}")
+    print(f"NerdCarX orchestrator benchmark  |  {config['clients_per_transport']} clients x "
+          f"{config['turns_per_client']} turns  |  upload={config['upload']}  |  {report['wall_s']}s")
+    print(f"{'=' * 72}")
+
+    for transport, stats in report["results"].items():
+        print(f"\n[{transport}]  ok {stats['ok']}/{stats['turns']}  "
+              f"throughput {stats['throughput_turns_s']} turns/s")
+        if stats["errors"]:
+            print(f"  errors: {stats['errors']}")
+        print(f"  {'':<14}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  (ms)")
+        for label, key in (("first audio", "first_audio"), ("response", "response"),
+                           ("turn", "turn"), ("interrupt", "interrupt"), ("upload", "upload")):
+            s = stats[key]
+            if s["count"]:
+                print(f"  {label:<14}{_fmt(s['p50_ms'])}{_fmt(s['p95_ms'])}{_fmt(s['p99_ms'])}{_fmt(s['max_ms'])}")
+
+    process = report.get("process")
+    if process:
+        print(f"\n[orchestrator]  CPU avg {process['cpu_avg_pct']}% / max {process['cpu_max_pct']}%  "
+              f"RSS avg {process['rss_avg_mb']} MB / max {process['rss_max_mb']} MB")
+
+    speculation = report.get("speculation")
+    if speculation and speculation.get("partials"):
+        print(f"\n[speculation]  partials {speculation['partials']}  prefetches {speculation['prefetches']}  "
+              f"hits {speculation['hits']}  misses {speculation['misses']}  "
+              f"discarded {speculation['discarded']}  stt_reused {speculation['stt_reused']}")
+
+    interrupts = report.get("interrupts")
+    if interrupts and interrupts.get("received"):
+        print(f"\n[interrupts]  received {interrupts['received']}  cancelled in-flight {interrupts['cancelled']}")
+
+    stt_cache = report.get("stt_cache")
+    if stt_cache:
+        print(f"\n[stt cache]  hits {stt_cache['hits'] + stt_cache['disk_hits']}  "
+              f"coalesced {stt_cache['coalesced']}  misses {stt_cache['misses']}")
+
+    tts_cache = report.get("tts_cache")
+    if tts_cache:
+        print(f"\n[tts cache]  hits {tts_cache['hits'] + tts_cache['disk_hits']}  "
+              f"coalesced {tts_cache['coalesced']}  misses {tts_cache['misses']}  "
+              f"warmed {tts_cache['warmed']}  gpu saved {tts_cache['gpu_s_saved']}s")
+
+    tools = report.get("tools")
+    if tools and tools.get("batches"):
+        print(f"\n[tools]  batches {tools['batches']}  parallel {tools['parallel_batches']}  "
+              f"followups skipped {tools['followups_skipped']}")
+
+    for backend, admission in (report.get("admission") or {}).items():
+        print(f"\n[admission {backend}]  concurrency {admission['concurrency']}  admitted {admission['admitted']}  "
+              f"waited {admission['waited']}  max queued {admission['max_queued']}  "
+              f"shed {admission['shed']}  timeouts {admission['timeouts']}")
+
+    spans = report.get("server_spans")
+    if spans:
+        print(f"\n[server spans]  {'':<22}{'count':>6}{'p50':>8}{'p95':>8}{'p99':>8}")
+        for name, s in spans.items():
+            print(f"  {name:<36}{s['count']:>6}{_fmt(s['p50_ms'])}{_fmt(s['p95_ms'])}{_fmt(s['p99_ms'])}")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NerdCarX orchestrator latency benchmark")
+    parser.add_argument("--clients", type=int, default=4, help="Gelijktijdige clients per transport")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per client")
+    parser.add_argument("--think", type=float, default=0.0, help="Pauze tussen turns (s)")
+    parser.add_argument("--transport", default="ws", help=f"Komma-gescheiden: {', '.join(TRANSPORTS)}")
+    parser.add_argument("--upload", choices=("json", "binary", "stream"), default="binary")
+    parser.add_argument("--realtime", action="store_true", help="Streaming upload in microfoon tempo")
+    parser.add_argument("--no-audio", action="store_true", help="Turn eindigt bij de response (TTS uit)")
+    parser.add_argument("--barge-in-rate", type=float, default=0.0,
+                        help="Fractie ws turns die na de eerste audio chunk onderbroken wordt (interrupt)")
+    parser.add_argument("--wav", nargs="*", default=[], help="WAV bestanden of directories")
+    parser.add_argument("--identical-audio", action="store_true",
+                        help="Elke turn bit-identieke audio (meet de STT cache i.p.v. STT)")
+    parser.add_argument("--json", help="Schrijf het rapport ook als JSON")
+
+    target = parser.add_argument_group("orchestrator")
+    target.add_argument("--url", help="Bestaande orchestrator (geen mocks/proces starten)")
+    target.add_argument("--pid", type=int, help="PID voor CPU/geheugen bij --url")
+    target.add_argument("--port", type=int, default=18200)
+    target.add_argument("--mock-ports", type=int, nargs=3, default=[18434, 18150, 18250],
+                        metavar=("OLLAMA", "VOXTRAL", "TTS"))
+    target.add_argument("--real-backends", action="store_true",
+                        help="Orchestrator starten met de URLs uit config.yml i.p.v. mocks")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    for transport in args.transport.split(","):
+        if transport not in TRANSPORTS:
+            parser.error(f"Onbekend transport: {transport}")
+
+    processes: list[subprocess.Popen] = []
+    try:
+        if args.url:
+            url, pid = args.url.rstrip("/"), args.pid
+        else:
+            if not args.real_backends:
+                processes.append(start_mocks(args))
+            log_path = Path(tempfile.gettempdir()) / "nerdcarx-benchmark-orchestrator.log"
+            orchestrator = start_orchestrator(args, log_path)
+            processes.append(orchestrator)
+            url, pid = f"http://127.0.0.1:{args.port}", orchestrator.pid
+            print(f"Orchestrator log: {log_path}")
+
+        report = asyncio.run(run_load(args, url, pid))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_report(report)
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"Rapport: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
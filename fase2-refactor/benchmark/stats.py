@@ -0,0 +1,124 @@
+"""Percentielen en CPU/geheugen sampling van het orchestrator proces."""
+import os
+import threading
+import time
+from typing import Optional
+
+from .clients import TurnResult
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def percentile(values: list[float], p: float) -> Optional[float]:
+    """Nearest-rank percentiel (None bij geen waarden)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": max(values) if values else None
+    }
+
+
+def summarize(results: list[TurnResult], wall_s: float) -> dict:
+    """Samenvatting per transport: TTFA/response/turn percentielen en throughput."""
+    summary = {}
+    for transport in sorted({result.transport for result in results}):
+        turns = [result for result in results if result.transport == transport]
+        ok = [result for result in turns if result.ok]
+        errors: dict[str, int] = {}
+        for result in turns:
+            if not result.ok:
+                errors[result.error] = errors.get(result.error, 0) + 1
+
+        summary[transport] = {
+            "turns": len(turns),
+            "ok": len(ok),
+            "errors": errors,
+            "throughput_turns_s": round(len(ok) / wall_s, 2) if wall_s else 0.0,
+            "first_audio": latency_summary([r.first_audio_ms for r in ok if r.first_audio_ms is not None]),
+            "response": latency_summary([r.response_ms for r in ok if r.response_ms is not None]),
+            "turn": latency_summary([r.turn_ms for r in ok if r.turn_ms is not None]),
+            "interrupt": latency_summary([r.interrupt_ms for r in ok if r.interrupt_ms is not None]),
+            "upload": latency_summary([r.upload_ms for r in ok])
+        }
+    return summary
+
+
+class ProcessSampler:
+    """
+    Samplet CPU% en RSS van een proces via /proc (Linux, geen psutil nodig).
+
+    CPU% is relatief aan één core (200% = twee cores vol).
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu_samples: list[float] = []
+        self.rss_samples: list[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return os.path.exists(f"/proc/{self.pid}/stat")
+
+    def start(self) -> None:
+        if not self.available:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+        if not self.cpu_samples:
+            return {}
+        return {
+            "cpu_avg_pct": round(sum(self.cpu_samples) / len(self.cpu_samples), 1),
+            "cpu_max_pct": round(max(self.cpu_samples), 1),
+            "rss_avg_mb": round(sum(self.rss_samples) / len(self.rss_samples), 1),
+            "rss_max_mb": round(max(self.rss_samples), 1)
+        }
+
+    def _run(self) -> None:
+        last_cpu = self._cpu_seconds()
+        last_time = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            cpu = self._cpu_seconds()
+            now = time.perf_counter()
+            if cpu is None:
+                return
+            self.cpu_samples.append((cpu - last_cpu) / (now - last_time) * 100)
+            self.rss_samples.append(self._rss_mb())
+            last_cpu, last_time = cpu, now
+
+    def _cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                # Veld 2 (comm) kan spaties bevatten: split na de laatste ')'
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            return None
+        utime, stime = int(fields[11]), int(fields[12])
+        return (utime + stime) / CLOCK_TICKS
+
+    def _rss_mb(self) -> float:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return 0.0
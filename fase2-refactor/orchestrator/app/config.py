@@ -28,6 +28,29 @@ class VoxtralConfig:
     temperature: float = 0.0
 
 
+@dataclass
+class STTPreprocessConfig:
+    """Audio voorbewerking vóór STT (zie services/stt/preprocess.py)."""
+    enabled: bool = True
+    trim: bool = True                   # Stilte aan begin/eind weg
+    silence_dbfs: float = -50.0         # Absolute stiltedrempel
+    dynamic_range_db: float = 35.0      # ... of zoveel dB onder het luidste frame
+    padding_ms: float = 200             # Marge rond de spraak
+    normalize: bool = True
+    target_dbfs: float = -20.0          # Loudness van de spraak na normalisatie
+    max_gain_db: float = 18.0
+    encoding: str = "wav"               # "wav", "flac" of "opus" (flac/opus vereisen soundfile)
+
+
+@dataclass
+class STTCacheConfig:
+    """Transcriptie cache op audio fingerprint (zie services/stt/cache.py)."""
+    enabled: bool = True
+    max_memory_mb: float = 4.0          # LRU limiet in geheugen
+    disk_path: Optional[str] = None     # Bijv. "data/stt_cache.db" (None = alleen geheugen)
+    disk_max_entries: int = 10000
+
+
 @dataclass
 class OrchestratorConfig:
     host: str = "0.0.0.0"
@@ -38,6 +61,12 @@ class OrchestratorConfig:
 class VisionConfig:
     mock_image_path: str = "test_images/test_foto.jpg"
     pi_camera_url: Optional[str] = None
+    preprocess: bool = True             # Verkleinen + JPEG her-encoderen (vereist Pillow)
+    max_side: int = 1024                # Langste zijde in pixels (image tokens groeien met het oppervlak)
+    jpeg_quality: int = 80
+    cache_ttl_s: float = 10.0           # Beschrijving hergebruiken binnen deze tijd (0 = uit)
+    cache_max_distance: int = 6         # Max verschil in dHash bits voor "dezelfde" foto
+    cache_max_entries: int = 64
 
 
 @dataclass
@@ -59,7 +88,39 @@ class TTSConfig:
     temperature: float = 0.5
     top_p: float = 0.6
     format: str = "wav"
+    seed: Optional[int] = None    # Vaste seed: reproduceerbare audio (ook onderdeel van de cache key)
     streaming: bool = True
+    pipeline_lookahead: int = 3  # Max zinnen tegelijk in synthesis bij streaming
+    stream_audio: bool = False   # Fish streaming: audio chunks per segment binnen een zin (alleen WAV, /ws)
+    stream_sample_rate: Optional[int] = None  # Sample rate van de Fish PCM stream, None = eenmalig opvragen
+    stream_chunk_length: Optional[int] = 100  # Fish chunk_length (100-300) bij streaming, None = server default
+    min_segment_ms: float = 200.0     # Kleinere stukjes uit de Fish stream samenvoegen
+    chunker: str = "prosody"     # "prosody" (adaptief) of "sentence" (alleen op . ! ?)
+    first_chunk_min_chars: int = 12   # Eerste chunk: niet korter knippen bij een komma
+    first_chunk_max_chars: int = 50   # Eerste zin langer: al bij een komma knippen
+    target_chunk_chars: int = 120     # Latere zinnen samenvoegen tot ongeveer deze lengte
+    max_chunk_chars: int = 220
+
+
+@dataclass
+class TextNormalizationConfig:
+    """Extra uitspraak regels voor de TTS normalizer (vullen de ingebouwde tabellen aan)."""
+    words: dict = field(default_factory=dict)          # Woord → uitspraak, bijv. {"GitHub": "gidhub"}
+    units: dict = field(default_factory=dict)          # Eenheid na een getal, bijv. {"W": "watt"}
+    currencies: dict = field(default_factory=dict)     # Symbool vóór een bedrag, bijv. {"¥": "yen"}
+    letters: dict = field(default_factory=dict)        # Letter uitspraak in acroniemen
+    skip_acronyms: list[str] = field(default_factory=list)  # Niet spellen, bijv. ["NASA"]
+
+
+@dataclass
+class TTSCacheConfig:
+    """Audio cache voor terugkerende zinnen (zie services/tts/cache.py)."""
+    enabled: bool = True
+    max_memory_mb: float = 32.0         # LRU limiet in geheugen (encoded audio)
+    disk_path: Optional[str] = None     # Bijv. "data/tts_cache.db" (None = alleen geheugen)
+    disk_max_entries: int = 2000
+    max_chars: int = 160                # Langere teksten niet cachen (komen zelden terug)
+    warmup: list[str] = field(default_factory=list)   # Zinnen om bij startup vooraf te synthetiseren
 
 
 @dataclass
@@ -67,6 +128,55 @@ class WebSocketConfig:
     enabled: bool = True
     heartbeat_interval: int = 30
     audio_chunk_threshold: int = 3
+    binary_audio: bool = True  # Binary audio frames toestaan (na hello negotiation)
+    audio_stream_max_seconds: float = 30.0  # Max gebufferde audio per streaming upload
+
+
+@dataclass
+class HTTPBackendConfig:
+    """Connection pool instellingen voor één backend."""
+    max_connections: int = 10
+    max_keepalive: int = 5
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+
+@dataclass
+class HTTPConfig:
+    """Gedeelde HTTP clients per backend (zie services/http.py)."""
+    ollama: HTTPBackendConfig = field(default_factory=HTTPBackendConfig)
+    voxtral: HTTPBackendConfig = field(default_factory=HTTPBackendConfig)
+    tts: HTTPBackendConfig = field(default_factory=HTTPBackendConfig)
+
+    def __post_init__(self):
+        # YAML levert dicts, zet om naar typed configs
+        for name in ("ollama", "voxtral", "tts"):
+            value = getattr(self, name)
+            if isinstance(value, dict):
+                setattr(self, name, HTTPBackendConfig(**value))
+
+
+@dataclass
+class AdmissionBackendConfig:
+    """Admission control voor één GPU backend."""
+    concurrency: int = 2                # Gelijktijdige requests naar de backend
+    max_queue: int = 16                 # Wachtende requests; daarboven load shedding
+    queue_timeout_s: float = 30.0       # Langer wachten = afwijzen (0 = geen limiet)
+
+
+@dataclass
+class AdmissionConfig:
+    """Centrale admission control per backend (zie services/admission.py)."""
+    enabled: bool = True
+    ollama: AdmissionBackendConfig = field(default_factory=AdmissionBackendConfig)
+    voxtral: AdmissionBackendConfig = field(default_factory=lambda: AdmissionBackendConfig(concurrency=4))
+
+    def __post_init__(self):
+        # YAML levert dicts, zet om naar typed configs
+        for name in ("ollama", "voxtral"):
+            value = getattr(self, name)
+            if isinstance(value, dict):
+                setattr(self, name, AdmissionBackendConfig(**value))
 
 
 @dataclass
@@ -74,6 +184,49 @@ class DebugConfig:
     enabled: bool = False
     log_file: Optional[str] = None  # Relatief pad, bijv. "logs/conversation.log"
     verbose: bool = False
+    trace_file: Optional[str] = None  # JSONL trace export, bijv. "logs/traces.jsonl"
+    trace_buffer: int = 200           # Aantal recente traces voor /traces
+
+
+@dataclass
+class MemoryConfig:
+    """Conversation history: token budget, compaction en eviction."""
+    max_history_tokens: int = 6000      # Budget voor summary + history (geschat)
+    compact_target_ratio: float = 0.6   # Na compaction terug naar dit deel van het budget
+    keep_recent_messages: int = 4       # Laatste messages nooit samenvatten
+    summarize: bool = True              # False = oude turns gewoon laten vallen
+    max_conversations: int = 100        # LRU limiet in geheugen
+    idle_ttl_minutes: float = 60        # Idle conversations daarna verwijderen (0 = nooit)
+    sqlite_path: Optional[str] = None   # Bijv. "data/conversations.db" (None = alleen geheugen)
+
+
+@dataclass
+class PromptConfig:
+    """Prompt opbouw: volatiele status achteraan voor de Ollama prefix cache."""
+    include_time: bool = True           # Datum/tijd in de status message
+    state_role: str = "system"          # Role van de status message ("system" of "user")
+    cache_slots: int = 1                # = OLLAMA_NUM_PARALLEL (voor de verwachte hit rate)
+
+
+@dataclass
+class SpeculationConfig:
+    """Speculatieve STT tijdens streaming uploads (partials + LLM prefetch)."""
+    enabled: bool = True
+    prefetch_llm: bool = True           # LLM call al starten op de laatste partial
+    interval_s: float = 1.0             # Partial na elke X seconden nieuwe audio (0 = alleen bij pauzes)
+    pause_ms: float = 300               # Partial zodra de spreker zo lang stil is
+    silence_rms: float = 300            # 16-bit RMS waaronder een frame als stilte telt
+    min_audio_s: float = 0.5            # Geen partials op kortere audio
+    max_partials: int = 10              # Per upload (begrenst extra STT load)
+
+
+@dataclass
+class ToolsConfig:
+    """Tool calls uit één LLM response: gelijktijdig, met timeouts en limieten."""
+    max_concurrency: int = 4            # Gelijktijdige tool calls (over alle turns)
+    default_timeout: float = 30.0       # Seconden per call (incl. Pi round-trip en vision analyse)
+    timeouts: dict = field(default_factory=dict)       # Per tool, bijv. {"take_photo": 20}
+    concurrency: dict = field(default_factory=dict)    # Per tool, bijv. {"take_photo": 1}
 
 
 @dataclass
@@ -87,6 +240,16 @@ class AppConfig:
     tts: TTSConfig
     websocket: WebSocketConfig
     debug: DebugConfig
+    http: HTTPConfig = field(default_factory=HTTPConfig)
+    memory: MemoryConfig = field(default_factory=MemoryConfig)
+    prompt: PromptConfig = field(default_factory=PromptConfig)
+    speculation: SpeculationConfig = field(default_factory=SpeculationConfig)
+    stt_preprocess: STTPreprocessConfig = field(default_factory=STTPreprocessConfig)
+    stt_cache: STTCacheConfig = field(default_factory=STTCacheConfig)
+    tools: ToolsConfig = field(default_factory=ToolsConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
+    tts_cache: TTSCacheConfig = field(default_factory=TTSCacheConfig)
+    text_normalization: TextNormalizationConfig = field(default_factory=TextNormalizationConfig)
     system_prompt: str = ""
 
 
@@ -160,6 +323,16 @@ def load_config(config_path: Optional[Path] = None) -> AppConfig:
         tts=TTSConfig(**config.get("tts", {})),
         websocket=WebSocketConfig(**config.get("websocket", {})),
         debug=DebugConfig(**config.get("debug", {})),
+        http=HTTPConfig(**config.get("http", {})),
+        memory=MemoryConfig(**config.get("memory", {})),
+        prompt=PromptConfig(**config.get("prompt", {})),
+        speculation=SpeculationConfig(**config.get("speculation", {})),
+        stt_preprocess=STTPreprocessConfig(**config.get("stt_preprocess", {})),
+        stt_cache=STTCacheConfig(**config.get("stt_cache", {})),
+        tools=ToolsConfig(**config.get("tools", {})),
+        admission=AdmissionConfig(**config.get("admission", {})),
+        tts_cache=TTSCacheConfig(**config.get("tts_cache", {})),
+        text_normalization=TextNormalizationConfig(**config.get("text_normalization", {})),
         system_prompt=config.get("system_prompt", "")
     )
 
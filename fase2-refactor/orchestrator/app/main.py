@@ -9,11 +9,22 @@ Gebruik:
 import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
 from .config import get_config
+from .providers import (
+    init_http_pool,
+    close_http_pool,
+    get_http_client,
+    close_conversation_store,
+    close_transcript_cache,
+    close_tts_cache,
+    get_tts,
+)
 from .routes import health_router, chat_router, websocket_router
-from .services import OllamaLLM
+from .services import OllamaLLM, CachedTTS
+from .services.admission import admission_context
+from .utils.tracing import configure_tracer, get_tracer
 
 
 async def warmup_ollama(config) -> None:
@@ -28,7 +39,8 @@ async def warmup_ollama(config) -> None:
         llm = OllamaLLM(
             url=config.ollama.url,
             model=config.ollama.model,
-            timeout=180.0  # Extra tijd voor eerste load
+            timeout=180.0,  # Extra tijd voor eerste load
+            client=get_http_client("ollama")
         )
         # Simpele warmup request
         await llm.chat(messages=[{"role": "user", "content": "hoi"}])
@@ -38,6 +50,22 @@ async def warmup_ollama(config) -> None:
         print("First request will be slow (cold start)")
 
 
+async def warmup_tts(config) -> None:
+    """
+    Vaste zinnen (tts_cache.warmup) vooraf synthetiseren.
+
+    Na een herstart met disk laag staan ze er meestal al: dan kost dit niets.
+    """
+    tts = get_tts()
+    if not isinstance(tts, CachedTTS):
+        return
+    try:
+        warmed = await tts.warmup(config.tts_cache.warmup)
+        print(f"TTS cache warmup complete - {warmed} new phrases synthesized")
+    except Exception as e:
+        print(f"TTS cache warmup failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -49,13 +77,28 @@ async def lifespan(app: FastAPI):
     print(f"TTS: Fish Audio @ {config.tts.url} (enabled={config.tts.enabled})")
     print(f"WebSocket: enabled={config.websocket.enabled}")
 
+    # Gedeelde connection-pooled HTTP clients per backend
+    init_http_pool(config)
+
+    # Latency tracing (/metrics, /traces, optioneel JSONL export)
+    configure_tracer(config.debug.trace_file, max_traces=config.debug.trace_buffer)
+
     # Warmup Ollama in background (niet blocking)
     asyncio.create_task(warmup_ollama(config))
 
+    # Terugkerende zinnen alvast in de TTS cache
+    if config.tts.enabled and config.tts_cache.enabled and config.tts_cache.warmup:
+        asyncio.create_task(warmup_tts(config))
+
     yield
 
     # Shutdown
     print("Orchestrator shutting down...")
+    await close_conversation_store()
+    close_transcript_cache()
+    close_tts_cache()
+    await close_http_pool()
+    get_tracer().close()
 
 
 app = FastAPI(
@@ -71,6 +114,14 @@ app.include_router(chat_router)
 app.include_router(websocket_router)
 
 
+@app.middleware("http")
+async def admission_client(request: Request, call_next):
+    """REST requests tellen per client host voor de fairness in de admission queues."""
+    client_id = request.client.host if request.client else None
+    with admission_context(client_id=client_id):
+        return await call_next(request)
+
+
 if __name__ == "__main__":
     import uvicorn
     config = get_config()
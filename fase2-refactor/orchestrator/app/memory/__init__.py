@@ -0,0 +1,17 @@
+"""Conversation geheugen: begrensde history, summary compaction, optioneel SQLite."""
+from .tokens import estimate_tokens, estimate_message_tokens
+from .conversation import StoredConversation, StoredMessage
+from .summarizer import Summarizer, LLMSummarizer
+from .sqlite import SQLiteBackend
+from .store import ConversationStore
+
+__all__ = [
+    "estimate_tokens",
+    "estimate_message_tokens",
+    "StoredConversation",
+    "StoredMessage",
+    "Summarizer",
+    "LLMSummarizer",
+    "SQLiteBackend",
+    "ConversationStore",
+]
@@ -0,0 +1,124 @@
+"""Conversation history met incrementele token telling en rolling summary."""
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .tokens import estimate_message_tokens
+
+SUMMARY_PREFIX = "Samenvatting van het eerdere gesprek:"
+
+
+@dataclass
+class StoredMessage:
+    """Eén message in de history (tokens worden één keer geschat)."""
+    seq: int
+    role: str
+    content: str
+    tokens: int
+
+    def to_ollama(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+
+@dataclass
+class StoredConversation:
+    """
+    Conversation history zoals de handlers hem gebruiken.
+
+    Zelfde API als de oude Conversation (add_user_message,
+    add_assistant_message, to_ollama_messages). Oudere turns die buiten het
+    budget vallen worden door de ConversationStore samengevat; de summary
+    gaat als extra system message vóór de recente messages mee.
+    """
+    conversation_id: str
+    system_prompt: str
+    messages: list[StoredMessage] = field(default_factory=list)
+    summary: str = ""
+    summary_tokens: int = 0
+    history_tokens: int = 0
+    created_at: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+    next_seq: int = 0
+
+    # Gezet door de store: aangeroepen na elke nieuwe message
+    _on_message: Optional[Callable[["StoredConversation", StoredMessage], None]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    # Messages t/m deze seq worden nu samengevat (compaction loopt)
+    compacting_until: Optional[int] = None
+
+    def add_user_message(self, content: str) -> StoredMessage:
+        return self._add("user", content)
+
+    def add_assistant_message(self, content: str) -> StoredMessage:
+        return self._add("assistant", content)
+
+    def replace_message(self, seq: int, content: str) -> bool:
+        """Vervang de tekst van een message (bijv. ingekort na barge-in); False als hij al weg is."""
+        if self.compacting_until is not None and seq <= self.compacting_until:
+            return False  # Wordt al samengevat
+        for index, message in enumerate(self.messages):
+            if message.seq != seq:
+                continue
+            replaced = StoredMessage(seq, message.role, content, estimate_message_tokens(content))
+            self.messages[index] = replaced
+            self.history_tokens += replaced.tokens - message.tokens
+            self.touch()
+            if self._on_message is not None:
+                self._on_message(self, replaced)
+            return True
+        return False
+
+    def to_ollama_messages(self, system_prompt: Optional[str] = None) -> list[dict]:
+        """Messages voor Ollama: system prompt, summary (indien aanwezig), history."""
+        messages = [{"role": "system", "content": system_prompt or self.system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"{SUMMARY_PREFIX} {self.summary}"})
+        messages.extend(message.to_ollama() for message in self.messages)
+        return messages
+
+    @property
+    def total_tokens(self) -> int:
+        """Geschatte tokens van summary + history (zonder system prompt)."""
+        return self.summary_tokens + self.history_tokens
+
+    @property
+    def message_count(self) -> int:
+        return len(self.messages)
+
+    def touch(self) -> None:
+        self.last_access = time.time()
+
+    def set_summary(self, summary: str) -> None:
+        self.summary = summary
+        self.summary_tokens = estimate_message_tokens(summary) if summary else 0
+
+    def drop_until(self, seq: int) -> list[StoredMessage]:
+        """Verwijder alle messages t/m seq (na compaction) en geef ze terug."""
+        dropped = [message for message in self.messages if message.seq <= seq]
+        self.messages = [message for message in self.messages if message.seq > seq]
+        self.history_tokens -= sum(message.tokens for message in dropped)
+        return dropped
+
+    def restore(self, message: StoredMessage) -> None:
+        """Voeg een bestaande message toe (bij laden uit SQLite)."""
+        self.messages.append(message)
+        self.history_tokens += message.tokens
+        self.next_seq = max(self.next_seq, message.seq + 1)
+
+    def _add(self, role: str, content: str) -> StoredMessage:
+        message = StoredMessage(
+            seq=self.next_seq,
+            role=role,
+            content=content,
+            tokens=estimate_message_tokens(content)
+        )
+        self.next_seq += 1
+        self.messages.append(message)
+        self.history_tokens += message.tokens
+        self.touch()
+
+        if self._on_message is not None:
+            self._on_message(self, message)
+        return message
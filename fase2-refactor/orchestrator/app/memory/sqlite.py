@@ -0,0 +1,132 @@
+"""Optionele SQLite opslag zodat conversations een herstart overleven."""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from .conversation import StoredConversation, StoredMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    system_prompt TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+);
+"""
+
+
+class SQLiteBackend:
+    """
+    Write-through opslag van conversations in één SQLite bestand.
+
+    Elke write is één kleine transactie op een lokaal bestand (WAL mode),
+    dus we doen dit gewoon synchroon vanuit de event loop.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def save_conversation(self, conv: StoredConversation) -> None:
+        """Insert of update de conversation metadata (niet de messages)."""
+        with self._db:
+            self._db.execute(
+                """
+                INSERT INTO conversations (id, system_prompt, summary, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    system_prompt = excluded.system_prompt,
+                    summary = excluded.summary,
+                    last_access = excluded.last_access
+                """,
+                (conv.conversation_id, conv.system_prompt, conv.summary,
+                 conv.created_at, conv.last_access)
+            )
+
+    def add_message(self, conv: StoredConversation, message: StoredMessage) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)",
+                (conv.conversation_id, message.seq, message.role, message.content, message.tokens)
+            )
+            self._db.execute(
+                "UPDATE conversations SET last_access = ? WHERE id = ?",
+                (conv.last_access, conv.conversation_id)
+            )
+
+    def compact(self, conv: StoredConversation, until_seq: int) -> None:
+        """Sla de nieuwe summary op en verwijder de samengevatte messages."""
+        with self._db:
+            self._db.execute(
+                "UPDATE conversations SET summary = ? WHERE id = ?",
+                (conv.summary, conv.conversation_id)
+            )
+            self._db.execute(
+                "DELETE FROM messages WHERE conversation_id = ? AND seq <= ?",
+                (conv.conversation_id, until_seq)
+            )
+
+    def load(self, conversation_id: str) -> Optional[StoredConversation]:
+        row = self._db.execute(
+            "SELECT system_prompt, summary, created_at, last_access FROM conversations WHERE id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        system_prompt, summary, created_at, last_access = row
+        conv = StoredConversation(
+            conversation_id=conversation_id,
+            system_prompt=system_prompt,
+            created_at=created_at,
+            last_access=last_access
+        )
+        conv.set_summary(summary)
+
+        for seq, role, content, tokens in self._db.execute(
+            "SELECT seq, role, content, tokens FROM messages WHERE conversation_id = ? ORDER BY seq",
+            (conversation_id,)
+        ):
+            conv.restore(StoredMessage(seq=seq, role=role, content=content, tokens=tokens))
+        return conv
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._db:
+            deleted = self._db.execute(
+                "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+            ).rowcount
+            self._db.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+        return deleted > 0
+
+    def list_ids(self) -> list[str]:
+        return [row[0] for row in self._db.execute("SELECT id FROM conversations")]
+
+    def delete_idle(self, max_idle_seconds: float) -> list[str]:
+        """Verwijder conversations die langer dan max_idle_seconds niet gebruikt zijn."""
+        cutoff = time.time() - max_idle_seconds
+        expired = [
+            row[0] for row in self._db.execute(
+                "SELECT id FROM conversations WHERE last_access < ?", (cutoff,)
+            )
+        ]
+        for conversation_id in expired:
+            self.delete(conversation_id)
+        return expired
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,235 @@
+"""Begrensde conversation store met summary compaction en LRU/TTL eviction."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .conversation import StoredConversation, StoredMessage
+from .sqlite import SQLiteBackend
+from .summarizer import Summarizer
+
+
+class ConversationStore:
+    """
+    Drop-in vervanger voor ConversationManager.
+
+    - Token budget per conversation, incrementeel geteld bij elke message
+    - Boven het budget worden de oudste turns op de achtergrond samengevat
+      tot een rolling summary (de huidige turn wacht daar niet op)
+    - LRU eviction boven max_conversations, TTL expiry van idle conversations
+    - Optioneel write-through naar SQLite (overleeft een herstart)
+
+    Usage:
+        store = ConversationStore(default_system_prompt="...", max_history_tokens=6000)
+        conv = store.get_or_create("pi-123")
+        conv.add_user_message("Hoi!")
+        messages = conv.to_ollama_messages(system_prompt)
+    """
+
+    def __init__(
+        self,
+        default_system_prompt: str = "",
+        max_history_tokens: int = 6000,
+        compact_target_ratio: float = 0.6,
+        keep_recent_messages: int = 4,
+        max_conversations: int = 100,
+        idle_ttl_minutes: float = 60,
+        summarizer: Optional[Summarizer] = None,
+        backend: Optional[SQLiteBackend] = None
+    ):
+        self.default_system_prompt = default_system_prompt
+        self.max_history_tokens = max_history_tokens
+        self.compact_target_ratio = compact_target_ratio
+        self.keep_recent_messages = keep_recent_messages
+        self.max_conversations = max_conversations
+        self.idle_ttl_seconds = idle_ttl_minutes * 60
+        self.summarizer = summarizer
+        self.backend = backend
+
+        self._conversations: OrderedDict[str, StoredConversation] = OrderedDict()
+        self._compactions: dict[str, asyncio.Task] = {}
+        self._last_expiry_check = 0.0
+
+        # Metrics
+        self.compactions = 0
+        self.compaction_errors = 0
+        self.evicted = 0
+        self.expired = 0
+        self.loaded = 0
+
+    def get_or_create(
+        self,
+        conversation_id: str,
+        system_prompt: Optional[str] = None
+    ) -> StoredConversation:
+        """Haal conversation op (geheugen → SQLite) of maak een nieuwe."""
+        self._expire_idle()
+
+        conv = self._conversations.get(conversation_id)
+        if conv is None and self.backend is not None:
+            conv = self.backend.load(conversation_id)
+            if conv is not None:
+                self.loaded += 1
+
+        if conv is None:
+            conv = StoredConversation(
+                conversation_id=conversation_id,
+                system_prompt=system_prompt or self.default_system_prompt
+            )
+            if self.backend is not None:
+                self.backend.save_conversation(conv)
+
+        conv._on_message = self._on_message
+        conv.touch()
+        self._conversations[conversation_id] = conv
+        self._conversations.move_to_end(conversation_id)
+        self._evict_lru()
+        return conv
+
+    def delete(self, conversation_id: str) -> bool:
+        """Verwijder conversation uit geheugen en SQLite."""
+        task = self._compactions.pop(conversation_id, None)
+        if task is not None:
+            task.cancel()
+
+        found = self._conversations.pop(conversation_id, None) is not None
+        if self.backend is not None:
+            found = self.backend.delete(conversation_id) or found
+        return found
+
+    def list_all(self) -> dict:
+        """Overzicht van de conversations in geheugen."""
+        return {
+            conversation_id: {
+                "message_count": conv.message_count,
+                "tokens": conv.total_tokens,
+                "has_summary": bool(conv.summary),
+                "idle_s": round(time.time() - conv.last_access),
+                "system_prompt": conv.system_prompt[:50] + "..."
+            }
+            for conversation_id, conv in self._conversations.items()
+        }
+
+    def stats(self) -> dict:
+        return {
+            "in_memory": len(self._conversations),
+            "compacting": len(self._compactions),
+            "compactions": self.compactions,
+            "compaction_errors": self.compaction_errors,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "loaded_from_disk": self.loaded,
+            "persistent": self.backend is not None
+        }
+
+    async def aclose(self) -> None:
+        """Stop lopende compactions en sluit SQLite (bij shutdown)."""
+        for task in list(self._compactions.values()):
+            task.cancel()
+        if self._compactions:
+            await asyncio.gather(*self._compactions.values(), return_exceptions=True)
+        if self.backend is not None:
+            self.backend.close()
+
+    # ------------------------------------------------------------------
+    # Budget / compaction
+    # ------------------------------------------------------------------
+
+    def _on_message(self, conv: StoredConversation, message: StoredMessage) -> None:
+        if self.backend is not None:
+            self.backend.add_message(conv, message)
+        self._maybe_compact(conv)
+
+    def _maybe_compact(self, conv: StoredConversation) -> None:
+        """Start een achtergrond compaction als het budget overschreden is."""
+        if conv.total_tokens <= self.max_history_tokens or conv.compacting_until is not None:
+            return
+
+        until = self._compaction_cutoff(conv)
+        if until is None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Geen event loop (bijv. een script): volgende message opnieuw
+            return
+
+        conv.compacting_until = until
+        conversation_id = conv.conversation_id
+        task = loop.create_task(self._compact(conv, until))
+        self._compactions[conversation_id] = task
+        task.add_done_callback(lambda done: self._forget_compaction(conversation_id, done))
+
+    def _forget_compaction(self, conversation_id: str, task: asyncio.Task) -> None:
+        if self._compactions.get(conversation_id) is task:
+            del self._compactions[conversation_id]
+
+    def _compaction_cutoff(self, conv: StoredConversation) -> Optional[int]:
+        """
+        Seq t/m welke de oudste messages samengevat worden.
+
+        Haalt messages weg tot de history onder compact_target_ratio van het
+        budget zit, houdt altijd keep_recent_messages over en eindigt op een
+        assistant message (geen losse vraag zonder antwoord in de summary).
+        """
+        target = int(self.max_history_tokens * self.compact_target_ratio)
+        keep = max(self.keep_recent_messages, 0)
+        candidates = conv.messages[:len(conv.messages) - keep]
+
+        remaining = conv.total_tokens
+        until = None
+        for message in candidates:
+            if remaining <= target and (until is None or message.role == "user"):
+                break
+            remaining -= message.tokens
+            until = message.seq
+        return until
+
+    async def _compact(self, conv: StoredConversation, until: int) -> None:
+        old_messages = [message for message in conv.messages if message.seq <= until]
+        try:
+            summary = conv.summary
+            if self.summarizer is not None:
+                summary = await self.summarizer.summarize(conv.summary, old_messages)
+            conv.set_summary(summary)
+            self.compactions += 1
+        except asyncio.CancelledError:
+            conv.compacting_until = None
+            raise
+        except Exception as e:
+            # Budget blijft leidend: zonder summary vallen de oude turns gewoon weg
+            self.compaction_errors += 1
+            print(f"History compaction voor {conv.conversation_id} mislukt: {e}")
+
+        conv.drop_until(until)
+        if self.backend is not None:
+            self.backend.compact(conv, until)
+        conv.compacting_until = None
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict_lru(self) -> None:
+        """Houd max_conversations in geheugen (SQLite houdt ze wel)."""
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evicted += 1
+
+    def _expire_idle(self) -> None:
+        """Verwijder conversations die langer dan de TTL idle zijn (max 1x per minuut)."""
+        now = time.time()
+        if self.idle_ttl_seconds <= 0 or now - self._last_expiry_check < 60:
+            return
+        self._last_expiry_check = now
+
+        cutoff = now - self.idle_ttl_seconds
+        for conversation_id in [
+            cid for cid, conv in self._conversations.items() if conv.last_access < cutoff
+        ]:
+            self.delete(conversation_id)
+            self.expired += 1
+
+        if self.backend is not None:
+            self.expired += len(self.backend.delete_idle(self.idle_ttl_seconds))
@@ -0,0 +1,62 @@
+"""Samenvatten van oude turns via de LLM (voor history compaction)."""
+from typing import Callable, Optional, Protocol, runtime_checkable
+
+from ..services.admission import Priority, admission_context
+from ..services.llm import LLMProvider
+from .conversation import StoredMessage
+
+SUMMARY_INSTRUCTION = (
+    "Je vat een gesprek tussen een gebruiker en de robot NerdCarX samen. "
+    "Schrijf maximaal 5 korte zinnen in het Nederlands. Bewaar namen, feiten, "
+    "voorkeuren en afspraken die later in het gesprek nog nodig kunnen zijn. "
+    "Geen inleiding, alleen de samenvatting."
+)
+
+
+@runtime_checkable
+class Summarizer(Protocol):
+    """Protocol voor history summarizers."""
+
+    async def summarize(self, previous_summary: str, messages: list[StoredMessage]) -> str:
+        """Maak een nieuwe rolling summary van de vorige summary plus deze messages."""
+        ...
+
+
+class LLMSummarizer:
+    """
+    Summarizer die de chat LLM zelf gebruikt.
+
+    De LLM wordt per call opgehaald, zodat een config reload of de pooled
+    client meteen gebruikt wordt.
+    """
+
+    def __init__(
+        self,
+        get_llm: Callable[[], LLMProvider],
+        temperature: float = 0.2,
+        num_ctx: Optional[int] = None
+    ):
+        self.get_llm = get_llm
+        self.temperature = temperature
+        self.num_ctx = num_ctx
+
+    async def summarize(self, previous_summary: str, messages: list[StoredMessage]) -> str:
+        transcript = "\n".join(
+            f"{'Gebruiker' if message.role == 'user' else 'NerdCarX'}: {message.content}"
+            for message in messages
+        )
+        if previous_summary:
+            transcript = f"Eerdere samenvatting: {previous_summary}\n\n{transcript}"
+
+        # Achtergrond werk: wacht achter interactieve turns en vision bij een drukke Ollama
+        with admission_context(priority=Priority.BACKGROUND):
+            response = await self.get_llm().chat(
+                messages=[
+                    {"role": "system", "content": SUMMARY_INSTRUCTION},
+                    {"role": "user", "content": transcript}
+                ],
+                tools=None,
+                temperature=self.temperature,
+                num_ctx=self.num_ctx
+            )
+        return response.content.strip()
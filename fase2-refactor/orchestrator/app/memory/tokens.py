@@ -0,0 +1,24 @@
+"""Goedkope token schatting voor het history budget."""
+
+# Gemiddeld aantal karakters per token voor Nederlandse tekst (Mistral tokenizer)
+CHARS_PER_TOKEN = 3.5
+
+# Vaste overhead per message (role + chat template tokens)
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Schat het aantal tokens van een tekst.
+
+    Geen echte tokenizer: we hoeven alleen te weten wanneer het budget
+    ongeveer vol zit, en dit wordt één keer per message berekend.
+    """
+    if not text:
+        return 0
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+def estimate_message_tokens(content: str) -> int:
+    """Tokens van één chat message inclusief template overhead."""
+    return estimate_tokens(content) + MESSAGE_OVERHEAD
@@ -0,0 +1,336 @@
+"""
+Gedeelde service instances en HTTP clients.
+
+De HTTP client pool wordt in de FastAPI lifespan aangemaakt (main.py) en
+gesloten. Routes en WebSocket handlers halen hun services hier op i.p.v.
+per request/turn nieuwe instances (en dus nieuwe connecties) te maken.
+"""
+from typing import Optional
+
+from .config import AppConfig, get_config
+from .memory import ConversationStore, LLMSummarizer, SQLiteBackend
+from .services import (
+    OllamaLLM,
+    VoxtralSTT,
+    FishAudioTTS,
+    TTSProvider,
+    TTSAudioCache,
+    CachedTTS,
+    PromptAssembler,
+    STTProvider,
+    AudioPreprocessor,
+    PreprocessingSTT,
+    TranscriptCache,
+    CachedSTT,
+    ToolScheduler,
+    ImagePreprocessor,
+    VisionCache,
+)
+from .services.admission import AdmissionController
+from .services.http import HTTPClientPool
+from .utils.text_normalization import ProsodyChunker, SentenceSegmenter, configure_normalizer
+
+# Global instances (lazy, reset bij config reload)
+_http_pool: Optional[HTTPClientPool] = None
+_llm: Optional[OllamaLLM] = None
+_stt: Optional[STTProvider] = None
+_tts: Optional[TTSProvider] = None
+
+# Tool scheduler (niet gereset bij config reload: lopende turns houden anders
+# hun eigen semaphores en gelden de limieten niet meer globaal)
+_tool_scheduler: Optional[ToolScheduler] = None
+
+# Admission control per backend (niet gereset bij config reload: lopende requests
+# houden hun slot bij de bestaande controller, en tool registries verwijzen ernaar)
+_admission: dict[str, AdmissionController] = {}
+
+# Conversation geheugen (niet gereset bij config reload: dan ben je de history kwijt)
+_conversation_store: Optional[ConversationStore] = None
+
+# Transcriptie cache (idem: keys bevatten het model, dus geldig over reloads heen)
+_transcript_cache: Optional[TranscriptCache] = None
+
+# TTS audio cache (idem: keys bevatten alle synthesis parameters)
+_tts_cache: Optional[TTSAudioCache] = None
+
+# Foto voorbewerking + beschrijving cache (gedeeld door de REST en WebSocket VisionTool)
+_vision_preprocessor: Optional[ImagePreprocessor] = None
+_vision_cache: Optional[VisionCache] = None
+
+# Prompt opbouw + prefix cache metrics (idem: metrics blijven over reloads heen)
+_prompt_assembler: Optional[PromptAssembler] = None
+
+
+def init_http_pool(config: AppConfig) -> HTTPClientPool:
+    """Maak een pooled client per backend (aangeroepen bij startup)."""
+    global _http_pool
+    _http_pool = HTTPClientPool()
+    for name in ("ollama", "voxtral", "tts"):
+        backend = getattr(config.http, name)
+        _http_pool.add(
+            name,
+            max_connections=backend.max_connections,
+            max_keepalive=backend.max_keepalive,
+            keepalive_expiry=backend.keepalive_expiry,
+            http2=backend.http2
+        )
+    reset_providers()
+    return _http_pool
+
+
+async def close_http_pool() -> None:
+    """Sluit alle pooled clients (aangeroepen bij shutdown)."""
+    global _http_pool
+    if _http_pool is not None:
+        await _http_pool.aclose()
+        _http_pool = None
+    reset_providers()
+
+
+def get_http_pool() -> Optional[HTTPClientPool]:
+    """Huidige HTTP client pool (None buiten de lifespan)."""
+    return _http_pool
+
+
+def get_http_client(name: str):
+    """Pooled client voor een backend, of None (services vallen dan terug op een eigen client)."""
+    return _http_pool.get(name) if _http_pool else None
+
+
+def get_llm() -> OllamaLLM:
+    global _llm
+    if _llm is None:
+        config = get_config()
+        _llm = OllamaLLM(
+            url=config.ollama.url,
+            model=config.ollama.model,
+            temperature=config.ollama.temperature,
+            top_p=config.ollama.top_p,
+            repeat_penalty=config.ollama.repeat_penalty,
+            num_ctx=config.ollama.num_ctx,
+            client=get_http_client("ollama"),
+            admission=get_admission("ollama")
+        )
+    return _llm
+
+
+def get_stt() -> STTProvider:
+    """Voxtral, met audio voorbewerking en transcriptie cache ervoor (als enabled)."""
+    global _stt
+    if _stt is None:
+        config = get_config()
+        _stt = VoxtralSTT(
+            url=config.voxtral.url,
+            model=config.voxtral.model,
+            temperature=config.voxtral.temperature,
+            client=get_http_client("voxtral"),
+            admission=get_admission("voxtral")
+        )
+        pre = config.stt_preprocess
+        if pre.enabled:
+            _stt = PreprocessingSTT(_stt, AudioPreprocessor(
+                trim=pre.trim,
+                silence_dbfs=pre.silence_dbfs,
+                dynamic_range_db=pre.dynamic_range_db,
+                padding_ms=pre.padding_ms,
+                normalize=pre.normalize,
+                target_dbfs=pre.target_dbfs,
+                max_gain_db=pre.max_gain_db,
+                encoding=pre.encoding
+            ))
+        if config.stt_cache.enabled:
+            _stt = CachedSTT(_stt, get_transcript_cache(), model=config.voxtral.model)
+    return _stt
+
+
+def get_transcript_cache() -> TranscriptCache:
+    global _transcript_cache
+    if _transcript_cache is None:
+        cache = get_config().stt_cache
+        _transcript_cache = TranscriptCache(
+            max_bytes=int(cache.max_memory_mb * 1024 * 1024),
+            disk_path=cache.disk_path,
+            disk_max_entries=cache.disk_max_entries
+        )
+    return _transcript_cache
+
+
+def close_transcript_cache() -> None:
+    """Sluit de SQLite laag van de transcriptie cache (aangeroepen bij shutdown)."""
+    global _transcript_cache
+    if _transcript_cache is not None:
+        _transcript_cache.close()
+        _transcript_cache = None
+
+
+def get_tts() -> TTSProvider:
+    """Fish Audio, met de audio cache ervoor (als enabled)."""
+    global _tts
+    if _tts is None:
+        config = get_config()
+        _tts = FishAudioTTS(
+            url=config.tts.url,
+            reference_id=config.tts.reference_id,
+            temperature=config.tts.temperature,
+            top_p=config.tts.top_p,
+            format=config.tts.format,
+            seed=config.tts.seed,
+            chunk_length=config.tts.stream_chunk_length,
+            min_segment_ms=config.tts.min_segment_ms,
+            sample_rate=config.tts.stream_sample_rate,
+            client=get_http_client("tts")
+        )
+        if config.tts_cache.enabled:
+            _tts = CachedTTS(_tts, get_tts_cache(), max_chars=config.tts_cache.max_chars)
+    return _tts
+
+
+def get_tts_cache() -> TTSAudioCache:
+    global _tts_cache
+    if _tts_cache is None:
+        cache = get_config().tts_cache
+        _tts_cache = TTSAudioCache(
+            max_bytes=int(cache.max_memory_mb * 1024 * 1024),
+            disk_path=cache.disk_path,
+            disk_max_entries=cache.disk_max_entries
+        )
+    return _tts_cache
+
+
+def close_tts_cache() -> None:
+    """Sluit de SQLite laag van de TTS cache (aangeroepen bij shutdown)."""
+    global _tts_cache
+    if _tts_cache is not None:
+        _tts_cache.close()
+        _tts_cache = None
+
+
+def create_chunker():
+    """Nieuwe chunker voor één LLM stream (tts.chunker: prosody of sentence)."""
+    tts = get_config().tts
+    if tts.chunker == "sentence":
+        return SentenceSegmenter()
+    return ProsodyChunker(
+        first_min_chars=tts.first_chunk_min_chars,
+        first_max_chars=tts.first_chunk_max_chars,
+        target_chars=tts.target_chunk_chars,
+        max_chars=tts.max_chunk_chars
+    )
+
+
+def get_tool_scheduler() -> ToolScheduler:
+    """Gedeelde tool scheduler: concurrency limieten gelden over alle turns heen."""
+    global _tool_scheduler
+    if _tool_scheduler is None:
+        tools = get_config().tools
+        _tool_scheduler = ToolScheduler(
+            default_timeout=tools.default_timeout,
+            max_concurrency=tools.max_concurrency,
+            timeouts=tools.timeouts,
+            limits=tools.concurrency
+        )
+    return _tool_scheduler
+
+
+def get_admission(name: str) -> Optional[AdmissionController]:
+    """Admission controller voor een GPU backend ("ollama", "voxtral"), None als uitgeschakeld."""
+    admission = get_config().admission
+    if not admission.enabled:
+        return None
+    if name not in _admission:
+        backend = getattr(admission, name)
+        _admission[name] = AdmissionController(
+            name,
+            concurrency=backend.concurrency,
+            max_queue=backend.max_queue,
+            queue_timeout_s=backend.queue_timeout_s
+        )
+    return _admission[name]
+
+
+def get_admission_stats() -> dict:
+    return {name: controller.stats() for name, controller in _admission.items()}
+
+
+def get_vision_preprocessor() -> ImagePreprocessor:
+    global _vision_preprocessor
+    if _vision_preprocessor is None:
+        vision = get_config().vision
+        _vision_preprocessor = ImagePreprocessor(
+            enabled=vision.preprocess,
+            max_side=vision.max_side,
+            jpeg_quality=vision.jpeg_quality
+        )
+    return _vision_preprocessor
+
+
+def get_vision_cache() -> VisionCache:
+    global _vision_cache
+    if _vision_cache is None:
+        vision = get_config().vision
+        _vision_cache = VisionCache(
+            ttl_s=vision.cache_ttl_s,
+            max_distance=vision.cache_max_distance,
+            max_entries=vision.cache_max_entries
+        )
+    return _vision_cache
+
+
+def get_conversation_store() -> ConversationStore:
+    """Gedeelde conversation store voor REST routes en WebSocket handlers."""
+    global _conversation_store
+    if _conversation_store is None:
+        config = get_config()
+        memory = config.memory
+        _conversation_store = ConversationStore(
+            default_system_prompt=config.system_prompt,
+            max_history_tokens=memory.max_history_tokens,
+            compact_target_ratio=memory.compact_target_ratio,
+            keep_recent_messages=memory.keep_recent_messages,
+            max_conversations=memory.max_conversations,
+            idle_ttl_minutes=memory.idle_ttl_minutes,
+            summarizer=LLMSummarizer(get_llm) if memory.summarize else None,
+            backend=SQLiteBackend(memory.sqlite_path) if memory.sqlite_path else None
+        )
+    return _conversation_store
+
+
+async def close_conversation_store() -> None:
+    """Stop lopende compactions en sluit SQLite (aangeroepen bij shutdown)."""
+    global _conversation_store
+    if _conversation_store is not None:
+        await _conversation_store.aclose()
+        _conversation_store = None
+
+
+def get_prompt_assembler() -> PromptAssembler:
+    """Gedeelde prompt assembler (één set prefix cache metrics voor alle routes)."""
+    global _prompt_assembler
+    if _prompt_assembler is None:
+        prompt = get_config().prompt
+        _prompt_assembler = PromptAssembler(
+            include_time=prompt.include_time,
+            state_role=prompt.state_role,
+            cache_slots=prompt.cache_slots
+        )
+    return _prompt_assembler
+
+
+def reset_providers() -> None:
+    """Vergeet service instances zodat ze met de huidige config opnieuw worden gemaakt."""
+    global _llm, _stt, _tts
+    _llm = None
+    _stt = None
+    _tts = None
+    if _tool_scheduler is not None:
+        tools = get_config().tools
+        _tool_scheduler.reconfigure(tools.default_timeout, tools.timeouts)
+    # Uitspraak regels uit config.yml (nieuwe regels = nieuwe TTS cache keys)
+    rules = get_config().text_normalization
+    configure_normalizer(
+        letters=rules.letters,
+        skip_acronyms=rules.skip_acronyms,
+        words=rules.words,
+        units=rules.units,
+        currencies=rules.currencies
+    )
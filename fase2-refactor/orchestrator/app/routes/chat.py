@@ -1,4 +1,5 @@
 """Chat en conversation endpoints."""
+import asyncio
 import base64
 import json
 import time
@@ -15,19 +16,46 @@ from ..models import (
     FunctionCall,
     EmotionInfo,
     EmotionManager,
-    ConversationManager,
 )
-from ..services import OllamaLLM, FishAudioTTS, VoxtralSTT, ToolRegistry, EmotionTool, VisionTool
-from ..utils import split_into_sentences
+from ..memory import ConversationStore
+from ..providers import (
+    get_llm,
+    get_stt,
+    get_tts,
+    create_chunker,
+    get_http_client,
+    get_conversation_store,
+    get_prompt_assembler,
+    get_tool_scheduler,
+    get_vision_preprocessor,
+    get_vision_cache,
+    get_admission,
+)
+from ..services import (
+    OllamaLLM,
+    ToolRegistry,
+    EmotionTool,
+    VisionTool,
+    SentenceStream,
+    TTSPipeline,
+    PromptState,
+    parse_tool_calls,
+)
+from ..services.admission import BackendOverloaded
+from ..utils.tracing import traced, traced_stream
 
 router = APIRouter(tags=["chat"])
 
 # Global managers (initialized at startup)
 _emotion_manager: Optional[EmotionManager] = None
-_conversation_manager: Optional[ConversationManager] = None
 _tool_registry: Optional[ToolRegistry] = None
 
 
+def overloaded_error(error: BackendOverloaded) -> HTTPException:
+    """Load shedding door admission control: 503 met Retry-After."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "2"})
+
+
 def get_emotion_manager() -> EmotionManager:
     global _emotion_manager
     if _emotion_manager is None:
@@ -40,14 +68,9 @@ def get_emotion_manager() -> EmotionManager:
     return _emotion_manager
 
 
-def get_conversation_manager() -> ConversationManager:
-    global _conversation_manager
-    if _conversation_manager is None:
-        config = get_config()
-        _conversation_manager = ConversationManager(
-            default_system_prompt=config.system_prompt
-        )
-    return _conversation_manager
+def get_conversation_manager() -> ConversationStore:
+    """Conversation history (gedeeld met de WebSocket handlers)."""
+    return get_conversation_store()
 
 
 def get_tool_registry() -> ToolRegistry:
@@ -60,54 +83,71 @@ def get_tool_registry() -> ToolRegistry:
             mock_image_path=config.vision.mock_image_path,
             pi_camera_url=config.vision.pi_camera_url,
             llm_url=config.ollama.url,
-            llm_model=config.ollama.model
+            llm_model=config.ollama.model,
+            client=get_http_client("ollama"),
+            preprocessor=get_vision_preprocessor(),
+            cache=get_vision_cache(),
+            admission=get_admission("ollama")
         ))
     return _tool_registry
 
 
-async def complete_tool_calls(
-    llm: OllamaLLM,
+async def execute_tool_calls(
     messages: list[dict],
     tool_calls: list[dict],
     tool_registry: ToolRegistry,
-    options: dict
-) -> tuple[str, list[FunctionCall]]:
+    content: str = ""
+) -> list[FunctionCall]:
     """
-    Voer tool calls uit en krijg finale response.
+    Voer tool calls uit en voeg assistant + tool messages toe aan messages.
 
-    Returns: (content, all_function_calls)
+    De calls lopen gelijktijdig (ToolScheduler); de tool messages staan in
+    dezelfde volgorde als de tool calls. content is de tekst die de LLM
+    naast de tool calls gaf.
+
+    Returns: uitgevoerde function calls
     """
-    all_function_calls = []
+    calls = parse_tool_calls(tool_calls)
 
     # Voeg assistant message met tool calls toe
     messages.append({
         "role": "assistant",
-        "content": "",
+        "content": content,
         "tool_calls": tool_calls
     })
 
-    # Voer elke tool call uit
-    for tc in tool_calls:
-        func = tc.get("function", {})
-        name = func.get("name", "")
-        args = func.get("arguments", {})
+    results = await get_tool_scheduler().run(
+        calls, lambda call: tool_registry.execute(call.name, call.arguments)
+    )
+    for result in results:
+        messages.append({
+            "role": "tool",
+            "content": result.content
+        })
+
+    return [FunctionCall(name=call.name, arguments=call.arguments) for call in calls]
 
-        # Parse arguments als string
-        if isinstance(args, str):
-            try:
-                args = json.loads(args)
-            except json.JSONDecodeError:
-                args = {}
 
-        all_function_calls.append(FunctionCall(name=name, arguments=args))
+async def complete_tool_calls(
+    llm: OllamaLLM,
+    messages: list[dict],
+    tool_calls: list[dict],
+    tool_registry: ToolRegistry,
+    options: dict,
+    content: str = ""
+) -> tuple[str, list[FunctionCall]]:
+    """
+    Voer tool calls uit en krijg finale response.
 
-        # Voer tool uit
-        tool_result = await tool_registry.execute(name, args)
+    Alleen side-effect tools (show_emotion, go_to_sleep) en content is al
+    tekst: dan is content het antwoord en volgt er geen tweede LLM pass.
 
-        messages.append({
-            "role": "tool",
-            "content": tool_result
-        })
+    Returns: (content, all_function_calls)
+    """
+    all_function_calls = await execute_tool_calls(messages, tool_calls, tool_registry, content)
+    names = [fc.name for fc in all_function_calls]
+    if not get_tool_scheduler().needs_followup(names, tool_registry, content):
+        return content, all_function_calls
 
     # Vraag om finale response (zonder tools)
     response = await llm.chat(
@@ -122,7 +162,7 @@ async def complete_tool_calls(
     # Check voor meer tool calls (recursief)
     if response.tool_calls:
         more_content, more_calls = await complete_tool_calls(
-            llm, messages, response.tool_calls, tool_registry, options
+            llm, messages, response.tool_calls, tool_registry, options, response.content
         )
         content = more_content
         all_function_calls.extend(more_calls)
@@ -131,6 +171,7 @@ async def complete_tool_calls(
 
 
 @router.post("/chat", response_model=ChatResponse)
+@traced("rest_chat")
 async def chat(request: ChatRequest):
     """
     Stuur een bericht naar de LLM (stateless).
@@ -155,14 +196,7 @@ async def chat(request: ChatRequest):
     # Get tools if enabled
     tools = tool_registry.get_definitions() if request.enable_tools else None
 
-    llm = OllamaLLM(
-        url=config.ollama.url,
-        model=config.ollama.model,
-        temperature=config.ollama.temperature,
-        top_p=config.ollama.top_p,
-        repeat_penalty=config.ollama.repeat_penalty,
-        num_ctx=config.ollama.num_ctx
-    )
+    llm = get_llm()
 
     try:
         response = await llm.chat(
@@ -178,7 +212,8 @@ async def chat(request: ChatRequest):
         if response.tool_calls:
             content, function_calls = await complete_tool_calls(
                 llm, messages, response.tool_calls, tool_registry,
-                {"temperature": temperature, "num_ctx": num_ctx}
+                {"temperature": temperature, "num_ctx": num_ctx},
+                response.content
             )
 
         return ChatResponse(
@@ -191,11 +226,14 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=503, detail="Ollama niet bereikbaar")
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Ollama timeout")
+    except BackendOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/conversation", response_model=ChatResponse)
+@traced("rest_conversation")
 async def conversation(request: ChatRequest):
     """
     Chat met conversation history, function calling, en emotion state.
@@ -215,35 +253,25 @@ async def conversation(request: ChatRequest):
     current_emotion = emotion_state.emotion
     was_auto_reset = emotion_state.auto_reset
 
-    # Voeg emotie context toe aan system prompt
-    emotion_context = f"\n\nJe huidige emotionele staat is: {current_emotion}. Verander deze alleen als de interactie daar aanleiding toe geeft."
-    enhanced_system_prompt = system_prompt + emotion_context
-
     # Get or create conversation
     conv = conversation_manager.get_or_create(conv_id, system_prompt)
 
     # Add user message
     conv.add_user_message(request.message)
 
-    # Build messages voor LLM
-    messages = conv.to_ollama_messages(enhanced_system_prompt)
-
-    # Add image to last user message if present
-    if request.image_base64:
-        messages[-1]["images"] = [request.image_base64]
-
     # Get tools
     tools = tool_registry.get_definitions() if request.enable_tools is not False else None
 
-    llm = OllamaLLM(
-        url=config.ollama.url,
-        model=config.ollama.model,
-        temperature=config.ollama.temperature,
-        top_p=config.ollama.top_p,
-        repeat_penalty=config.ollama.repeat_penalty,
-        num_ctx=config.ollama.num_ctx
+    # Build messages voor LLM: stabiele system prompt, emotie in de status message
+    prompts = get_prompt_assembler()
+    messages = prompts.build(
+        conv, system_prompt, tools,
+        PromptState(emotion=current_emotion),
+        images=[request.image_base64] if request.image_base64 else None
     )
 
+    llm = get_llm()
+
     try:
         # === TIMING: LLM START ===
         t_llm_start = time.perf_counter()
@@ -254,6 +282,7 @@ async def conversation(request: ChatRequest):
             temperature=temperature,
             num_ctx=num_ctx
         )
+        prompts.record(conv_id, response)
 
         function_calls = []
         content = response.content
@@ -261,7 +290,8 @@ async def conversation(request: ChatRequest):
         if response.tool_calls:
             content, function_calls = await complete_tool_calls(
                 llm, messages, response.tool_calls, tool_registry,
-                {"temperature": temperature, "num_ctx": num_ctx}
+                {"temperature": temperature, "num_ctx": num_ctx},
+                response.content
             )
 
         # === TIMING: LLM END ===
@@ -291,13 +321,7 @@ async def conversation(request: ChatRequest):
         normalized_text = None
 
         if config.tts.enabled and content.strip():
-            tts = FishAudioTTS(
-                url=config.tts.url,
-                reference_id=config.tts.reference_id,
-                temperature=config.tts.temperature,
-                top_p=config.tts.top_p,
-                format=config.tts.format
-            )
+            tts = get_tts()
             audio_base64, normalized_text = await tts.synthesize_base64(content)
 
         # === TIMING: TTS END ===
@@ -323,6 +347,8 @@ async def conversation(request: ChatRequest):
         raise HTTPException(status_code=503, detail="Ollama niet bereikbaar")
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Ollama timeout")
+    except BackendOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -331,7 +357,8 @@ async def conversation(request: ChatRequest):
 async def conversation_streaming(request: ChatRequest):
     """
     Streaming conversation endpoint.
-    Stuurt LLM response als tekst, gevolgd door TTS audio per zin als SSE events.
+    Streamt de LLM en stuurt TTS audio per zin als SSE events zodra een zin
+    compleet is, gevolgd door metadata (volledige tekst, emotie, tool calls).
     """
     config = get_config()
     emotion_manager = get_emotion_manager()
@@ -348,48 +375,89 @@ async def conversation_streaming(request: ChatRequest):
     current_emotion = emotion_state.emotion
     was_auto_reset = emotion_state.auto_reset
 
-    emotion_context = f"\n\nJe huidige emotionele staat is: {current_emotion}. Verander deze alleen als de interactie daar aanleiding toe geeft."
-    enhanced_system_prompt = system_prompt + emotion_context
-
     # Get or create conversation
     conv = conversation_manager.get_or_create(conv_id, system_prompt)
     conv.add_user_message(request.message)
 
-    messages = conv.to_ollama_messages(enhanced_system_prompt)
-
     tools = tool_registry.get_definitions() if request.enable_tools is not False else None
 
-    llm = OllamaLLM(
-        url=config.ollama.url,
-        model=config.ollama.model,
-        temperature=config.ollama.temperature,
-        top_p=config.ollama.top_p,
-        repeat_penalty=config.ollama.repeat_penalty,
-        num_ctx=config.ollama.num_ctx
-    )
+    prompts = get_prompt_assembler()
+    messages = prompts.build(conv, system_prompt, tools, PromptState(emotion=current_emotion))
+
+    llm = get_llm()
 
     async def generate_stream():
+        pipeline = None
+        producer = None
         try:
-            # LLM call
-            t_llm_start = time.perf_counter()
-            response = await llm.chat(
-                messages=messages,
-                tools=tools,
-                temperature=temperature,
-                num_ctx=num_ctx
-            )
-
-            function_calls = []
-            content = response.content
-
-            if response.tool_calls:
-                content, function_calls = await complete_tool_calls(
-                    llm, messages, response.tool_calls, tool_registry,
-                    {"temperature": temperature, "num_ctx": num_ctx}
+            # Zinnen gaan een TTS pipeline in: zin N+1 wordt al gesynthetiseerd
+            # terwijl zin N naar de client gaat
+            if config.tts.enabled:
+                pipeline = TTSPipeline(
+                    get_tts().synthesize_base64,
+                    lookahead=config.tts.pipeline_lookahead
                 )
 
-            t_llm_end = time.perf_counter()
-            timing_llm_ms = round((t_llm_end - t_llm_start) * 1000)
+            t_llm_start = time.perf_counter()
+            timing_first_audio_ms = None
+            sentence_index = 0
+
+            async def produce():
+                """LLM stream (incl. tool calls); elke complete zin gaat direct naar TTS."""
+                parts = []
+                function_calls = []
+                stream_tools = tools
+                try:
+                    while True:
+                        stream = SentenceStream(
+                            llm, messages,
+                            tools=stream_tools,
+                            temperature=temperature,
+                            num_ctx=num_ctx,
+                            chunker=create_chunker()
+                        )
+                        async for sentence in stream:
+                            if pipeline is not None:
+                                await pipeline.submit(sentence)
+
+                        response = stream.response
+                        prompts.record(conv_id, response)
+                        parts.append(response.content.strip())
+                        if not response.tool_calls:
+                            break
+
+                        calls = await execute_tool_calls(
+                            messages, response.tool_calls, tool_registry, response.content
+                        )
+                        function_calls += calls
+                        if not get_tool_scheduler().needs_followup(
+                            [fc.name for fc in calls], tool_registry, response.content
+                        ):
+                            break
+                        stream_tools = None
+                finally:
+                    if pipeline is not None:
+                        pipeline.close()
+
+                llm_ms = round((time.perf_counter() - t_llm_start) * 1000)
+                return " ".join(part for part in parts if part), function_calls, llm_ms
+
+            producer = asyncio.create_task(produce())
+
+            if pipeline is not None:
+                async for index, sentence, (audio_b64, normalized) in pipeline.results():
+                    if timing_first_audio_ms is None:
+                        timing_first_audio_ms = round((time.perf_counter() - t_llm_start) * 1000)
+                    audio_event = {
+                        "sentence": sentence,
+                        "normalized": normalized,
+                        "audio_base64": audio_b64,
+                        "index": index
+                    }
+                    sentence_index += 1
+                    yield f"event: audio\ndata: {json.dumps(audio_event)}\n\n"
+
+            content, function_calls, timing_llm_ms = await producer
 
             # Check emotion changes
             emotion_changed = False
@@ -402,7 +470,7 @@ async def conversation_streaming(request: ChatRequest):
 
             conv.add_assistant_message(content)
 
-            # Send metadata first
+            # Metadata na de stream (volledige tekst is pas nu bekend)
             metadata = {
                 "response": content,
                 "emotion": {
@@ -411,40 +479,25 @@ async def conversation_streaming(request: ChatRequest):
                     "auto_reset": was_auto_reset
                 },
                 "function_calls": [{"name": fc.name, "arguments": fc.arguments} for fc in function_calls],
-                "timing_ms": {"llm": timing_llm_ms}
+                "timing_ms": {"llm": timing_llm_ms, "first_audio": timing_first_audio_ms}
             }
             yield f"event: metadata\ndata: {json.dumps(metadata)}\n\n"
 
-            # TTS per sentence
-            if config.tts.enabled and content.strip():
-                tts = FishAudioTTS(
-                    url=config.tts.url,
-                    reference_id=config.tts.reference_id,
-                    temperature=config.tts.temperature,
-                    top_p=config.tts.top_p,
-                    format=config.tts.format
-                )
-
-                sentences = split_into_sentences(content)
-                for i, sentence in enumerate(sentences):
-                    audio_b64, normalized = await tts.synthesize_base64(sentence)
-                    audio_event = {
-                        "sentence": sentence,
-                        "normalized": normalized,
-                        "audio_base64": audio_b64,
-                        "index": i
-                    }
-                    yield f"event: audio\ndata: {json.dumps(audio_event)}\n\n"
-
-                yield f"event: done\ndata: {json.dumps({'total_sentences': len(sentences)})}\n\n"
-            else:
-                yield f"event: done\ndata: {json.dumps({'total_sentences': 0})}\n\n"
+            yield f"event: done\ndata: {json.dumps({'total_sentences': sentence_index})}\n\n"
 
+        except BackendOverloaded as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e), 'code': 'overloaded'})}\n\n"
         except Exception as e:
             yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            # Client weg of fout: stop LLM stream en lopende TTS requests
+            if producer is not None:
+                producer.cancel()
+            if pipeline is not None:
+                pipeline.cancel()
 
     return StreamingResponse(
-        generate_stream(),
+        traced_stream("rest_conversation_streaming", generate_stream(), conversation_id=conv_id),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -455,6 +508,7 @@ async def conversation_streaming(request: ChatRequest):
 
 
 @router.post("/audio-conversation")
+@traced("rest_audio_conversation")
 async def audio_conversation(
     audio: UploadFile = File(..., description="WAV audio bestand"),
     conversation_id: Optional[str] = Form(default="default"),
@@ -477,11 +531,7 @@ async def audio_conversation(
 
     try:
         # === STT ===
-        stt = VoxtralSTT(
-            url=config.voxtral.url,
-            model=config.voxtral.model,
-            temperature=config.voxtral.temperature
-        )
+        stt = get_stt()
         user_text = await stt.transcribe(audio_bytes, language=language)
 
         if not user_text.strip():
@@ -491,32 +541,27 @@ async def audio_conversation(
         emotion_state = emotion_manager.get_state(conversation_id)
         current_emotion = emotion_state.emotion
 
-        emotion_context = f"\n\nJe huidige emotionele staat is: {current_emotion}."
-        system_prompt = config.system_prompt + emotion_context
-
         conv = conversation_manager.get_or_create(conversation_id, config.system_prompt)
         conv.add_user_message(user_text)
 
-        messages = conv.to_ollama_messages(system_prompt)
         tools = tool_registry.get_definitions()
-
-        llm = OllamaLLM(
-            url=config.ollama.url,
-            model=config.ollama.model,
-            temperature=config.ollama.temperature,
-            top_p=config.ollama.top_p,
-            repeat_penalty=config.ollama.repeat_penalty,
-            num_ctx=config.ollama.num_ctx
+        prompts = get_prompt_assembler()
+        messages = prompts.build(
+            conv, config.system_prompt, tools, PromptState(emotion=current_emotion)
         )
 
+        llm = get_llm()
+
         response = await llm.chat(messages=messages, tools=tools)
+        prompts.record(conversation_id, response)
         content = response.content
         function_calls = []
 
         if response.tool_calls:
             content, function_calls = await complete_tool_calls(
                 llm, messages, response.tool_calls, tool_registry,
-                {"temperature": config.ollama.temperature, "num_ctx": config.ollama.num_ctx}
+                {"temperature": config.ollama.temperature, "num_ctx": config.ollama.num_ctx},
+                response.content
             )
 
         conv.add_assistant_message(content)
@@ -533,13 +578,7 @@ async def audio_conversation(
         normalized_text = None
 
         if config.tts.enabled and content.strip():
-            tts = FishAudioTTS(
-                url=config.tts.url,
-                reference_id=config.tts.reference_id,
-                temperature=config.tts.temperature,
-                top_p=config.tts.top_p,
-                format=config.tts.format
-            )
+            tts = get_tts()
             audio_base64, normalized_text = await tts.synthesize_base64(content)
 
         # Return response
@@ -572,6 +611,8 @@ async def audio_conversation(
         raise HTTPException(status_code=504, detail="Service timeout")
     except HTTPException:
         raise
+    except BackendOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,8 +1,23 @@
 """Health check en status endpoints."""
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
 from ..config import get_config, reload_config
-from ..services import OllamaLLM, VoxtralSTT, FishAudioTTS
+from ..providers import (
+    get_llm,
+    get_stt,
+    get_tts,
+    get_http_pool,
+    get_conversation_store,
+    get_prompt_assembler,
+    get_tool_scheduler,
+    get_vision_preprocessor,
+    get_vision_cache,
+    get_admission_stats,
+    reset_providers,
+)
+from ..services import CachedSTT, CachedTTS, PreprocessingSTT
+from ..utils.tracing import get_tracer
 
 router = APIRouter(tags=["health"])
 
@@ -30,23 +45,71 @@ async def status():
     }
 
     # Check Ollama
-    llm = OllamaLLM(url=config.ollama.url)
-    results["ollama"] = "ok" if await llm.health_check() else "unreachable"
+    results["ollama"] = "ok" if await get_llm().health_check() else "unreachable"
 
     # Check Voxtral
-    stt = VoxtralSTT(url=config.voxtral.url)
-    results["voxtral"] = "ok" if await stt.health_check() else "unreachable"
+    results["voxtral"] = "ok" if await get_stt().health_check() else "unreachable"
 
     # Check TTS
     if config.tts.enabled:
-        tts = FishAudioTTS(url=config.tts.url)
-        results["tts"] = "ok" if await tts.health_check() else "unreachable"
+        results["tts"] = "ok" if await get_tts().health_check() else "unreachable"
     else:
         results["tts"] = "disabled"
 
+    # Connection pool metrics per backend
+    http_pool = get_http_pool()
+    results["http_pools"] = http_pool.stats() if http_pool else {}
+
+    # Conversation geheugen (compactions, eviction)
+    results["memory"] = get_conversation_store().stats()
+
+    # Ollama prefix cache hergebruik (verwacht vs geobserveerd)
+    results["prompt_cache"] = get_prompt_assembler().stats()
+
+    # Transcriptie cache en audio voorbewerking vóór STT
+    stt = get_stt()
+    if isinstance(stt, CachedSTT):
+        results["stt_cache"] = stt.stats()
+        stt = stt.stt
+    if isinstance(stt, PreprocessingSTT):
+        results["stt_preprocess"] = stt.stats()
+
+    # TTS audio cache (hit rate, GPU tijd bespaard)
+    tts = get_tts()
+    if isinstance(tts, CachedTTS):
+        results["tts_cache"] = tts.stats()
+
+    # Tool calls: gelijktijdige batches, latency/timeouts per tool
+    results["tools"] = get_tool_scheduler().stats()
+
+    # Foto voorbewerking (bytes bespaard) en beschrijving cache
+    results["vision"] = {**get_vision_preprocessor().stats(), "cache": get_vision_cache().stats()}
+
+    # Admission control: actieve/wachtende requests per backend, load shedding
+    results["admission"] = get_admission_stats()
+
     return results
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Span histogrammen in Prometheus text format (voor scraping)."""
+    return get_tracer().render_prometheus()
+
+
+@router.get("/traces")
+async def traces(limit: int = 20):
+    """Percentielen per span plus de laatste traces (JSON)."""
+    tracer = get_tracer()
+    recent = list(tracer.recent)[-limit:] if limit > 0 else []
+    return {
+        "traces": tracer.traces,
+        "errors": tracer.errors,
+        "latency": tracer.summary(),
+        "recent": [trace.to_dict() for trace in reversed(recent)]
+    }
+
+
 @router.get("/config")
 async def get_current_config():
     """Toon huidige configuratie (voor debugging)."""
@@ -80,7 +143,8 @@ async def get_current_config():
             "temperature": config.tts.temperature,
             "top_p": config.tts.top_p,
             "format": config.tts.format,
-            "streaming": config.tts.streaming
+            "streaming": config.tts.streaming,
+            "stream_audio": config.tts.stream_audio
         },
         "websocket": {
             "enabled": config.websocket.enabled,
@@ -109,6 +173,7 @@ async def do_reload_config():
     """Herlaad config.yml (hot reload)."""
     try:
         config = reload_config()
+        reset_providers()
         return {
             "status": "ok",
             "message": "Config herladen",
@@ -6,10 +6,17 @@ from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 
 from ..config import get_config
-from ..models import EmotionManager, ConversationManager
+from ..models import EmotionManager
+from ..providers import (
+    get_http_client,
+    get_conversation_store,
+    get_vision_preprocessor,
+    get_vision_cache,
+    get_admission,
+)
 from ..services.tools import ToolRegistry, EmotionTool, VisionTool, SleepTool
 from ..utils import ConversationDebugger
-from ..websocket import ConnectionManager, MessageHandler
+from ..websocket import ConnectionManager, MessageHandler, AudioStreamManager
 
 router = APIRouter(tags=["websocket"])
 
@@ -39,17 +46,17 @@ def get_message_handler() -> MessageHandler:
             available_emotions=config.emotions.available
         )
 
-        conversation_manager = ConversationManager(
-            default_system_prompt=config.system_prompt
-        )
-
         tool_registry = ToolRegistry()
         tool_registry.register(EmotionTool(available_emotions=config.emotions.available))
         tool_registry.register(VisionTool(
             mock_image_path=config.vision.mock_image_path,
             pi_camera_url=config.vision.pi_camera_url,
             llm_url=config.ollama.url,
-            llm_model=config.ollama.model
+            llm_model=config.ollama.model,
+            client=get_http_client("ollama"),
+            preprocessor=get_vision_preprocessor(),
+            cache=get_vision_cache(),
+            admission=get_admission("ollama")
         ))
         tool_registry.register(SleepTool())
 
@@ -63,9 +70,13 @@ def get_message_handler() -> MessageHandler:
         _message_handler = MessageHandler(
             connection_manager=get_connection_manager(),
             emotion_manager=emotion_manager,
-            conversation_manager=conversation_manager,
+            conversation_manager=get_conversation_store(),
             tool_registry=tool_registry,
-            debugger=debugger
+            debugger=debugger,
+            audio_streams=AudioStreamManager(
+                max_seconds=config.websocket.audio_stream_max_seconds
+            ),
+            speculation=config.speculation
         )
     return _message_handler
 
@@ -85,11 +96,14 @@ async def websocket_endpoint(
 
     Message format (JSON):
         {
-            "type": "audio_process|wake_word|heartbeat|sensor_update",
+            "type": "audio_process|audio_start|audio_frame|audio_end|wake_word|heartbeat|sensor_update|hello",
             "conversation_id": "default",
             "timestamp": 1234567890.123,
             "payload": {...}
         }
+
+    Na een hello met binary_audio=true mag audio ook als binary frame
+    (zie websocket/protocol.py: BinaryFrame) in beide richtingen.
     """
     config = get_config()
 
@@ -117,13 +131,24 @@ async def websocket_endpoint(
         message_queue: asyncio.Queue = asyncio.Queue()
 
         async def receive_loop():
-            """Ontvangt berichten en zet ze in de queue."""
+            """Ontvangt berichten (JSON tekst of binary audio frames) en zet ze in de queue."""
             try:
                 while True:
-                    data = await websocket.receive_text()
-                    await message_queue.put(data)
+                    event = await websocket.receive()
+                    if event["type"] == "websocket.disconnect":
+                        break
+                    data = event.get("text")
+                    if data is None:
+                        data = event.get("bytes")
+                    if data is not None:
+                        await message_queue.put(data)
             except WebSocketDisconnect:
-                await message_queue.put(None)  # Signal to stop
+                pass
+            await message_queue.put(None)  # Signal to stop
+
+        # Lopende handler tasks, zodat we ze bij disconnect kunnen annuleren
+        # (stopt ook LLM stream en TTS synthesis voor deze client)
+        handler_tasks: set[asyncio.Task] = set()
 
         async def process_loop():
             """Verwerkt berichten uit de queue."""
@@ -133,9 +158,11 @@ async def websocket_endpoint(
                     break
                 # Spawn message handling als aparte task
                 # zodat we direct door kunnen met ontvangen
-                asyncio.create_task(
+                task = asyncio.create_task(
                     message_handler.handle_message(client_id, data)
                 )
+                handler_tasks.add(task)
+                task.add_done_callback(handler_tasks.discard)
 
         # Run receive en process parallel
         receive_task = asyncio.create_task(receive_loop())
@@ -147,8 +174,8 @@ async def websocket_endpoint(
             return_when=asyncio.FIRST_COMPLETED
         )
 
-        # Cancel pending tasks
-        for task in pending:
+        # Cancel pending tasks en lopende handlers
+        for task in [*pending, *handler_tasks]:
             task.cancel()
             try:
                 await task
@@ -158,6 +185,9 @@ async def websocket_endpoint(
     except WebSocketDisconnect:
         pass
     finally:
+        message_handler.audio_streams.drop_client(client_id)
+        message_handler.speculator.drop_client(client_id)
+        message_handler.drop_client(client_id)
         await connection_manager.disconnect(client_id)
 
 
@@ -167,5 +197,8 @@ async def list_websocket_clients():
     connection_manager = get_connection_manager()
     return {
         "active_count": connection_manager.active_count,
-        "clients": connection_manager.list_clients()
+        "clients": connection_manager.list_clients(),
+        "audio_streams": get_message_handler().audio_streams.stats(),
+        "speculation": get_message_handler().speculator.stats(),
+        "interrupts": get_message_handler().interrupt_stats()
     }
@@ -1,19 +1,60 @@
 """Service abstractions voor swappable providers."""
-from .stt import STTProvider, VoxtralSTT
-from .llm import LLMProvider, OllamaLLM
-from .tts import TTSProvider, FishAudioTTS
-from .tools import Tool, EmotionTool, VisionTool, SleepTool, ToolRegistry
+from .stt import (
+    STTProvider,
+    VoxtralSTT,
+    AudioPreprocessor,
+    PreprocessingSTT,
+    TranscriptCache,
+    CachedSTT,
+)
+from .llm import LLMProvider, OllamaLLM, SentenceStream, LLMPrefetch, PromptAssembler, PromptState
+from .tts import TTSProvider, FishAudioTTS, TTSPipeline, StreamingTTSPipeline, TTSAudioCache, CachedTTS
+from .vision import ImagePreprocessor, VisionCache
+from .admission import AdmissionController, BackendOverloaded, Priority, admission_context
+from .tools import (
+    Tool,
+    EmotionTool,
+    VisionTool,
+    SleepTool,
+    ToolRegistry,
+    ToolCall,
+    ToolResult,
+    ToolScheduler,
+    parse_tool_calls,
+)
 
 __all__ = [
     "STTProvider",
     "VoxtralSTT",
+    "AudioPreprocessor",
+    "PreprocessingSTT",
+    "TranscriptCache",
+    "CachedSTT",
     "LLMProvider",
     "OllamaLLM",
+    "SentenceStream",
+    "LLMPrefetch",
+    "PromptAssembler",
+    "PromptState",
     "TTSProvider",
     "FishAudioTTS",
+    "TTSPipeline",
+    "StreamingTTSPipeline",
+    "TTSAudioCache",
+    "CachedTTS",
+    "ImagePreprocessor",
+    "VisionCache",
+    "AdmissionController",
+    "BackendOverloaded",
+    "Priority",
+    "admission_context",
     "Tool",
     "EmotionTool",
     "VisionTool",
     "SleepTool",
     "ToolRegistry",
+    "ToolCall",
+    "ToolResult",
+    "ToolScheduler",
+    "parse_tool_calls",
 ]
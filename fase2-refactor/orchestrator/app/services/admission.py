@@ -0,0 +1,240 @@
+"""
+Admission control per GPU backend (Ollama, Voxtral).
+
+Elk WebSocket bericht krijgt een eigen task, dus met meerdere Pi's of test
+clients gaan er ongelimiteerd veel requests tegelijk naar de GPU backends.
+Die queuen dan intern (zonder prioriteit) of gaan thrashen. Een
+AdmissionController laat per backend maximaal `concurrency` requests door;
+de rest wacht op volgorde van prioriteit (interactieve turns vóór vision
+analyse vóór achtergrond samenvattingen) en binnen een prioriteit round-robin
+per client. Bij een volle queue wordt de laagste prioriteit afgewezen
+(BackendOverloaded).
+
+Prioriteit en client komen uit ContextVars (net als de tracing), zodat niet
+elke call site ze hoeft door te geven:
+
+    with admission_context(client_id=client_id):          # per WebSocket bericht
+        ...
+    with admission_context(priority=Priority.BACKGROUND):  # bijv. summarizer
+        await llm.chat(...)
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import AsyncIterator, Iterator, Optional
+
+from ..utils.tracing import get_tracer
+
+
+class Priority(IntEnum):
+    """Lager = eerder aan de beurt."""
+    INTERACTIVE = 0     # Audio turns en chat requests (iemand wacht op antwoord)
+    VISION = 1          # Foto analyse (take_photo)
+    BACKGROUND = 2      # History samenvattingen
+
+
+_priority: ContextVar[Priority] = ContextVar("admission_priority", default=Priority.INTERACTIVE)
+_client: ContextVar[str] = ContextVar("admission_client", default="anonymous")
+
+
+@contextmanager
+def admission_context(
+    priority: Optional[Priority] = None,
+    client_id: Optional[str] = None
+) -> Iterator[None]:
+    """Zet prioriteit en/of client voor alle backend calls in dit blok (en child tasks)."""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if client_id is not None:
+        tokens.append((_client, _client.set(client_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class BackendOverloaded(Exception):
+    """Queue vol (of te lang gewacht): request afgewezen i.p.v. eindeloos wachten."""
+
+    def __init__(self, backend: str, priority: Priority, reason: str = "queue vol"):
+        self.backend = backend
+        self.priority = priority
+        self.reason = reason
+        super().__init__(f"{backend} overbelast ({reason}), probeer het zo opnieuw")
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    priority: Priority
+    client_id: str
+    enqueued_at: float
+
+
+class AdmissionController:
+    """
+    Begrenst gelijktijdige requests naar één backend.
+
+    Usage:
+        ollama = AdmissionController("ollama", concurrency=2, max_queue=16)
+        async with ollama.slot():
+            await client.post(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int = 2,
+        max_queue: int = 16,
+        queue_timeout_s: float = 30.0
+    ):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.active = 0
+        # Per prioriteit: client → wachtende requests (OrderedDict = round-robin volgorde)
+        self._queues: dict[Priority, OrderedDict[str, deque[_Waiter]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._queued = 0
+
+        # Metrics
+        self.admitted = 0
+        self.waited = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.max_queued = 0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None) -> AsyncIterator[None]:
+        """Wacht op een vrije plek (prioriteit/client uit de context als niet gegeven)."""
+        await self.acquire(priority if priority is not None else _priority.get(), _client.get())
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority, client_id: str) -> None:
+        if self.active < self.concurrency and not self._queued:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queue:
+            self._shed_for(priority)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, client_id, time.perf_counter())
+        self._queues[priority].setdefault(client_id, deque()).append(waiter)
+        self._queued += 1
+        self.waited += 1
+        self.max_queued = max(self.max_queued, self._queued)
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout_s or None)
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self.release()  # Plek was al toegewezen: doorgeven
+            else:
+                self._remove(waiter)
+            raise
+        finally:
+            get_tracer().record(f"admission.{self.name}.wait", (time.perf_counter() - waiter.enqueued_at) * 1000)
+
+        # Niet op de return van wait() vertrouwen: de plek kan net na de timeout toegewezen zijn
+        if not waiter.future.done():
+            self._remove(waiter)
+            self.timeouts += 1
+            raise BackendOverloaded(self.name, priority, f"{self.queue_timeout_s:g}s in de wachtrij")
+        waiter.future.result()  # BackendOverloaded als deze waiter verdrongen is
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Geef de plek door aan de volgende waiter (of maak hem vrij)."""
+        waiter = self._next_waiter()
+        if waiter is None:
+            self.active -= 1
+        else:
+            waiter.future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queued": {priority.name.lower(): sum(map(len, queue.values())) for priority, queue in self._queues.items()},
+            "max_queued": self.max_queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "shed": self.shed,
+            "timeouts": self.timeouts
+        }
+
+    def _shed_for(self, priority: Priority) -> None:
+        """
+        Queue vol: verdring de nieuwste waiter met de laagste prioriteit als
+        die lager is dan de nieuwe request, anders wijs de nieuwe af.
+        """
+        for lowest in sorted(Priority, reverse=True):
+            if lowest <= priority:
+                break
+            queue = self._queues[lowest]
+            if not queue:
+                continue
+            client_id = next(reversed(queue))
+            victim = queue[client_id].pop()
+            if not queue[client_id]:
+                del queue[client_id]
+            self._queued -= 1
+            self.shed += 1
+            victim.future.set_exception(BackendOverloaded(self.name, victim.priority, "verdrongen"))
+            return
+        self.shed += 1
+        raise BackendOverloaded(self.name, priority)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue:
+                client_id, waiters = next(iter(queue.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(client_id)  # Volgende client is eerst aan de beurt
+                else:
+                    del queue[client_id]
+                self._queued -= 1
+                if not waiter.future.done():
+                    return waiter
+        return None
+
+    def _remove(self, waiter: _Waiter) -> None:
+        waiters = self._queues[waiter.priority].get(waiter.client_id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del self._queues[waiter.priority][waiter.client_id]
+        self._queued -= 1
+
+
+@asynccontextmanager
+async def use_slot(
+    admission: Optional[AdmissionController],
+    priority: Optional[Priority] = None
+) -> AsyncIterator[None]:
+    """Slot van de controller, of direct door zonder controller (zoals use_client)."""
+    if admission is None:
+        yield
+        return
+    async with admission.slot(priority):
+        yield
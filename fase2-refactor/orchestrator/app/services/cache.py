@@ -0,0 +1,262 @@
+"""
+Gedeelde bouwstenen voor de service caches (STT transcripties, TTS audio).
+
+- BoundedCache: LRU in geheugen (begrensd in bytes) met een optionele
+  SQLite laag. Subclasses bepalen alleen de tabel, de kolommen en hoe een
+  waarde naar een rij gaat (en terug).
+- InflightCalls: gelijktijdige requests voor dezelfde key wachten op één
+  backend call in plaats van elk een eigen GPU call te doen.
+"""
+import asyncio
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class BoundedCache(Generic[V]):
+    """
+    LRU in geheugen (begrensd in bytes) met een optionele SQLite laag.
+
+    De SQLite laag overleeft een herstart en wordt begrensd op aantal
+    entries (oudste last_access eruit). Net als de conversation opslag zijn
+    dit kleine synchrone writes op een lokaal bestand.
+
+    Subclasses zetten table en columns (naam, SQL type) en implementeren
+    _value_size, _to_row en _from_row.
+    """
+
+    table: str = ""
+    columns: tuple[tuple[str, str], ...] = ()
+    # Geschatte overhead per entry bovenop key + waarde (dict slot, OrderedDict node, objecten)
+    entry_overhead_bytes: int = 200
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 10000
+    ):
+        self.max_bytes = max_bytes
+        self.disk_max_entries = disk_max_entries
+        self._entries: OrderedDict[str, V] = OrderedDict()
+        self.bytes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(self._schema())
+            self._db.commit()
+
+        # Metrics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0         # Echte backend calls (geteld door de wrapper)
+        self.coalesced = 0      # Meegelift op een lopende call voor dezelfde key
+        self.evictions = 0
+
+    def _value_size(self, value: V) -> int:
+        raise NotImplementedError
+
+    def _to_row(self, value: V) -> tuple:
+        raise NotImplementedError
+
+    def _from_row(self, row: tuple) -> V:
+        raise NotImplementedError
+
+    def _on_hit(self, value: V) -> None:
+        """Hook voor extra metrics per hit (geheugen of disk)."""
+
+    def get(self, key: str) -> Optional[V]:
+        """Waarde uit geheugen of disk (None bij een miss)."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._on_hit(value)
+            return value
+
+        if self._db is not None:
+            names = ", ".join(name for name, _ in self.columns)
+            row = self._db.execute(
+                f"SELECT {names} FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                with self._db:
+                    self._db.execute(
+                        f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key)
+                    )
+                value = self._from_row(row)
+                self._remember(key, value)
+                self.disk_hits += 1
+                self._on_hit(value)
+                return value
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Zonder metrics of LRU update (bijv. voor een warmup)."""
+        if key in self._entries:
+            return True
+        if self._db is None:
+            return False
+        return self._db.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key: str, value: V) -> None:
+        self._remember(key, value)
+        if self._db is None:
+            return
+        now = time.time()
+        placeholders = ", ".join("?" * (len(self.columns) + 3))
+        with self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES ({placeholders})",
+                (key, *self._to_row(value), now, now)
+            )
+        self._prune_disk()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+        if self._db is not None:
+            with self._db:
+                self._db.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        saved = self.hits + self.disk_hits + self.coalesced
+        lookups = saved + self.misses
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round(saved / lookups, 3) if lookups else 0.0
+        }
+        if self._db is not None:
+            stats["disk_entries"] = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return stats
+
+    def _schema(self) -> str:
+        columns = "".join(f"    {name} {sql_type},\n" for name, sql_type in self.columns)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.table} (\n"
+            f"    key TEXT PRIMARY KEY,\n{columns}"
+            f"    created_at REAL NOT NULL,\n"
+            f"    last_access REAL NOT NULL\n);\n"
+            f"CREATE INDEX IF NOT EXISTS {self.table}_last_access ON {self.table} (last_access);\n"
+        )
+
+    def _size(self, key: str, value: V) -> int:
+        return len(key) + self._value_size(value) + self.entry_overhead_bytes
+
+    def _remember(self, key: str, value: V) -> None:
+        if key in self._entries:
+            self.bytes -= self._size(key, self._entries.pop(key))
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            old_key, old_value = self._entries.popitem(last=False)
+            self.bytes -= self._size(old_key, old_value)
+            self.evictions += 1
+
+    def _prune_disk(self) -> None:
+        count = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = count - self.disk_max_entries
+        if excess <= 0:
+            return
+        # Ruim in één keer wat extra op, zodat dit niet bij elke put gebeurt
+        excess += self.disk_max_entries // 10
+        with self._db:
+            self._db.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+
+
+class InflightCalls(Generic[V]):
+    """
+    Lopende backend calls per key, zodat gelijke requests op elkaar wachten.
+
+    Usage:
+        inflight = calls.pending(key)
+        if inflight is not None:
+            value = await calls.wait(inflight)
+            if value is not None:
+                return value
+            # Origineel gecanceld: zelf doen
+        value = await calls.run(key, lambda: backend(...))
+
+    Voor calls die geen enkele awaitable zijn (bijv. een stream) zijn er
+    start/finish/fail.
+    """
+
+    def __init__(self):
+        self._futures: dict[str, asyncio.Future] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._futures
+
+    def pending(self, key: str) -> Optional[asyncio.Future]:
+        return self._futures.get(key)
+
+    @staticmethod
+    async def wait(future: asyncio.Future) -> Optional[V]:
+        """Resultaat van een lopende call, None als die gecanceld is (bijv. barge-in)."""
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise  # Deze task zelf is gecanceld
+            return None
+
+    async def run(self, key: str, call: Callable[[], Awaitable[V]]) -> V:
+        """Voer call uit; wie intussen voor dezelfde key wacht krijgt hetzelfde resultaat."""
+        future = self.start(key)
+        try:
+            value = await call()
+        except BaseException as e:
+            self.fail(key, future, e)
+            raise
+        self.finish(key, future, value)
+        return value
+
+    def start(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        return future
+
+    def finish(self, key: str, future: asyncio.Future, value: V) -> None:
+        self._forget(key, future)
+        future.set_result(value)
+
+    def fail(self, key: str, future: asyncio.Future, error: BaseException) -> None:
+        """Fout doorgeven aan de wachtenden; bij een cancel doen die het zelf."""
+        self._forget(key, future)
+        if isinstance(error, Exception):
+            future.set_exception(error)
+            # Niemand wacht? Dan geen "exception was never retrieved" warning
+            future.exception()
+        else:
+            future.cancel()
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._futures.get(key) is future:
+            del self._futures[key]
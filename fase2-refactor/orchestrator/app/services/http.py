@@ -0,0 +1,203 @@
+"""
+Gedeelde, connection-pooled HTTP clients per backend.
+
+Eén long-lived httpx.AsyncClient per backend (ollama, voxtral, tts) i.p.v.
+een nieuwe client per request. Dat scheelt TCP setup en pool creatie bij
+elke STT/LLM/TTS call, en bij per-zin TTS N keer per turn.
+"""
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+import httpx
+
+
+@dataclass
+class PoolStats:
+    """Request tellers per backend client."""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    created_at: float = field(default_factory=time.time)
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body die de in-flight teller pas verlaagt als de body dicht is."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, stats: PoolStats):
+        self.inner = inner
+        self.stats = stats
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self.stats.in_flight -= 1
+        await self.inner.aclose()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper die requests, fouten en in-flight requests telt.
+
+    In-flight loopt tot de response body gesloten is, zodat gestreamde
+    responses (Ollama chat_stream, Fish synthesize_stream) meetellen
+    zolang de connectie bezet is.
+    """
+
+    def __init__(self, inner: httpx.AsyncHTTPTransport, stats: PoolStats):
+        self.inner = inner
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        try:
+            response = await self.inner.handle_async_request(request)
+        except BaseException as e:
+            self.stats.in_flight -= 1
+            if isinstance(e, Exception):
+                self.stats.errors += 1
+            raise
+
+        response.stream = _CountingStream(response.stream, self.stats)
+        if response.status_code >= 500:
+            self.stats.errors += 1
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class HTTPClientPool:
+    """
+    Beheert een httpx.AsyncClient per backend.
+
+    Usage:
+        pool = HTTPClientPool()
+        pool.add("ollama", max_connections=4)
+        client = pool.get("ollama")
+        ...
+        await pool.aclose()
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._stats: dict[str, PoolStats] = {}
+        self._http2: dict[str, bool] = {}
+
+    def add(
+        self,
+        name: str,
+        max_connections: int = 10,
+        max_keepalive: int = 5,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 120.0
+    ) -> httpx.AsyncClient:
+        """
+        Maak een client voor een backend.
+
+        Args:
+            name: Backend naam (bijv. "ollama")
+            max_connections: Max gelijktijdige connecties
+            max_keepalive: Max idle keep-alive connecties
+            keepalive_expiry: Seconden dat een idle connectie open blijft
+            http2: HTTP/2 gebruiken (vereist het h2 package)
+            timeout: Default timeout (services geven per request hun eigen timeout mee)
+
+        Returns:
+            De nieuwe client
+        """
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print(f"HTTP/2 voor '{name}' gevraagd maar h2 niet geinstalleerd - fallback naar HTTP/1.1")
+                http2 = False
+
+        stats = PoolStats()
+        transport = _CountingTransport(
+            httpx.AsyncHTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive,
+                    keepalive_expiry=keepalive_expiry
+                )
+            ),
+            stats
+        )
+        client = httpx.AsyncClient(timeout=timeout, transport=transport)
+
+        self._clients[name] = client
+        self._stats[name] = stats
+        self._http2[name] = http2
+        return client
+
+    def get(self, name: str) -> Optional[httpx.AsyncClient]:
+        """Haal client op bij backend naam (None als niet aangemaakt)."""
+        return self._clients.get(name)
+
+    def stats(self) -> dict:
+        """Pool metrics per backend (voor /status)."""
+        result = {}
+        for name, client in self._clients.items():
+            stats = self._stats[name]
+            result[name] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "http2": self._http2[name],
+                "uptime_s": round(time.time() - stats.created_at),
+                **self._connection_stats(client)
+            }
+        return result
+
+    @staticmethod
+    def _connection_stats(client: httpx.AsyncClient) -> dict:
+        """
+        Open/idle connecties uit de httpcore pool.
+
+        httpx exposeert dit niet publiek; bij een andere transport
+        implementatie geven we gewoon geen connectie info terug.
+        """
+        transport = getattr(client, "_transport", None)
+        inner = getattr(transport, "inner", transport)
+        pool = getattr(inner, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        return {
+            "connections": len(connections),
+            "idle_connections": sum(1 for conn in connections if conn.is_idle())
+        }
+
+    async def aclose(self) -> None:
+        """Sluit alle clients (bij shutdown)."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+@asynccontextmanager
+async def use_client(
+    client: Optional[httpx.AsyncClient],
+    timeout: float
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Gebruik de gedeelde client, of een tijdelijke als er geen is.
+
+    Services zonder geinjecteerde client (scripts, tests) blijven zo werken.
+    """
+    if client is not None and not client.is_closed:
+        yield client
+        return
+
+    async with httpx.AsyncClient(timeout=timeout) as temp_client:
+        yield temp_client
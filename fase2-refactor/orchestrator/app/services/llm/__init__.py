@@ -1,5 +1,16 @@
 """LLM services."""
-from .base import LLMProvider, LLMResponse
+from .base import LLMProvider, LLMResponse, LLMChunk
 from .ollama import OllamaLLM
+from .streaming import SentenceStream, LLMPrefetch
+from .prompt import PromptAssembler, PromptState
 
-__all__ = ["LLMProvider", "LLMResponse", "OllamaLLM"]
+__all__ = [
+    "LLMProvider",
+    "LLMResponse",
+    "LLMChunk",
+    "OllamaLLM",
+    "SentenceStream",
+    "LLMPrefetch",
+    "PromptAssembler",
+    "PromptState",
+]
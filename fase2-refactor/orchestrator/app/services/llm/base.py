@@ -1,6 +1,6 @@
 """LLM Provider protocol."""
 from dataclasses import dataclass, field
-from typing import Optional, Protocol, runtime_checkable
+from typing import AsyncIterator, Optional, Protocol, runtime_checkable
 
 
 @dataclass
@@ -10,6 +10,24 @@ class LLMResponse:
     tool_calls: list[dict] = field(default_factory=list)
     model: str = ""
     done: bool = True
+    # Ollama eval counts (None als de backend ze niet meestuurt)
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    prompt_eval_ms: float = 0.0
+
+
+@dataclass
+class LLMChunk:
+    """
+    Eén stuk van een streaming LLM response.
+
+    Tussentijdse chunks bevatten een content delta en/of tool call deltas.
+    De laatste chunk heeft done=True en bevat de complete LLMResponse.
+    """
+    content: str = ""
+    tool_calls: list[dict] = field(default_factory=list)
+    done: bool = False
+    response: Optional[LLMResponse] = None
 
 
 @runtime_checkable
@@ -43,6 +61,21 @@ class LLMProvider(Protocol):
         """
         ...
 
+    def chat_stream(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        temperature: Optional[float] = None,
+        num_ctx: Optional[int] = None
+    ) -> AsyncIterator[LLMChunk]:
+        """
+        Stream de response token voor token.
+
+        Zelfde argumenten als chat(). Yieldt LLMChunk deltas, de laatste
+        chunk (done=True) bevat de geaggregeerde LLMResponse.
+        """
+        ...
+
     async def health_check(self) -> bool:
         """Check of de LLM service beschikbaar is."""
         ...
@@ -1,11 +1,23 @@
 """Ollama LLM implementation."""
 import json
 import re
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional
 
 import httpx
 
-from .base import LLMResponse
+from .base import LLMChunk, LLMResponse
+from ..admission import AdmissionController, use_slot
+from ..http import use_client
+from ...utils.tracing import get_tracer
+
+# Mistral text-based tool call format: functionname[ARGS]{json}
+TEXT_TOOL_CALL_PATTERN = re.compile(r'(\w+)\[ARGS\](\{[^}]+\})')
+
+
+def strip_text_tool_calls(text: str) -> str:
+    """Verwijder text-based tool calls (functionname[ARGS]{json}) uit tekst."""
+    return TEXT_TOOL_CALL_PATTERN.sub('', text).strip()
 
 
 class OllamaLLM:
@@ -16,6 +28,7 @@ class OllamaLLM:
     - Native tool calling support
     - Fallback text-based tool parsing
     - Vision support (images in messages)
+    - Token streaming via chat_stream()
     """
 
     def __init__(
@@ -26,7 +39,9 @@ class OllamaLLM:
         top_p: float = 1.0,
         repeat_penalty: float = 1.0,
         num_ctx: int = 65536,
-        timeout: float = 120.0
+        timeout: float = 120.0,
+        client: Optional[httpx.AsyncClient] = None,
+        admission: Optional[AdmissionController] = None
     ):
         self.url = url.rstrip("/")
         self.model = model
@@ -35,6 +50,10 @@ class OllamaLLM:
         self.repeat_penalty = repeat_penalty
         self.num_ctx = num_ctx
         self.timeout = timeout
+        # Gedeelde pooled client (zie services/http.py), anders per call een nieuwe
+        self.client = client
+        # Gedeelde admission control (zie services/admission.py), anders ongelimiteerd
+        self.admission = admission
 
     async def chat(
         self,
@@ -55,6 +74,106 @@ class OllamaLLM:
         Returns:
             LLMResponse met content en tool calls
         """
+        payload = self._build_payload(messages, tools, temperature, num_ctx, stream=False)
+
+        with get_tracer().span("llm", messages=len(messages), tools=bool(tools)) as span:
+            async with use_slot(self.admission), use_client(self.client, self.timeout) as client:
+                resp = await client.post(
+                    f"{self.url}/api/chat",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                resp.raise_for_status()
+                result = resp.json()
+
+            message = result.get("message", {})
+            response = self._build_response(
+                message.get("content", ""),
+                message.get("tool_calls", []),
+                result
+            )
+            span.attrs.update(self._eval_attrs(response))
+        return response
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        temperature: Optional[float] = None,
+        num_ctx: Optional[int] = None
+    ) -> AsyncIterator[LLMChunk]:
+        """
+        Stream chat response van Ollama (NDJSON, "stream": true).
+
+        Yieldt een LLMChunk per content delta of tool call delta zodra
+        Ollama die stuurt. De laatste chunk heeft done=True en bevat de
+        complete LLMResponse (incl. text-based tool call parsing).
+
+        Raises:
+            httpx.HTTPError: Bij verbindingsfouten
+            RuntimeError: Als Ollama midden in de stream een error meldt
+        """
+        payload = self._build_payload(messages, tools, temperature, num_ctx, stream=True)
+
+        content_parts: list[str] = []
+        tool_calls: list[dict] = []
+        final: dict = {}
+
+        tracer = get_tracer()
+        with tracer.span(
+            "llm", activate=False, messages=len(messages), tools=bool(tools), stream=True
+        ) as span:
+            t0 = time.perf_counter()
+            first_token = True
+
+            async with use_slot(self.admission), use_client(self.client, self.timeout) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.url}/api/chat",
+                    json=payload,
+                    timeout=self.timeout
+                ) as resp:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if not line.strip():
+                            continue
+
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise RuntimeError(f"Ollama stream error: {data['error']}")
+
+                        message = data.get("message", {})
+                        delta = message.get("content", "")
+                        delta_calls = message.get("tool_calls") or []
+
+                        if delta:
+                            content_parts.append(delta)
+                        if delta_calls:
+                            tool_calls.extend(delta_calls)
+                        if delta or delta_calls:
+                            if first_token:
+                                first_token = False
+                                tracer.record("llm.first_token", (time.perf_counter() - t0) * 1000)
+                            yield LLMChunk(content=delta, tool_calls=delta_calls)
+
+                        if data.get("done"):
+                            final = data
+                            break
+
+            response = self._build_response("".join(content_parts), tool_calls, final)
+            span.attrs.update(self._eval_attrs(response))
+
+        yield LLMChunk(done=True, response=response)
+
+    def _build_payload(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]],
+        temperature: Optional[float],
+        num_ctx: Optional[int],
+        stream: bool
+    ) -> dict:
+        """Bouw /api/chat payload (gedeeld door chat en chat_stream)."""
         options = {
             "temperature": temperature or self.temperature,
             "top_p": self.top_p,
@@ -65,7 +184,7 @@ class OllamaLLM:
         payload = {
             "model": self.model,
             "messages": messages,
-            "stream": False,
+            "stream": stream,
             "keep_alive": -1,
             "options": options
         }
@@ -73,18 +192,10 @@ class OllamaLLM:
         if tools:
             payload["tools"] = tools
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                f"{self.url}/api/chat",
-                json=payload
-            )
-            resp.raise_for_status()
-            result = resp.json()
-
-        message = result.get("message", {})
-        content = message.get("content", "")
-        tool_calls = message.get("tool_calls", [])
+        return payload
 
+    def _build_response(self, content: str, tool_calls: list[dict], result: dict) -> LLMResponse:
+        """Bouw LLMResponse, met fallback naar text-based tool calls."""
         # Als geen native tool calls, check voor text-based
         if not tool_calls and content:
             content, parsed_calls = self._parse_text_tool_calls(content)
@@ -95,9 +206,22 @@ class OllamaLLM:
             content=content,
             tool_calls=tool_calls,
             model=self.model,
-            done=True
+            done=True,
+            # Eval counts staan in de laatste (done) response van Ollama
+            prompt_eval_count=result.get("prompt_eval_count"),
+            eval_count=result.get("eval_count"),
+            prompt_eval_ms=result.get("prompt_eval_duration", 0) / 1e6
         )
 
+    @staticmethod
+    def _eval_attrs(response: LLMResponse) -> dict:
+        """Span attributen uit de Ollama eval counts."""
+        return {
+            "prompt_eval_count": response.prompt_eval_count,
+            "eval_count": response.eval_count,
+            "tool_calls": len(response.tool_calls)
+        }
+
     def _parse_text_tool_calls(self, content: str) -> tuple[str, list[dict]]:
         """
         Parse tool calls uit tekst (Mistral format).
@@ -107,8 +231,7 @@ class OllamaLLM:
         Returns:
             (cleaned_content, list of tool_call dicts)
         """
-        pattern = r'(\w+)\[ARGS\](\{[^}]+\})'
-        matches = re.findall(pattern, content)
+        matches = TEXT_TOOL_CALL_PATTERN.findall(content)
 
         tool_calls = []
         for name, args_str in matches:
@@ -124,14 +247,13 @@ class OllamaLLM:
                 continue
 
         # Remove tool call text from content
-        cleaned = re.sub(pattern, '', content).strip()
-        return cleaned, tool_calls
+        return strip_text_tool_calls(content), tool_calls
 
     async def health_check(self) -> bool:
         """Check of Ollama beschikbaar is."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.url}/api/tags")
+            async with use_client(self.client, 5.0) as client:
+                resp = await client.get(f"{self.url}/api/tags", timeout=5.0)
                 return resp.status_code == 200
         except Exception:
             return False
@@ -139,8 +261,8 @@ class OllamaLLM:
     async def get_models(self) -> Optional[list[str]]:
         """Haal beschikbare modellen op."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.url}/api/tags")
+            async with use_client(self.client, 5.0) as client:
+                resp = await client.get(f"{self.url}/api/tags", timeout=5.0)
                 resp.raise_for_status()
                 result = resp.json()
                 return [m["name"] for m in result.get("models", [])]
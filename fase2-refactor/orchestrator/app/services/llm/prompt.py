@@ -0,0 +1,254 @@
+"""
+Prompt opbouw die de prefix cache van Ollama heel laat.
+
+Ollama (llama.cpp) hergebruikt de KV cache voor het deel van de prompt dat
+byte-voor-byte gelijk is aan de vorige request. Alles wat per beurt
+verandert (emotie, tijd, sensoren) staat daarom NIET in de system prompt
+maar in een status message achteraan:
+
+    [system prompt]  [summary]  [history ... laatste user]  [status]
+     stabiel          stabiel    groeit alleen aan het eind   volatiel
+
+De status message wordt niet in de history opgeslagen, dus de volgende
+beurt kan alles t/m de vorige user message uit de cache halen.
+"""
+import hashlib
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from .base import LLMResponse
+from ...memory.conversation import StoredConversation
+from ...memory.tokens import estimate_message_tokens, estimate_tokens
+
+STATUS_PREFIX = "Actuele status (verandert per beurt):"
+
+_WEEKDAYS = ["maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
+_MONTHS = [
+    "januari", "februari", "maart", "april", "mei", "juni",
+    "juli", "augustus", "september", "oktober", "november", "december"
+]
+
+
+@dataclass
+class PromptState:
+    """Volatiele context voor één beurt (komt in de status message)."""
+    emotion: Optional[str] = None
+    sensors: dict = field(default_factory=dict)
+    now: Optional[datetime] = None
+
+    def render(self, include_time: bool = True) -> str:
+        lines = []
+        if self.emotion:
+            lines.append(
+                f"- Je huidige emotionele staat is: {self.emotion}. "
+                "Verander deze alleen als de interactie daar aanleiding toe geeft."
+            )
+        if include_time:
+            now = self.now or datetime.now()
+            lines.append(
+                f"- Het is nu {_WEEKDAYS[now.weekday()]} {now.day} "
+                f"{_MONTHS[now.month - 1]}, {now:%H:%M}."
+            )
+        if self.sensors:
+            readings = ", ".join(f"{key}={value}" for key, value in sorted(self.sensors.items()))
+            lines.append(f"- Sensoren: {readings}.")
+
+        if not lines:
+            return ""
+        return "\n".join([STATUS_PREFIX] + lines)
+
+
+def _fingerprint(message: dict) -> str:
+    """Hash van één message zoals hij naar Ollama gaat."""
+    encoded = json.dumps(message, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+@dataclass
+class _Request:
+    """Fingerprints + token schattingen van een opgebouwde prompt."""
+    conversation_id: str
+    fingerprints: list[str]
+    tokens: list[int]
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens)
+
+    def shared_prefix_tokens(self, other: "_Request") -> int:
+        shared = 0
+        for mine, theirs, tokens in zip(self.fingerprints, other.fingerprints, self.tokens):
+            if mine != theirs:
+                break
+            shared += tokens
+        return shared
+
+
+class PromptAssembler:
+    """
+    Bouwt LLM messages met een stabiele prefix en meet cache hergebruik.
+
+    - build(): system prompt + summary + history, status message achteraan
+    - record(): verwerkt prompt_eval_count uit de Ollama response
+
+    Hit rate meting: Ollama rapporteert in prompt_eval_count alleen de tokens
+    die opnieuw geëvalueerd zijn. Tegen de geschatte prompt grootte geeft dat
+    de geobserveerde hit rate. De verwachte hit rate is de gedeelde prefix
+    met de laatste cache_slots requests (OLLAMA_NUM_PARALLEL), zodat
+    zichtbaar wordt of een miss aan de prompt of aan Ollama ligt.
+
+    Usage:
+        prompts = PromptAssembler()
+        messages = prompts.build(conv, system_prompt, tools, PromptState(emotion="happy"))
+        response = await llm.chat(messages=messages, tools=tools)
+        prompts.record(conv.conversation_id, response)
+    """
+
+    def __init__(
+        self,
+        include_time: bool = True,
+        state_role: str = "system",
+        cache_slots: int = 1
+    ):
+        self.include_time = include_time
+        self.state_role = state_role
+        self.cache_slots = max(cache_slots, 1)
+
+        self._recent: deque[_Request] = deque(maxlen=self.cache_slots)
+        self._pending: dict[str, tuple[_Request, int]] = {}
+        self._tools_key: Optional[str] = None
+        self._tools_hash = ""
+        self._tools_tokens = 0
+
+        # Metrics
+        self.requests = 0
+        self.measured = 0
+        self.prompt_tokens = 0
+        self.expected_reused_tokens = 0
+        self.measured_prompt_tokens = 0
+        self.evaluated_tokens = 0
+        self.system_prompt_changes = 0
+        self._last_system_key: Optional[str] = None
+        self.last: dict = {}
+
+    def build(
+        self,
+        conv: StoredConversation,
+        system_prompt: Optional[str] = None,
+        tools: Optional[list[dict]] = None,
+        state: Optional[PromptState] = None,
+        images: Optional[list[str]] = None,
+        user_message: Optional[str] = None
+    ) -> list[dict]:
+        """
+        Messages voor de LLM.
+
+        Args:
+            conv: Conversation (laatste message is de user message van deze beurt)
+            system_prompt: Stabiele system prompt (default: die van de conversation)
+            tools: Tool definitions zoals ze naar Ollama gaan (tellen mee in de prefix)
+            state: Volatiele context, komt als laatste message
+            images: Base64 images voor de laatste user message (vision)
+            user_message: User message die nog niet in conv staat (speculatieve prefetch)
+        """
+        messages = self.render(conv, system_prompt, state, images, user_message)
+        self.register(conv.conversation_id, messages, tools)
+        return messages
+
+    def render(
+        self,
+        conv: StoredConversation,
+        system_prompt: Optional[str] = None,
+        state: Optional[PromptState] = None,
+        images: Optional[list[str]] = None,
+        user_message: Optional[str] = None
+    ) -> list[dict]:
+        """
+        Zelfde messages als build(), zonder ze als request te tellen.
+
+        Voor speculatieve prefetches: die tellen pas mee (register()) als
+        hun antwoord gebruikt wordt, anders vertekenen verworpen partials
+        de prefix cache metrics.
+        """
+        messages = conv.to_ollama_messages(system_prompt)
+        if user_message is not None:
+            messages.append({"role": "user", "content": user_message})
+        if images:
+            messages[-1]["images"] = images
+
+        status = state.render(self.include_time) if state else ""
+        if status:
+            messages.append({"role": self.state_role, "content": status})
+        return messages
+
+    def record(self, conversation_id: str, response: LLMResponse) -> None:
+        """Verwerk de eval counts van de eerste LLM call van een beurt."""
+        pending = self._pending.pop(conversation_id, None)
+        if pending is None:
+            return
+        request, expected = pending
+
+        self.last = {
+            "conversation_id": conversation_id,
+            "prompt_tokens_est": request.total_tokens,
+            "expected_reused_tokens": expected,
+            "prompt_eval_count": response.prompt_eval_count,
+            "prompt_eval_ms": round(response.prompt_eval_ms, 1)
+        }
+
+        if response.prompt_eval_count is None:
+            return
+        self.measured += 1
+        self.measured_prompt_tokens += request.total_tokens
+        self.evaluated_tokens += min(response.prompt_eval_count, request.total_tokens)
+
+    def stats(self) -> dict:
+        expected = self.expected_reused_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        observed = (
+            1 - self.evaluated_tokens / self.measured_prompt_tokens
+            if self.measured_prompt_tokens else 0.0
+        )
+        return {
+            "requests": self.requests,
+            "measured": self.measured,
+            "expected_hit_rate": round(expected, 3),
+            "observed_hit_rate": round(observed, 3),
+            "system_prompt_changes": self.system_prompt_changes,
+            "last": self.last
+        }
+
+    def register(self, conversation_id: str, messages: list[dict], tools: Optional[list[dict]]) -> None:
+        """Tel gerenderde messages als request: fingerprint en verwachte gedeelde prefix (response via record())."""
+        fingerprints = [self._tools_fingerprint(tools)]
+        tokens = [self._tools_tokens if tools else 0]
+        for message in messages:
+            fingerprints.append(_fingerprint(message))
+            tokens.append(estimate_message_tokens(message.get("content", "")))
+
+        system_key = fingerprints[0] + fingerprints[1]
+        if self._last_system_key is not None and system_key != self._last_system_key:
+            self.system_prompt_changes += 1
+        self._last_system_key = system_key
+
+        request = _Request(conversation_id, fingerprints, tokens)
+        expected = max((request.shared_prefix_tokens(other) for other in self._recent), default=0)
+
+        self._recent.append(request)
+        self._pending[conversation_id] = (request, expected)
+        self.requests += 1
+        self.prompt_tokens += request.total_tokens
+        self.expected_reused_tokens += expected
+
+    def _tools_fingerprint(self, tools: Optional[list[dict]]) -> str:
+        if not tools:
+            return ""
+        # Tools zijn per registry gelijk: alleen opnieuw hashen als de lijst wijzigt
+        key = json.dumps(tools, sort_keys=True, ensure_ascii=False)
+        if key != self._tools_key:
+            self._tools_key = key
+            self._tools_hash = hashlib.sha1(key.encode()).hexdigest()
+            self._tools_tokens = estimate_tokens(key)
+        return self._tools_hash
@@ -0,0 +1,143 @@
+"""LLM token stream → zinnen, voor TTS terwijl de LLM nog genereert."""
+import asyncio
+from typing import AsyncIterator, Optional, Union
+
+from .base import LLMProvider, LLMResponse, LLMChunk
+from .ollama import strip_text_tool_calls
+from ...utils.text_normalization import ProsodyChunker, SentenceSegmenter
+
+
+class SentenceStream:
+    """
+    Koppelt een chat_stream() aan een chunker (ProsodyChunker of SentenceSegmenter).
+
+    Yieldt elke chunk (zin, of bijzin/samengevoegde zinnen met de
+    ProsodyChunker) zodra die klaar is, zodat TTS kan starten voordat de
+    LLM klaar is. Na afloop staat de complete LLMResponse in .response.
+
+    Usage:
+        stream = SentenceStream(llm, messages, tools=tools, chunker=create_chunker())
+        async for sentence in stream:
+            await tts.synthesize(sentence)
+        response = stream.response
+    """
+
+    def __init__(
+        self,
+        llm: LLMProvider,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        temperature: Optional[float] = None,
+        num_ctx: Optional[int] = None,
+        source: Optional[AsyncIterator[LLMChunk]] = None,
+        chunker: Optional[Union[ProsodyChunker, SentenceSegmenter]] = None
+    ):
+        self.llm = llm
+        self.messages = messages
+        self.tools = tools
+        self.temperature = temperature
+        self.num_ctx = num_ctx
+        # Al lopende chunk stream (bijv. LLMPrefetch.replay()) i.p.v. een nieuwe call
+        self.source = source
+        # Eén chunker per stream (houdt state bij); standaard de oude zin splitsing
+        self.chunker = chunker or SentenceSegmenter()
+        self.response: Optional[LLMResponse] = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        segmenter = self.chunker
+
+        chunks = self.source or self.llm.chat_stream(
+            messages=self.messages,
+            tools=self.tools,
+            temperature=self.temperature,
+            num_ctx=self.num_ctx
+        )
+        async for chunk in chunks:
+            if chunk.done:
+                self.response = chunk.response
+                continue
+            for sentence in segmenter.feed(chunk.content):
+                sentence = strip_text_tool_calls(sentence)
+                if sentence:
+                    yield sentence
+
+        for sentence in segmenter.flush():
+            sentence = strip_text_tool_calls(sentence)
+            if sentence:
+                yield sentence
+
+
+class LLMPrefetch:
+    """
+    Een LLM stream die al loopt voordat zeker is dat hij nodig is.
+
+    De chunks worden gebufferd; replay() geeft eerst alles wat er al is en
+    volgt daarna de lopende stream. Wordt de prefetch niet gebruikt, dan
+    breekt cancel() de request naar de backend af.
+
+    Usage:
+        prefetch = LLMPrefetch(text, messages, tools, llm.chat_stream(messages=messages, tools=tools))
+        ...
+        stream = SentenceStream(llm, prefetch.messages, tools, source=prefetch.replay())
+    """
+
+    def __init__(
+        self,
+        text: str,
+        messages: list[dict],
+        tools: Optional[list[dict]],
+        chunks: AsyncIterator[LLMChunk]
+    ):
+        self.text = text
+        self.messages = messages
+        self.tools = tools
+        self.error: Optional[BaseException] = None
+        self._chunks: list[LLMChunk] = []
+        self._done = False
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(chunks))
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    async def replay(self) -> AsyncIterator[LLMChunk]:
+        """Alle chunks vanaf het begin (één consumer)."""
+        index = 0
+        while True:
+            while index < len(self._chunks):
+                yield self._chunks[index]
+                index += 1
+            if self._done:
+                if self.error is not None:
+                    raise self.error
+                return
+            self._changed.clear()
+            if index == len(self._chunks) and not self._done:
+                await self._changed.wait()
+
+    async def response(self) -> LLMResponse:
+        """Wacht op de complete response (non-streaming gebruik)."""
+        async for chunk in self.replay():
+            if chunk.done:
+                return chunk.response
+        raise RuntimeError("LLM stream eindigde zonder done chunk")
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _run(self, chunks: AsyncIterator[LLMChunk]) -> None:
+        try:
+            async for chunk in chunks:
+                self._chunks.append(chunk)
+                self._changed.set()
+        except (Exception, asyncio.CancelledError) as e:
+            # Fout of cancel: een consumer krijgt hem bij replay()
+            self.error = e
+        finally:
+            self._done = True
+            self._changed.set()
@@ -1,5 +1,14 @@
 """Speech-to-Text services."""
 from .base import STTProvider
 from .voxtral import VoxtralSTT
+from .preprocess import AudioPreprocessor, PreprocessingSTT
+from .cache import TranscriptCache, CachedSTT
 
-__all__ = ["STTProvider", "VoxtralSTT"]
+__all__ = [
+    "STTProvider",
+    "VoxtralSTT",
+    "AudioPreprocessor",
+    "PreprocessingSTT",
+    "TranscriptCache",
+    "CachedSTT",
+]
@@ -9,6 +9,8 @@ class STTProvider(Protocol):
 
     Implementaties:
     - VoxtralSTT (Voxtral Mini via vLLM)
+    - PreprocessingSTT (wrapper: trim/normalize/encode vóór een andere provider)
+    - CachedSTT (wrapper: transcriptie cache op audio fingerprint)
     - Toekomst: WhisperSTT, DeepgramSTT, etc.
     """
 
@@ -17,7 +19,7 @@ class STTProvider(Protocol):
         Transcribeer audio naar tekst.
 
         Args:
-            audio: Audio bytes (WAV format expected)
+            audio: Audio bytes (WAV; providers sniffen FLAC/Ogg zelf)
             language: Taalcode (default: nl)
 
         Returns:
@@ -0,0 +1,109 @@
+"""
+Transcriptie cache op basis van een audio fingerprint.
+
+Test harnesses, retries na netwerkfouten en /audio-conversation sturen vaak
+exact dezelfde audio opnieuw. De key is een hash van de PCM samples (WAV
+header en metadata tellen niet mee) plus taal en model; bij een hit is er
+geen STT call nodig.
+"""
+import hashlib
+import io
+import wave
+from typing import Optional
+
+from .base import STTProvider
+from ..cache import BoundedCache, InflightCalls
+from ...utils.tracing import get_tracer
+
+
+def audio_fingerprint(audio: bytes, language: str, model: str) -> str:
+    """
+    sha256 over de genormaliseerde PCM + taal + model.
+
+    WAV wordt gedecodeerd zodat alleen de samples (en het formaat) tellen;
+    andere formaten worden als ruwe bytes gehasht.
+    """
+    digest = hashlib.sha256(f"{model}\0{language}\0".encode())
+    try:
+        with wave.open(io.BytesIO(audio), "rb") as wf:
+            digest.update(f"{wf.getframerate()}:{wf.getnchannels()}:{wf.getsampwidth()}\0".encode())
+            digest.update(wf.readframes(wf.getnframes()))
+    except (wave.Error, EOFError):
+        digest.update(b"raw\0")
+        digest.update(audio)
+    return digest.hexdigest()
+
+
+class TranscriptCache(BoundedCache[str]):
+    """Transcripties op audio fingerprint (zie BoundedCache voor de geheugen + SQLite lagen)."""
+
+    table = "transcripts"
+    columns = (("text", "TEXT NOT NULL"),)
+
+    def __init__(
+        self,
+        max_bytes: int = 4 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 10000
+    ):
+        super().__init__(max_bytes, disk_path, disk_max_entries)
+
+    def _value_size(self, text: str) -> int:
+        return len(text.encode("utf-8"))
+
+    def _to_row(self, text: str) -> tuple:
+        return (text,)
+
+    def _from_row(self, row: tuple) -> str:
+        return row[0]
+
+
+class CachedSTT:
+    """
+    STTProvider wrapper met een TranscriptCache ervoor.
+
+    Gelijktijdige requests voor dezelfde audio (bijv. een retry terwijl het
+    origineel nog loopt) wachten op dezelfde STT call. Lege transcripties
+    worden niet gecached.
+    """
+
+    def __init__(self, stt: STTProvider, cache: TranscriptCache, model: str = ""):
+        self.stt = stt
+        self.cache = cache
+        self.model = model or getattr(stt, "model", type(stt).__name__)
+        self._calls: InflightCalls[str] = InflightCalls()
+
+    def __getattr__(self, name: str):
+        # Overige provider methods (get_models, ...) gaan direct door
+        return getattr(self.stt, name)
+
+    async def transcribe(self, audio: bytes, language: str = "nl") -> str:
+        tracer = get_tracer()
+        key = audio_fingerprint(audio, language, self.model)
+
+        text = self.cache.get(key)
+        if text is not None:
+            tracer.annotate(stt_cache="hit")
+            return text
+
+        inflight = self._calls.pending(key)
+        if inflight is not None:
+            self.cache.coalesced += 1
+            tracer.annotate(stt_cache="coalesced")
+            text = await self._calls.wait(inflight)
+            if text is not None:
+                return text
+            # De originele call is gecanceld (bijv. een partial): zelf doen
+
+        self.cache.misses += 1
+        text = await self._calls.run(key, lambda: self.stt.transcribe(audio, language=language))
+        if text.strip():
+            self.cache.put(key, text)
+        tracer.annotate(stt_cache="miss")
+        return text
+
+    async def health_check(self) -> bool:
+        return await self.stt.health_check()
+
+    def stats(self) -> dict:
+        return self.cache.stats()
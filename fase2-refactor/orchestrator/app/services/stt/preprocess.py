@@ -0,0 +1,270 @@
+"""
+Audio voorbewerking vóór STT.
+
+De Pi stuurt 16-bit WAV met tot 1.5s stilte aan het eind (VAD timeout) en
+een vaste gain. Vóór de STT call wordt stilte aan begin en eind getrimd, de
+loudness genormaliseerd en (optioneel) naar FLAC of Opus ge-encodeerd. Minder
+audio betekent minder base64 in de request en minder werk voor de encoder
+van het STT model.
+"""
+import asyncio
+import io
+import math
+import time
+import wave
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .base import STTProvider
+from ...utils.tracing import get_tracer
+
+MIME_TYPES = {"wav": "audio/wav", "flac": "audio/flac", "opus": "audio/ogg"}
+
+
+def sniff_audio_mime(audio: bytes) -> str:
+    """MIME type op basis van de magic bytes (default WAV)."""
+    if audio[:4] == b"fLaC":
+        return "audio/flac"
+    if audio[:4] == b"OggS":
+        return "audio/ogg"
+    if audio[:3] == b"ID3" or audio[:2] == b"\xff\xfb":
+        return "audio/mpeg"
+    return "audio/wav"
+
+
+def _dbfs(rms: np.ndarray | float) -> np.ndarray | float:
+    return 20 * np.log10(np.maximum(rms, 1e-9) / 32768)
+
+
+@dataclass
+class PreprocessedAudio:
+    """Resultaat van AudioPreprocessor.process()."""
+    audio: bytes
+    mime: str
+    original_bytes: int
+    original_duration_s: float
+    duration_s: float
+    gain_db: float = 0.0
+    passthrough: bool = False       # Geen 16-bit PCM WAV: ongewijzigd doorgestuurd
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.audio)
+
+    @property
+    def trimmed_s(self) -> float:
+        return max(0.0, self.original_duration_s - self.duration_s)
+
+
+class AudioPreprocessor:
+    """
+    Trim, normaliseer en encodeer een utterance.
+
+    Stilte = frames (20ms) onder max(silence_dbfs, luidste frame - dynamic_range_db).
+    Rond de spraak blijft padding_ms staan zodat begin- en eindklanken heel blijven.
+
+    Usage:
+        preprocessor = AudioPreprocessor(encoding="flac")
+        result = preprocessor.process(wav_bytes)
+        await stt.transcribe(result.audio)
+    """
+
+    def __init__(
+        self,
+        trim: bool = True,
+        silence_dbfs: float = -50.0,
+        dynamic_range_db: float = 35.0,
+        padding_ms: float = 200,
+        normalize: bool = True,
+        target_dbfs: float = -20.0,
+        max_gain_db: float = 18.0,
+        encoding: str = "wav",
+        frame_ms: float = 20
+    ):
+        if encoding not in MIME_TYPES:
+            raise ValueError(f"Onbekende encoding: {encoding} (kies uit {', '.join(MIME_TYPES)})")
+        if encoding != "wav":
+            try:
+                import soundfile  # noqa: F401
+            except ImportError:
+                print(f"STT encoding '{encoding}' gevraagd maar soundfile niet geinstalleerd - fallback naar WAV")
+                encoding = "wav"
+
+        self.trim = trim
+        self.silence_dbfs = silence_dbfs
+        self.dynamic_range_db = dynamic_range_db
+        self.padding_ms = padding_ms
+        self.normalize = normalize
+        self.target_dbfs = target_dbfs
+        self.max_gain_db = max_gain_db
+        self.encoding = encoding
+        self.frame_ms = frame_ms
+
+    def process(self, audio: bytes) -> PreprocessedAudio:
+        """Verwerk WAV bytes; andere formaten gaan ongewijzigd door."""
+        try:
+            with wave.open(io.BytesIO(audio), "rb") as wf:
+                sample_rate = wf.getframerate()
+                channels = wf.getnchannels()
+                sample_width = wf.getsampwidth()
+                pcm = wf.readframes(wf.getnframes())
+        except (wave.Error, EOFError):
+            return PreprocessedAudio(audio, sniff_audio_mime(audio), len(audio), 0.0, 0.0, passthrough=True)
+
+        if sample_width != 2:
+            duration = len(pcm) / (sample_rate * sample_width * channels)
+            return PreprocessedAudio(audio, "audio/wav", len(audio), duration, duration, passthrough=True)
+
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % (2 * channels)], dtype="<i2")
+        samples = samples.reshape(-1, channels)
+        original_duration = len(samples) / sample_rate
+
+        # Energie per frame (mono mix)
+        frame_len = max(1, int(sample_rate * self.frame_ms / 1000))
+        mono = samples.astype(np.float32).mean(axis=1)
+        usable = len(mono) - len(mono) % frame_len
+        frame_db = (
+            _dbfs(np.sqrt(np.mean(mono[:usable].reshape(-1, frame_len) ** 2, axis=1)))
+            if usable else np.array([])
+        )
+        threshold = max(self.silence_dbfs, float(frame_db.max()) - self.dynamic_range_db) if len(frame_db) else 0.0
+        voiced = np.flatnonzero(frame_db > threshold)
+
+        if self.trim and len(voiced):
+            padding = int(self.padding_ms / self.frame_ms)
+            first = max(0, voiced[0] - padding) * frame_len
+            last = min(len(frame_db), voiced[-1] + 1 + padding) * frame_len
+            if voiced[-1] + 1 + padding >= len(frame_db):
+                last = len(samples)  # Restant na het laatste hele frame niet weggooien
+            samples = samples[first:last]
+
+        gain_db = 0.0
+        if self.normalize and len(voiced):
+            speech = mono[:usable].reshape(-1, frame_len)[voiced]
+            speech_db = float(_dbfs(math.sqrt(float(np.mean(speech ** 2)))))
+            peak_db = float(_dbfs(float(np.abs(samples.astype(np.int32)).max()) or 1.0))
+            # Naar target loudness, begrensd door max_gain en 1 dB headroom
+            gain_db = min(self.target_dbfs - speech_db, self.max_gain_db, -1.0 - peak_db)
+            if abs(gain_db) >= 1.0:
+                scaled = samples.astype(np.float32) * (10 ** (gain_db / 20))
+                samples = np.clip(scaled, -32768, 32767).astype("<i2")
+            else:
+                gain_db = 0.0
+
+        encoded = self._encode(samples, sample_rate)
+        return PreprocessedAudio(
+            audio=encoded,
+            mime=MIME_TYPES[self.encoding],
+            original_bytes=len(audio),
+            original_duration_s=original_duration,
+            duration_s=len(samples) / sample_rate,
+            gain_db=round(gain_db, 1)
+        )
+
+    def _encode(self, samples: np.ndarray, sample_rate: int) -> bytes:
+        buffer = io.BytesIO()
+        if self.encoding == "wav":
+            with wave.open(buffer, "wb") as wf:
+                wf.setnchannels(samples.shape[1])
+                wf.setsampwidth(2)
+                wf.setframerate(sample_rate)
+                wf.writeframes(np.ascontiguousarray(samples).tobytes())
+        else:
+            import soundfile
+
+            if self.encoding == "flac":
+                soundfile.write(buffer, samples, sample_rate, format="FLAC", subtype="PCM_16")
+            else:
+                soundfile.write(buffer, samples, sample_rate, format="OGG", subtype="OPUS")
+        return buffer.getvalue()
+
+
+class PreprocessingSTT:
+    """
+    STTProvider wrapper: AudioPreprocessor vóór de echte provider.
+
+    Zet per request bytes_saved en de geschatte bespaarde STT tijd in de
+    turn trace. De schatting gebruikt de STT kosten per seconde audio,
+    gefit (lineair) over de laatste requests.
+    """
+
+    def __init__(self, stt: STTProvider, preprocessor: AudioPreprocessor, window: int = 200):
+        self.stt = stt
+        self.preprocessor = preprocessor
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)  # (audio s, STT ms)
+
+        # Metrics
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.trimmed_s = 0.0
+        self.ms_saved_est = 0.0
+
+    def __getattr__(self, name: str):
+        # Overige provider methods (get_models, ...) gaan direct door
+        return getattr(self.stt, name)
+
+    async def transcribe(self, audio: bytes, language: str = "nl") -> str:
+        tracer = get_tracer()
+        with tracer.span("stt.preprocess", audio_bytes=len(audio)) as span:
+            result = await asyncio.to_thread(self.preprocessor.process, audio)
+            span.attrs.update(
+                bytes_saved=result.bytes_saved,
+                trimmed_ms=round(result.trimmed_s * 1000),
+                gain_db=result.gain_db
+            )
+
+        t0 = time.perf_counter()
+        text = await self.stt.transcribe(result.audio, language=language)
+        stt_ms = (time.perf_counter() - t0) * 1000
+
+        if result.passthrough:
+            return text
+
+        per_second_ms = self.ms_per_audio_second()
+        ms_saved = result.trimmed_s * per_second_ms if per_second_ms is not None else None
+        self._samples.append((result.duration_s, stt_ms))
+
+        self.requests += 1
+        self.bytes_in += result.original_bytes
+        self.bytes_out += len(result.audio)
+        self.trimmed_s += result.trimmed_s
+        if ms_saved is not None:
+            self.ms_saved_est += ms_saved
+
+        tracer.annotate(
+            stt_bytes_saved=result.bytes_saved,
+            stt_trimmed_ms=round(result.trimmed_s * 1000),
+            stt_ms_saved_est=round(ms_saved) if ms_saved is not None else None
+        )
+        return text
+
+    async def health_check(self) -> bool:
+        return await self.stt.health_check()
+
+    def ms_per_audio_second(self) -> Optional[float]:
+        """Helling van STT ms tegen audio duur (None tot er genoeg spreiding is)."""
+        if len(self._samples) < 5:
+            return None
+        xs = np.array([sample[0] for sample in self._samples])
+        ys = np.array([sample[1] for sample in self._samples])
+        if xs.std() < 0.1:
+            return None
+        slope = float(np.polyfit(xs, ys, 1)[0])
+        return max(slope, 0.0)
+
+    def stats(self) -> dict:
+        per_second_ms = self.ms_per_audio_second()
+        return {
+            "requests": self.requests,
+            "encoding": self.preprocessor.encoding,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved_ratio": round(1 - self.bytes_out / self.bytes_in, 3) if self.bytes_in else 0.0,
+            "trimmed_s": round(self.trimmed_s, 1),
+            "stt_ms_per_audio_s": round(per_second_ms, 1) if per_second_ms is not None else None,
+            "stt_ms_saved_est": round(self.ms_saved_est)
+        }
@@ -4,6 +4,11 @@ from typing import Optional
 
 import httpx
 
+from .preprocess import sniff_audio_mime
+from ..admission import AdmissionController, use_slot
+from ..http import use_client
+from ...utils.tracing import get_tracer
+
 
 class VoxtralSTT:
     """
@@ -19,19 +24,25 @@ class VoxtralSTT:
         url: str = "http://localhost:8150",
         model: str = "mistralai/Voxtral-Mini-3B-2507",
         temperature: float = 0.0,
-        timeout: float = 60.0
+        timeout: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
+        admission: Optional[AdmissionController] = None
     ):
         self.url = url.rstrip("/")
         self.model = model
         self.temperature = temperature
         self.timeout = timeout
+        # Gedeelde pooled client (zie services/http.py), anders per call een nieuwe
+        self.client = client
+        # Gedeelde admission control (zie services/admission.py), anders ongelimiteerd
+        self.admission = admission
 
     async def transcribe(self, audio: bytes, language: str = "nl") -> str:
         """
         Transcribeer audio naar tekst via Voxtral.
 
         Args:
-            audio: WAV audio bytes
+            audio: Audio bytes (WAV, of FLAC/Ogg na AudioPreprocessor)
             language: Taalcode (gebruikt in prompt hint)
 
         Returns:
@@ -42,7 +53,7 @@ class VoxtralSTT:
         """
         # Encode audio to base64
         audio_base64 = base64.b64encode(audio).decode("utf-8")
-        audio_url = f"data:audio/wav;base64,{audio_base64}"
+        audio_url = f"data:{sniff_audio_mime(audio)};base64,{audio_base64}"
 
         # Build messages met audio content
         messages = [
@@ -67,13 +78,15 @@ class VoxtralSTT:
             "temperature": self.temperature
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                f"{self.url}/v1/chat/completions",
-                json=payload
-            )
-            resp.raise_for_status()
-            result = resp.json()
+        with get_tracer().span("stt", audio_bytes=len(audio)):
+            async with use_slot(self.admission), use_client(self.client, self.timeout) as client:
+                resp = await client.post(
+                    f"{self.url}/v1/chat/completions",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                resp.raise_for_status()
+                result = resp.json()
 
         # Extract transcription from response
         return result["choices"][0]["message"]["content"]
@@ -81,8 +94,8 @@ class VoxtralSTT:
     async def health_check(self) -> bool:
         """Check of Voxtral service beschikbaar is."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.url}/health")
+            async with use_client(self.client, 5.0) as client:
+                resp = await client.get(f"{self.url}/health", timeout=5.0)
                 return resp.status_code == 200
         except Exception:
             return False
@@ -90,8 +103,8 @@ class VoxtralSTT:
     async def get_models(self) -> Optional[list[str]]:
         """Haal beschikbare modellen op."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.url}/v1/models")
+            async with use_client(self.client, 5.0) as client:
+                resp = await client.get(f"{self.url}/v1/models", timeout=5.0)
                 resp.raise_for_status()
                 result = resp.json()
                 return [m["id"] for m in result.get("data", [])]
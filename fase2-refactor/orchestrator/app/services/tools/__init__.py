@@ -3,5 +3,16 @@ from .base import Tool, ToolRegistry
 from .emotion import EmotionTool
 from .vision import VisionTool
 from .sleep import SleepTool
+from .scheduler import ToolCall, ToolResult, ToolScheduler, parse_tool_calls
 
-__all__ = ["Tool", "ToolRegistry", "EmotionTool", "VisionTool", "SleepTool"]
+__all__ = [
+    "Tool",
+    "ToolRegistry",
+    "EmotionTool",
+    "VisionTool",
+    "SleepTool",
+    "ToolCall",
+    "ToolResult",
+    "ToolScheduler",
+    "parse_tool_calls",
+]
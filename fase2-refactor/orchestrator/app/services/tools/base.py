@@ -11,6 +11,8 @@ class Tool(Protocol):
     - name: Unieke identifier
     - definition: OpenAI-compatible tool definition
     - is_remote: Of tool op Pi moet draaien (default: False)
+    - needs_followup: Of de LLM het resultaat nodig heeft (default: True)
+    - fire_and_forget: Remote tool zonder te wachten op de Pi (default: False)
     - execute: Async execution method
 
     Remote tools (is_remote=True) worden via WebSocket naar de Pi gestuurd.
@@ -55,6 +57,26 @@ class Tool(Protocol):
         """
         return False  # Default: lokaal uitvoeren
 
+    @property
+    def needs_followup(self) -> bool:
+        """
+        True als de LLM het tool resultaat moet zien voor het antwoord.
+
+        Side-effect tools (show_emotion, go_to_sleep) hebben een vast
+        resultaat: heeft de eerste LLM pass al tekst, dan is een tweede
+        pass (met de volledige context) niet nodig.
+        """
+        return True
+
+    @property
+    def fire_and_forget(self) -> bool:
+        """
+        True als een remote tool niet op het FUNCTION_RESULT van de Pi wacht.
+
+        Het resultaat voor de LLM komt dan uit execute() (lokaal).
+        """
+        return False
+
     async def execute(self, arguments: dict, context: Optional[dict] = None) -> str:
         """
         Voer tool uit.
@@ -26,6 +26,16 @@ class EmotionTool:
         """OLED display zit op de Pi, dus dit is een remote tool."""
         return True
 
+    @property
+    def needs_followup(self) -> bool:
+        """Vast resultaat: de LLM hoeft het niet te zien."""
+        return False
+
+    @property
+    def fire_and_forget(self) -> bool:
+        """Niet wachten tot de Pi het display heeft bijgewerkt."""
+        return True
+
     @property
     def definition(self) -> dict:
         return {
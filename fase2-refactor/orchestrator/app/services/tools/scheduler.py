@@ -0,0 +1,204 @@
+"""
+Gelijktijdige uitvoering van tool calls.
+
+Een LLM response met meerdere tool calls (bijv. show_emotion + take_photo)
+werd één voor één afgehandeld, dus de emotie round-trip naar de Pi hield de
+foto op. De ToolScheduler start alle calls tegelijk, met een timeout per
+tool en een limiet op het aantal gelijktijdige calls (totaal en per tool).
+De resultaten komen terug in de volgorde van de calls, zodat de role:tool
+messages op de juiste plek in de history staan.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from .base import ToolRegistry
+from ...utils.tracing import get_tracer
+
+
+@dataclass
+class ToolCall:
+    """Eén geparste tool call uit een LLM response."""
+    index: int
+    name: str
+    arguments: dict
+
+
+@dataclass
+class ToolResult:
+    """Resultaat van één tool call (content gaat als role:tool naar de LLM)."""
+    call: ToolCall
+    content: str
+    duration_ms: float
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+def parse_tool_calls(tool_calls: list[dict]) -> list[ToolCall]:
+    """Ollama tool_calls → ToolCalls (arguments als JSON string worden geparsed)."""
+    calls = []
+    for index, tc in enumerate(tool_calls):
+        func = tc.get("function", {})
+        args = func.get("arguments", {})
+        if isinstance(args, str):
+            try:
+                args = json.loads(args)
+            except json.JSONDecodeError:
+                args = {}
+        calls.append(ToolCall(index=index, name=func.get("name", ""), arguments=args))
+    return calls
+
+
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+
+
+class ToolScheduler:
+    """
+    Voert de tool calls van één LLM response gelijktijdig uit.
+
+    Usage:
+        scheduler = ToolScheduler(default_timeout=30, max_concurrency=4, limits={"take_photo": 1})
+        results = await scheduler.run(parse_tool_calls(tool_calls), execute)
+        for result in results:  # zelfde volgorde als tool_calls
+            messages.append({"role": "tool", "content": result.content})
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 30.0,
+        max_concurrency: int = 4,
+        timeouts: Optional[dict[str, float]] = None,
+        limits: Optional[dict[str, int]] = None
+    ):
+        self.default_timeout = default_timeout
+        self.max_concurrency = max_concurrency
+        self.timeouts = timeouts or {}
+        self.limits = limits or {}
+        # Gedeeld over alle turns: een limiet (bijv. één camera) geldt globaal
+        self._global = asyncio.Semaphore(max(1, max_concurrency))
+        self._per_tool: dict[str, asyncio.Semaphore] = {
+            name: asyncio.Semaphore(max(1, limit)) for name, limit in self.limits.items()
+        }
+        self._stats: dict[str, _ToolStats] = {}
+
+        # Metrics
+        self.batches = 0
+        self.parallel_batches = 0
+        self.followups_skipped = 0
+
+    def reconfigure(self, default_timeout: float, timeouts: Optional[dict[str, float]] = None) -> None:
+        """Nieuwe timeouts na een config reload (limieten blijven tot een herstart)."""
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    async def run(
+        self,
+        calls: list[ToolCall],
+        execute: Callable[[ToolCall], Awaitable[str]]
+    ) -> list[ToolResult]:
+        """
+        Voer alle calls gelijktijdig uit.
+
+        Fouten en timeouts worden een tool result (tekst voor de LLM), zodat
+        één falende tool de andere calls en de turn niet afbreekt.
+
+        Returns:
+            Results in dezelfde volgorde als calls
+        """
+        self.batches += 1
+        if len(calls) > 1:
+            self.parallel_batches += 1
+        return list(await asyncio.gather(*(self._run_one(call, execute) for call in calls)))
+
+    def needs_followup(self, names: list[str], tools: ToolRegistry, content: str) -> bool:
+        """
+        Moet de LLM na deze tool calls nog een pass doen?
+
+        Nee als alle tools side-effect only zijn (needs_followup=False) en
+        de eerste pass al tekst heeft: die tekst is dan het antwoord. Zonder
+        tekst blijft de tweede pass nodig, anders is er geen antwoord.
+        """
+        if not content.strip():
+            return True
+        for name in names:
+            tool = tools.get(name)
+            if tool is None or getattr(tool, "needs_followup", True):
+                return True
+        self.followups_skipped += 1
+        get_tracer().annotate(tool_followup="skipped")
+        return False
+
+    async def _run_one(self, call: ToolCall, execute: Callable[[ToolCall], Awaitable[str]]) -> ToolResult:
+        per_tool = self._per_tool.get(call.name)
+        timeout = self.timeout_for(call.name)
+        stats = self._stats.setdefault(call.name, _ToolStats())
+
+        with get_tracer().span(f"tool.{call.name}", index=call.index) as span:
+            t0 = time.perf_counter()
+            try:
+                # De timeout geldt ook voor het wachten op een slot
+                content = await asyncio.wait_for(self._execute(call, execute, per_tool), timeout=timeout)
+                result = ToolResult(call, content, 0.0)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                span.attrs["timeout"] = True
+                result = ToolResult(
+                    call, f"Tool '{call.name}' timeout na {timeout:g}s", 0.0,
+                    error="timeout", timed_out=True
+                )
+            except Exception as e:
+                stats.errors += 1
+                span.attrs["error"] = type(e).__name__
+                result = ToolResult(
+                    call, f"Tool '{call.name}' fout: {e}", 0.0, error=type(e).__name__
+                )
+            result.duration_ms = (time.perf_counter() - t0) * 1000
+
+        stats.calls += 1
+        stats.total_ms += result.duration_ms
+        return result
+
+    async def _execute(
+        self,
+        call: ToolCall,
+        execute: Callable[[ToolCall], Awaitable[str]],
+        per_tool: Optional[asyncio.Semaphore]
+    ) -> str:
+        # Eerst de limiet per tool: een take_photo die op de camera wacht
+        # houdt dan geen globale slot bezet voor andere tools
+        if per_tool is not None:
+            await per_tool.acquire()
+        try:
+            async with self._global:
+                return await execute(call)
+        finally:
+            if per_tool is not None:
+                per_tool.release()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "parallel_batches": self.parallel_batches,
+            "followups_skipped": self.followups_skipped,
+            "max_concurrency": self.max_concurrency,
+            "tools": {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "timeouts": s.timeouts,
+                    "avg_ms": round(s.total_ms / s.calls, 1) if s.calls else 0.0,
+                    "timeout_s": self.timeout_for(name)
+                }
+                for name, s in sorted(self._stats.items())
+            }
+        }
@@ -18,6 +18,14 @@ class SleepTool:
     def is_remote(self) -> bool:
         return True
 
+    @property
+    def needs_followup(self) -> bool:
+        return False
+
+    @property
+    def fire_and_forget(self) -> bool:
+        return True
+
     @property
     def definition(self) -> dict:
         return {
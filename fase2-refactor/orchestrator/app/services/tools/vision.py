@@ -1,10 +1,17 @@
 """Vision tool voor camera functionaliteit."""
+import asyncio
 import base64
+import time
 from pathlib import Path
 from typing import Optional
 
 import httpx
 
+from ..admission import AdmissionController, Priority, use_slot
+from ..http import use_client
+from ..vision import ImagePreprocessor, VisionCache
+from ...utils.tracing import get_tracer
+
 
 class VisionTool:
     """
@@ -14,6 +21,10 @@ class VisionTool:
     - De Pi maakt de foto en stuurt deze via FUNCTION_RESULT
     - De orchestrator analyseert de foto met de LLM
 
+    Met een ImagePreprocessor wordt de foto eerst verkleind en opnieuw
+    ge-encodeerd; met een VisionCache krijgt een (bijna) identieke foto met
+    dezelfde vraag binnen de TTL de vorige beschrijving.
+
     Zie D016 in DECISIONS.md voor rationale.
     """
 
@@ -22,12 +33,23 @@ class VisionTool:
         mock_image_path: Optional[str] = None,
         pi_camera_url: Optional[str] = None,
         llm_url: str = "http://localhost:11434",
-        llm_model: str = "ministral-3:14b"
+        llm_model: str = "ministral-3:14b",
+        client: Optional[httpx.AsyncClient] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        cache: Optional[VisionCache] = None,
+        admission: Optional[AdmissionController] = None
     ):
         self.mock_image_path = Path(mock_image_path) if mock_image_path else None
         self.pi_camera_url = pi_camera_url
         self.llm_url = llm_url
         self.llm_model = llm_model
+        # Gedeelde Ollama client (zie services/http.py)
+        self.client = client
+        self.preprocessor = preprocessor
+        # Cache werkt op de hashes van de preprocessor
+        self.cache = cache if preprocessor else None
+        # Ollama admission control: analyse wacht achter interactieve turns
+        self.admission = admission
 
     @property
     def name(self) -> str:
@@ -111,6 +133,22 @@ class VisionTool:
         if not image_base64:
             return "Geen camera beschikbaar - kan geen foto maken."
 
+        tracer = get_tracer()
+        image = None
+        if self.preprocessor:
+            with tracer.span("vision.preprocess") as span:
+                image = await asyncio.to_thread(self.preprocessor.process, image_base64)
+                span.attrs.update(bytes_saved=image.bytes_saved, size=image.size)
+            image_base64 = image.image_base64
+            tracer.annotate(vision_bytes_saved=image.bytes_saved)
+
+            if self.cache:
+                description = self.cache.get(question, image)
+                if description is not None:
+                    tracer.annotate(vision_cache="hit")
+                    return description
+                tracer.annotate(vision_cache="miss")
+
         # Analyseer met vision LLM
         messages = [
             {
@@ -132,14 +170,22 @@ class VisionTool:
             "options": {"temperature": 0.15}
         }
 
+        t0 = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with use_slot(self.admission, Priority.VISION), use_client(self.client, 60.0) as client:
                 resp = await client.post(
                     f"{self.llm_url}/api/chat",
-                    json=payload
+                    json=payload,
+                    timeout=60.0
                 )
                 resp.raise_for_status()
                 result = resp.json()
-                return result["message"].get("content", "Kon de foto niet analyseren.")
         except Exception as e:
             return f"Fout bij foto analyse: {str(e)}"
+
+        description = result["message"].get("content")
+        if not description:
+            return "Kon de foto niet analyseren."
+        if self.cache:
+            self.cache.put(question, image, description, (time.perf_counter() - t0) * 1000)
+        return description
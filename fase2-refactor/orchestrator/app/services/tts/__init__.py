@@ -1,5 +1,16 @@
 """Text-to-Speech services."""
-from .base import TTSProvider, TTSResult
+from .base import TTSProvider, TTSResult, TTSSegment
 from .fishaudio import FishAudioTTS
+from .pipeline import TTSPipeline, StreamingTTSPipeline
+from .cache import TTSAudioCache, CachedTTS
 
-__all__ = ["TTSProvider", "TTSResult", "FishAudioTTS"]
+__all__ = [
+    "TTSProvider",
+    "TTSResult",
+    "TTSSegment",
+    "FishAudioTTS",
+    "TTSPipeline",
+    "StreamingTTSPipeline",
+    "TTSAudioCache",
+    "CachedTTS",
+]
@@ -1,4 +1,6 @@
 """TTS Provider protocol."""
+import io
+import wave
 from dataclasses import dataclass
 from typing import Optional, Protocol, runtime_checkable
 
@@ -11,6 +13,40 @@ class TTSResult:
     normalized_text: Optional[str] = None
 
 
+@dataclass
+class TTSSegment:
+    """Stuk ruwe PCM audio uit een streaming synthesis (synthesize_stream)."""
+    pcm: bytes
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.pcm) / (self.sample_rate * self.channels * self.sample_width)
+
+    def to_wav(self) -> bytes:
+        """Losse WAV (header + PCM), af te spelen zoals een gewone audio chunk."""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.pcm)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_wav(cls, data: bytes) -> "TTSSegment":
+        """Hele WAV als één segment (bijv. uit de audio cache)."""
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            return cls(
+                pcm=wf.readframes(wf.getnframes()),
+                sample_rate=wf.getframerate(),
+                channels=wf.getnchannels(),
+                sample_width=wf.getsampwidth()
+            )
+
+
 @runtime_checkable
 class TTSProvider(Protocol):
     """
@@ -0,0 +1,281 @@
+"""
+Audio cache voor terugkerende TTS zinnen.
+
+De robot zegt vaak hetzelfde: de vaste go_to_sleep reply, begroetingen,
+"Ik zie..." openers, excuses bij fouten. Zonder cache gaat elke keer een
+synthesis request naar de GPU. De key is de genormaliseerde tekst plus alle
+parameters die de audio bepalen (reference_id, temperature, top_p, format,
+seed); bij een hit is er geen Fish Audio call nodig.
+
+Alleen korte zinnen (max_chars) worden bewaard: lange LLM zinnen komen
+zelden letterlijk terug en zouden de LRU alleen maar leegspoelen.
+"""
+import base64
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from .base import TTSProvider, TTSResult, TTSSegment
+from ..cache import BoundedCache, InflightCalls
+from ...utils.text_normalization import normalize_for_tts
+
+
+def tts_cache_key(
+    text: str,
+    reference_id: str,
+    temperature: float,
+    top_p: float,
+    format: str,
+    seed: Optional[int]
+) -> str:
+    """sha256 over de (al genormaliseerde) tekst + alle synthesis parameters."""
+    params = f"{reference_id}\0{temperature}\0{top_p}\0{format}\0{seed}\0"
+    return hashlib.sha256((params + text).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAudio:
+    """Eén gecachte synthesis (audio + hoe lang de GPU erover deed)."""
+    audio_bytes: bytes
+    format: str
+    normalized_text: Optional[str]
+    synth_ms: float
+
+
+class TTSAudioCache(BoundedCache[CachedAudio]):
+    """
+    Synthesized audio per tekst + parameters (zie BoundedCache voor de lagen).
+
+    Zelfde opzet als de TranscriptCache: de SQLite laag overleeft een
+    herstart (dan is ook de warmup gratis). De audio staat er als encoded
+    bytes (het TTS format) in.
+    """
+
+    table = "tts_audio"
+    columns = (
+        ("audio", "BLOB NOT NULL"),
+        ("format", "TEXT NOT NULL"),
+        ("normalized_text", "TEXT"),
+        ("synth_ms", "REAL NOT NULL"),
+    )
+    entry_overhead_bytes = 300
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 2000
+    ):
+        super().__init__(max_bytes, disk_path, disk_max_entries)
+        self.skipped = 0        # Te lang om te cachen
+        self.warmed = 0         # Door de warmup gesynthetiseerd
+        self.gpu_ms_saved = 0.0
+
+    def _value_size(self, entry: CachedAudio) -> int:
+        return len(entry.audio_bytes)
+
+    def _to_row(self, entry: CachedAudio) -> tuple:
+        return (entry.audio_bytes, entry.format, entry.normalized_text, entry.synth_ms)
+
+    def _from_row(self, row: tuple) -> CachedAudio:
+        return CachedAudio(bytes(row[0]), row[1], row[2], row[3])
+
+    def _on_hit(self, entry: CachedAudio) -> None:
+        self.gpu_ms_saved += entry.synth_ms
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(
+            skipped=self.skipped,
+            warmed=self.warmed,
+            gpu_s_saved=round(self.gpu_ms_saved / 1000, 2)
+        )
+        return stats
+
+
+class CachedTTS:
+    """
+    TTSProvider wrapper met een TTSAudioCache ervoor.
+
+    De key gaat over de tekst zoals de TTS hem krijgt (dezelfde
+    normalize_for_tts als FishAudioTTS, plus whitespace samengevoegd), zodat
+    "3 euro" en "drie euro" dezelfde entry zijn. Gelijktijdige requests
+    voor dezelfde zin (meerdere clients, lookahead pipeline) wachten op
+    dezelfde synthesis.
+    """
+
+    def __init__(self, tts: TTSProvider, cache: TTSAudioCache, max_chars: int = 160):
+        self.tts = tts
+        self.cache = cache
+        self.max_chars = max_chars
+        self._calls: InflightCalls[CachedAudio] = InflightCalls()
+
+    def __getattr__(self, name: str):
+        # Overige provider attributen (url, reference_id, ...) gaan direct door
+        return getattr(self.tts, name)
+
+    def cache_key(self, text: str, reference_id: Optional[str] = None) -> str:
+        if getattr(self.tts, "normalize_text", False):
+            text = normalize_for_tts(text)
+        return tts_cache_key(
+            " ".join(text.split()),
+            reference_id or getattr(self.tts, "reference_id", ""),
+            getattr(self.tts, "temperature", None),
+            getattr(self.tts, "top_p", None),
+            getattr(self.tts, "format", "wav"),
+            getattr(self.tts, "seed", None)
+        )
+
+    async def synthesize(
+        self,
+        text: str,
+        reference_id: Optional[str] = None
+    ) -> TTSResult:
+        if not text.strip():
+            return await self.tts.synthesize(text, reference_id)
+        if len(text) > self.max_chars:
+            self.cache.skipped += 1
+            return await self.tts.synthesize(text, reference_id)
+
+        key = self.cache_key(text, reference_id)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self._result(entry)
+
+        inflight = self._calls.pending(key)
+        if inflight is not None:
+            self.cache.coalesced += 1
+            entry = await self._calls.wait(inflight)
+            if entry is not None:
+                self.cache.gpu_ms_saved += entry.synth_ms
+                return self._result(entry)
+            # De originele synthesis is gecanceld (bijv. barge-in): zelf doen
+
+        self.cache.misses += 1
+        entry = await self._calls.run(key, lambda: self._synthesize(text, reference_id))
+        if entry.audio_bytes:
+            self.cache.put(key, entry)
+        return self._result(entry)
+
+    async def synthesize_stream(
+        self,
+        text: str,
+        reference_id: Optional[str] = None
+    ) -> AsyncIterator[TTSSegment]:
+        """
+        Streaming variant: bij een hit de hele zin als één segment, anders de
+        segmenten van de provider doorgeven en na afloop samen bewaren.
+
+        Een streamed miss staat net als bij synthesize() in _calls, zodat
+        gelijke requests (streamed of niet) op deze synthesis wachten.
+        """
+        if not text.strip():
+            return
+        if len(text) > self.max_chars:
+            self.cache.skipped += 1
+            async for segment in self.tts.synthesize_stream(text, reference_id):
+                yield segment
+            return
+
+        key = self.cache_key(text, reference_id)
+        entry = self.cache.get(key)
+        if entry is not None:
+            yield TTSSegment.from_wav(entry.audio_bytes)
+            return
+
+        inflight = self._calls.pending(key)
+        if inflight is not None:
+            # Dezelfde zin wordt al gesynthetiseerd: daarop meeliften
+            self.cache.coalesced += 1
+            entry = await self._calls.wait(inflight)
+            if entry is not None:
+                self.cache.gpu_ms_saved += entry.synth_ms
+                if entry.audio_bytes:
+                    yield TTSSegment.from_wav(entry.audio_bytes)
+                return
+            # De originele synthesis is gecanceld (bijv. barge-in): zelf doen
+
+        self.cache.misses += 1
+        future = self._calls.start(key)
+        t0 = time.perf_counter()
+        segments: list[TTSSegment] = []
+        try:
+            async for segment in self.tts.synthesize_stream(text, reference_id):
+                segments.append(segment)
+                yield segment
+        except BaseException as e:
+            # Ook GeneratorExit (consumer stopt halverwege): wachtenden doen het dan zelf
+            self._calls.fail(key, future, e)
+            raise
+
+        synth_ms = (time.perf_counter() - t0) * 1000
+        audio = b""
+        if segments:
+            first = segments[0]
+            audio = TTSSegment(
+                b"".join(s.pcm for s in segments), first.sample_rate, first.channels, first.sample_width
+            ).to_wav()
+        normalized = normalize_for_tts(text) if getattr(self.tts, "normalize_text", False) else text
+        entry = CachedAudio(audio, "wav", normalized if normalized != text else None, synth_ms)
+        self._calls.finish(key, future, entry)
+        if entry.audio_bytes:
+            self.cache.put(key, entry)
+
+    async def synthesize_base64(
+        self,
+        text: str,
+        reference_id: Optional[str] = None
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Zelfde contract als FishAudioTTS.synthesize_base64, maar via de cache."""
+        try:
+            result = await self.synthesize(text, reference_id)
+            if not result.audio_bytes:
+                return None, None
+            return base64.b64encode(result.audio_bytes).decode("utf-8"), result.normalized_text
+        except Exception:
+            return None, None
+
+    async def warmup(self, phrases: list[str]) -> int:
+        """
+        Synthetiseer vaste zinnen vooraf (na een herstart met disk laag: alleen de nieuwe).
+
+        Sequentieel, zodat de warmup de GPU niet overspoelt als er al een
+        gebruiker praat. Returns het aantal nieuw gesynthetiseerde zinnen.
+        """
+        warmed = 0
+        for phrase in phrases:
+            if not phrase.strip() or len(phrase) > self.max_chars:
+                continue
+            key = self.cache_key(phrase)
+            if key in self._calls or self.cache.contains(key):
+                continue
+            # Buiten synthesize() om: warmup telt niet mee als miss (vertekent anders de hit rate)
+            entry = await self._synthesize(phrase)
+            if entry.audio_bytes:
+                self.cache.put(key, entry)
+                self.cache.warmed += 1
+                warmed += 1
+        return warmed
+
+    async def health_check(self) -> bool:
+        return await self.tts.health_check()
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+    async def _synthesize(self, text: str, reference_id: Optional[str] = None) -> CachedAudio:
+        """Echte synthesis, met de GPU tijd erbij (voor gpu_s_saved bij latere hits)."""
+        t0 = time.perf_counter()
+        result = await self.tts.synthesize(text, reference_id)
+        synth_ms = (time.perf_counter() - t0) * 1000
+        return CachedAudio(result.audio_bytes, result.format, result.normalized_text, synth_ms)
+
+    @staticmethod
+    def _result(entry: CachedAudio) -> TTSResult:
+        return TTSResult(
+            audio_bytes=entry.audio_bytes,
+            format=entry.format,
+            normalized_text=entry.normalized_text
+        )
@@ -1,11 +1,19 @@
 """Fish Audio TTS implementation."""
+import asyncio
 import base64
-from typing import Optional
+import struct
+import time
+from typing import AsyncIterator, Optional
 
 import httpx
 
-from .base import TTSResult
+from .base import TTSResult, TTSSegment
+from ..http import use_client
 from ...utils.text_normalization import normalize_for_tts
+from ...utils.tracing import get_tracer
+
+# Korte zin om eenmalig de sample rate van Fish op te vragen (als die niet in de config staat)
+PROBE_TEXT = "Hoi."
 
 
 class FishAudioTTS:
@@ -16,6 +24,7 @@ class FishAudioTTS:
     - Nederlandse reference voice
     - Text normalization voor betere uitspraak
     - Streaming per zin mogelijk
+    - Fish streaming binnen een zin (synthesize_stream, alleen WAV)
     """
 
     def __init__(
@@ -25,16 +34,32 @@ class FishAudioTTS:
         temperature: float = 0.5,
         top_p: float = 0.6,
         format: str = "wav",
+        seed: Optional[int] = None,
         timeout: float = 30.0,
-        normalize_text: bool = True
+        normalize_text: bool = True,
+        chunk_length: Optional[int] = None,
+        min_segment_ms: float = 200.0,
+        sample_rate: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None
     ):
         self.url = url.rstrip("/")
         self.reference_id = reference_id
         self.temperature = temperature
         self.top_p = top_p
         self.format = format
+        # Vaste seed = reproduceerbare audio (dezelfde zin klinkt elke keer gelijk)
+        self.seed = seed
         self.timeout = timeout
         self.normalize_text = normalize_text
+        # Fish chunk_length (100-300): tekst per gegenereerd segment bij streaming (None = server default)
+        self.chunk_length = chunk_length
+        # Kleinere stukjes uit de HTTP stream worden samengevoegd tot minstens dit
+        self.min_segment_ms = min_segment_ms
+        # Fish streamt ruwe mono 16-bit PCM zonder header: sample rate van de codec (None = opvragen)
+        self.sample_rate = sample_rate
+        self._probe_lock = asyncio.Lock()
+        # Gedeelde pooled client (zie services/http.py), anders per call een nieuwe
+        self.client = client
 
     async def synthesize(
         self,
@@ -58,21 +83,17 @@ class FishAudioTTS:
         original_text = text
         if self.normalize_text:
             text = normalize_for_tts(text)
+        payload = self._build_payload(text, reference_id)
 
-        payload = {
-            "text": text,
-            "reference_id": reference_id or self.reference_id,
-            "temperature": self.temperature,
-            "top_p": self.top_p,
-            "format": self.format
-        }
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                f"{self.url}/v1/tts",
-                json=payload
-            )
-            resp.raise_for_status()
+        with get_tracer().span("tts", chars=len(text)) as span:
+            async with use_client(self.client, self.timeout) as client:
+                resp = await client.post(
+                    f"{self.url}/v1/tts",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                resp.raise_for_status()
+            span.attrs["audio_bytes"] = len(resp.content)
 
         # Return normalized text alleen als het verschilt
         normalized = text if text != original_text else None
@@ -83,6 +104,99 @@ class FishAudioTTS:
             normalized_text=normalized
         )
 
+    async def synthesize_stream(
+        self,
+        text: str,
+        reference_id: Optional[str] = None
+    ) -> AsyncIterator[TTSSegment]:
+        """
+        Syntheseer met Fish streaming ("streaming": true) en yield PCM segmenten.
+
+        Fish stuurt per gegenereerd tekst stuk (chunk_length) ruwe mono
+        16-bit PCM. De WAV header die de engine aanmaakt komt niet mee
+        (inference_async laat alleen bytes door), dus de sample rate komt uit
+        de config of uit een eenmalige gewone request. Begint de stream
+        toch met een RIFF header, dan geldt die.
+
+        De HTTP chunks vallen niet samen met de segmenten: er wordt
+        gebufferd tot minstens min_segment_ms audio (hele frames), de rest
+        komt aan het eind. Zo kan het begin van een lange zin al afspelen
+        terwijl Fish de rest nog genereert.
+
+        Raises:
+            ValueError: Als format geen WAV is (Fish streamt alleen WAV) of
+                de stream een ongeldige WAV header heeft
+            httpx.HTTPError: Bij verbindingsfouten
+        """
+        if self.format != "wav":
+            raise ValueError(f"Fish streaming ondersteunt alleen WAV, niet {self.format}")
+        if not text.strip():
+            return
+
+        if self.normalize_text:
+            text = normalize_for_tts(text)
+        payload = self._build_payload(text, reference_id)
+        payload["streaming"] = True
+        if self.chunk_length is not None:
+            payload["chunk_length"] = self.chunk_length
+        sample_rate, channels, sample_width = await self._pcm_format()
+
+        tracer = get_tracer()
+        with tracer.span("tts", activate=False, chars=len(text), stream=True) as span:
+            t0 = time.perf_counter()
+            segments = 0
+            audio_bytes = 0
+
+            async with use_client(self.client, self.timeout) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.url}/v1/tts",
+                    json=payload,
+                    timeout=self.timeout
+                ) as resp:
+                    resp.raise_for_status()
+
+                    buffer = bytearray()
+                    checked = False
+                    async for data in resp.aiter_bytes():
+                        buffer += data
+                        if not checked:
+                            if len(buffer) < 4:
+                                continue
+                            if buffer[:4] == b"RIFF":
+                                header = _parse_wav_header(buffer)
+                                if header is None:
+                                    continue  # Header nog niet compleet
+                                sample_rate, channels, sample_width, offset = header
+                                del buffer[:offset]
+                            checked = True
+
+                        frame_bytes = channels * sample_width
+                        min_bytes = max(1, int(sample_rate * self.min_segment_ms / 1000)) * frame_bytes
+                        if len(buffer) < min_bytes:
+                            continue
+                        size = len(buffer) - len(buffer) % frame_bytes
+                        if segments == 0:
+                            tracer.record("tts.first_segment", (time.perf_counter() - t0) * 1000)
+                        segments += 1
+                        audio_bytes += size
+                        yield TTSSegment(bytes(buffer[:size]), sample_rate, channels, sample_width)
+                        del buffer[:size]
+
+                    if not checked and buffer[:4] == b"RIFF":
+                        raise ValueError("Afgekapte WAV header in de Fish stream")
+                    frame_bytes = channels * sample_width
+                    size = len(buffer) - len(buffer) % frame_bytes
+                    if size:
+                        if segments == 0:
+                            tracer.record("tts.first_segment", (time.perf_counter() - t0) * 1000)
+                        segments += 1
+                        audio_bytes += size
+                        yield TTSSegment(bytes(buffer[:size]), sample_rate, channels, sample_width)
+
+            span.attrs["segments"] = segments
+            span.attrs["audio_bytes"] = audio_bytes
+
     async def synthesize_base64(
         self,
         text: str,
@@ -105,11 +219,68 @@ class FishAudioTTS:
         except Exception:
             return None, None
 
+    async def _pcm_format(self) -> tuple[int, int, int]:
+        """(sample_rate, channels, sample_width) van de Fish PCM stream."""
+        if self.sample_rate is None:
+            async with self._probe_lock:
+                if self.sample_rate is None:
+                    result = await self.synthesize(PROBE_TEXT)
+                    self.sample_rate = TTSSegment.from_wav(result.audio_bytes).sample_rate
+        # Fish zet de segmenten altijd om naar mono int16 (inference_wrapper)
+        return self.sample_rate, 1, 2
+
+    def _build_payload(self, text: str, reference_id: Optional[str]) -> dict:
+        payload = {
+            "text": text,
+            "reference_id": reference_id or self.reference_id,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "format": self.format
+        }
+        if self.seed is not None:
+            payload["seed"] = self.seed
+        return payload
+
     async def health_check(self) -> bool:
         """Check of Fish Audio beschikbaar is."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.url}/v1/health")
+            async with use_client(self.client, 5.0) as client:
+                resp = await client.get(f"{self.url}/v1/health", timeout=5.0)
                 return resp.status_code == 200
         except Exception:
             return False
+
+
+def _parse_wav_header(data: bytes) -> Optional[tuple[int, int, int, int]]:
+    """
+    (sample_rate, channels, sample_width, offset van de PCM) uit een WAV header.
+
+    Alleen als een server de header wel meestuurt (Fish zelf doet dat niet).
+    None als de header nog niet compleet binnen is. De lengte velden worden
+    genegeerd: bij streaming staan die op 0 (totale lengte nog onbekend).
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Fish stream is geen WAV")
+
+    fmt = None
+    offset = 12
+    while len(data) >= offset + 8:
+        chunk_id = bytes(data[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        offset += 8
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data zonder fmt chunk")
+            return fmt + (offset,)
+        if len(data) < offset + chunk_size:
+            return None
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack_from("<HHI", data, offset)
+            (bits,) = struct.unpack_from("<H", data, offset + 14)
+            if audio_format != 1 or bits != 16:
+                raise ValueError(f"Fish stream is geen 16-bit PCM (format {audio_format}, {bits} bits)")
+            fmt = (sample_rate, channels, bits // 8)
+        offset += chunk_size + chunk_size % 2
+    return None
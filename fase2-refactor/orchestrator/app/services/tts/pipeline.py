@@ -0,0 +1,138 @@
+"""Pipelined per-zin TTS met begrensde concurrency en geordende output."""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TTSPipeline(Generic[T]):
+    """
+    Synthetiseert zinnen parallel (lookahead window) en levert ze op volgorde.
+
+    Zin 2 wordt al gesynthetiseerd terwijl zin 1 nog verstuurd/afgespeeld
+    wordt. Maximaal `lookahead` synthesis requests lopen tegelijk; submit()
+    wacht (backpressure) tot er een slot vrij is.
+
+    Usage:
+        pipeline = TTSPipeline(tts.synthesize, lookahead=3)
+
+        # producer
+        for sentence in sentences:
+            await pipeline.submit(sentence)
+        pipeline.close()
+
+        # consumer (parallel aan de producer)
+        async for index, sentence, result in pipeline.results():
+            await send(result)
+
+        # bij disconnect / fout
+        pipeline.cancel()
+    """
+
+    def __init__(self, synthesize: Callable[[str], Awaitable[T]], lookahead: int = 3):
+        self._synthesize = synthesize
+        self._slots = asyncio.Semaphore(max(1, lookahead))
+        self._queue: asyncio.Queue[Optional[tuple[int, str, asyncio.Task]]] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._next_index = 0
+        self._closed = False
+
+    async def submit(self, sentence: str) -> None:
+        """Start synthesis van een zin zodra er een slot vrij is."""
+        if self._closed:
+            raise RuntimeError("TTSPipeline is al gesloten")
+
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run(sentence))
+        self._tasks.append(task)
+        await self._queue.put((self._next_index, sentence, task))
+        self._next_index += 1
+
+    def close(self) -> None:
+        """Geen nieuwe zinnen meer; results() stopt na de laatste."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    def cancel(self) -> None:
+        """Annuleer alle lopende synthesis requests."""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        self.close()
+
+    async def results(self) -> AsyncIterator[tuple[int, str, T]]:
+        """Yield (index, zin, resultaat) strikt op volgorde van index."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            index, sentence, task = item
+            yield index, sentence, await task
+
+    @property
+    def submitted(self) -> int:
+        """Aantal aangeboden zinnen."""
+        return self._next_index
+
+    async def _run(self, sentence: str) -> T:
+        try:
+            return await self._synthesize(sentence)
+        finally:
+            self._slots.release()
+
+
+class StreamingTTSPipeline(TTSPipeline[T]):
+    """
+    TTSPipeline voor synthesize_stream: segmenten in plaats van hele zinnen.
+
+    Zelfde lookahead window en volgorde, maar de segmenten van de huidige
+    zin komen al door terwijl die zin nog gesynthetiseerd wordt. Volgende
+    zinnen lopen ondertussen al (gebufferd) in hun eigen slot.
+
+    Usage:
+        pipeline = StreamingTTSPipeline(tts.synthesize_stream, lookahead=3)
+        ...
+        async for index, sentence, segment in pipeline.segments():
+            await send(segment)
+    """
+
+    def __init__(self, synthesize_stream: Callable[[str], AsyncIterator[T]], lookahead: int = 3):
+        super().__init__(synthesize_stream, lookahead=lookahead)
+
+    async def submit(self, sentence: str) -> None:
+        """Start synthesis van een zin zodra er een slot vrij is."""
+        if self._closed:
+            raise RuntimeError("TTSPipeline is al gesloten")
+
+        await self._slots.acquire()
+        segments: asyncio.Queue[Optional[T]] = asyncio.Queue()
+        task = asyncio.create_task(self._stream(sentence, segments))
+        self._tasks.append(task)
+        await self._queue.put((self._next_index, sentence, task, segments))
+        self._next_index += 1
+
+    async def results(self) -> AsyncIterator[tuple[int, str, T]]:
+        raise TypeError("StreamingTTSPipeline levert segmenten: gebruik segments()")
+
+    async def segments(self) -> AsyncIterator[tuple[int, str, T]]:
+        """Yield (index, zin, segment): alle segmenten van zin 0, dan zin 1, enz."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            index, sentence, task, segments = item
+            while True:
+                segment = await segments.get()
+                if segment is None:
+                    break
+                yield index, sentence, segment
+            await task  # Fout uit de synthesis (na de al geleverde segmenten)
+
+    async def _stream(self, sentence: str, segments: asyncio.Queue) -> None:
+        try:
+            async for segment in self._synthesize(sentence):
+                segments.put_nowait(segment)
+        finally:
+            segments.put_nowait(None)
+            self._slots.release()
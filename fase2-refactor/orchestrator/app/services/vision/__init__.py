@@ -0,0 +1,9 @@
+"""Foto voorbewerking en caching voor de vision analyse."""
+from .preprocess import ImagePreprocessor, PreparedImage
+from .cache import VisionCache
+
+__all__ = [
+    "ImagePreprocessor",
+    "PreparedImage",
+    "VisionCache",
+]
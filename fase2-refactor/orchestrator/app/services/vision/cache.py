@@ -0,0 +1,116 @@
+"""
+Korte-termijn cache voor foto beschrijvingen.
+
+"Wat zie je?" kort na elkaar levert (bijna) hetzelfde frame op. Binnen de
+TTL wordt een beschrijving hergebruikt als de vraag gelijk is en de foto
+binnen max_distance bits (dHash) van de gecachte foto ligt. Zonder dHash
+(geen Pillow) telt alleen exact dezelfde foto.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from .preprocess import PreparedImage, hamming
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+@dataclass
+class _Entry:
+    question: str
+    digest: str
+    dhash: Optional[int]
+    description: str
+    created_at: float
+
+
+class VisionCache:
+    """
+    TTL cache: (vraag, foto hash) → beschrijving.
+
+    Het aantal entries is klein (begrensd door max_entries en de korte TTL),
+    dus de near-duplicate lookup is een lineaire scan.
+    """
+
+    def __init__(self, ttl_s: float = 10.0, max_distance: int = 6, max_entries: int = 64):
+        self.ttl_s = ttl_s
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._next_id = 0
+
+        # Metrics
+        self.hits = 0
+        self.near_hits = 0      # Hit op een ander (maar gelijkend) frame
+        self.misses = 0
+        self.expired = 0
+        self.analysis_ms = 0.0  # Totale analyse tijd van de misses (voor ms_saved_est)
+        self.analyses = 0
+
+    def get(self, question: str, image: PreparedImage) -> Optional[str]:
+        self._expire()
+        question = normalize_question(question)
+        best: Optional[_Entry] = None
+        best_distance = self.max_distance + 1
+        for entry in self._entries.values():
+            if entry.question != question:
+                continue
+            if entry.digest == image.digest:
+                best, best_distance = entry, 0
+                break
+            if entry.dhash is None or image.dhash is None:
+                continue
+            distance = hamming(entry.dhash, image.dhash)
+            if distance < best_distance:
+                best, best_distance = entry, distance
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if best.digest != image.digest:
+            self.near_hits += 1
+        return best.description
+
+    def put(self, question: str, image: PreparedImage, description: str, analysis_ms: float) -> None:
+        self.analyses += 1
+        self.analysis_ms += analysis_ms
+        if self.ttl_s <= 0:
+            return
+        self._entries[self._next_id] = _Entry(
+            normalize_question(question), image.digest, image.dhash, description, time.monotonic()
+        )
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        avg_ms = self.analysis_ms / self.analyses if self.analyses else 0.0
+        return {
+            "entries": len(self._entries),
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "analysis_avg_ms": round(avg_ms),
+            "ms_saved_est": round(self.hits * avg_ms)
+        }
+
+    def _expire(self) -> None:
+        # Entries staan op volgorde van aanmaken: oudste vooraan
+        cutoff = time.monotonic() - self.ttl_s
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.created_at >= cutoff:
+                break
+            del self._entries[key]
+            self.expired += 1
@@ -0,0 +1,140 @@
+"""
+Foto voorbewerking vóór de vision analyse.
+
+De vision encoder schaalt grote foto's toch terug, en het aantal image
+tokens groeit met het aantal pixels. De foto wordt daarom vooraf verkleind
+tot max_side, opnieuw als JPEG ge-encodeerd en voorzien van een perceptuele
+hash (dHash) voor de VisionCache. Pillow is optioneel: zonder Pillow gaat de
+foto ongewijzigd door en herkent de cache alleen exact dezelfde bytes.
+"""
+import base64
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+HASH_SIZE = 8  # dHash van 8x8 = 64 bits
+
+
+def hamming(a: int, b: int) -> int:
+    """Aantal verschillende bits tussen twee hashes."""
+    return bin(a ^ b).count("1")
+
+
+@dataclass
+class PreparedImage:
+    """Resultaat van ImagePreprocessor.process()."""
+    image_base64: str
+    original_bytes: int
+    bytes: int
+    digest: str                       # sha256 van de originele bytes
+    dhash: Optional[int] = None       # None zonder Pillow of bij een onleesbare foto
+    size: Optional[tuple[int, int]] = None
+    original_size: Optional[tuple[int, int]] = None
+    passthrough: bool = False
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.bytes
+
+    @property
+    def resized(self) -> bool:
+        return self.size is not None and self.size != self.original_size
+
+
+class ImagePreprocessor:
+    """
+    Verklein, her-encodeer en hash een foto (base64 in, base64 uit).
+
+    Usage:
+        preprocessor = ImagePreprocessor(max_side=1024, jpeg_quality=80)
+        image = preprocessor.process(image_base64)
+        cache.get(question, image)
+    """
+
+    def __init__(self, enabled: bool = True, max_side: int = 1024, jpeg_quality: int = 80):
+        self.available = True
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            if enabled:
+                print("Vision voorbewerking gevraagd maar Pillow niet geinstalleerd - foto's gaan ongewijzigd door")
+            self.available = False
+
+        self.enabled = enabled
+        self.max_side = max_side
+        self.jpeg_quality = jpeg_quality
+
+        # Metrics
+        self.requests = 0
+        self.resized = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def process(self, image_base64: str) -> PreparedImage:
+        raw = base64.b64decode(image_base64)
+        digest = hashlib.sha256(raw).hexdigest()
+        image = PreparedImage(image_base64, len(raw), len(raw), digest, passthrough=True)
+        if self.available:
+            image = self._process(raw, image)
+
+        self.requests += 1
+        self.bytes_in += image.original_bytes
+        self.bytes_out += image.bytes
+        if image.resized:
+            self.resized += 1
+        return image
+
+    def _process(self, raw: bytes, image: PreparedImage) -> PreparedImage:
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        try:
+            with Image.open(io.BytesIO(raw)) as opened:
+                # Pi camera kan EXIF rotatie zetten; daarna RGB voor JPEG
+                picture = ImageOps.exif_transpose(opened).convert("RGB")
+        except (UnidentifiedImageError, OSError):
+            return image
+
+        image.original_size = image.size = picture.size
+        image.dhash = self._dhash(picture)
+        if not self.enabled:
+            return image
+
+        if max(picture.size) > self.max_side:
+            picture.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS)
+            image.size = picture.size
+
+        buffer = io.BytesIO()
+        picture.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        encoded = buffer.getvalue()
+        # Al kleiner (bijv. een 640x480 Pi frame op lagere quality)? Dan het origineel houden
+        if len(encoded) < len(raw) or image.resized:
+            image.image_base64 = base64.b64encode(encoded).decode("utf-8")
+            image.bytes = len(encoded)
+            image.passthrough = False
+        return image
+
+    @staticmethod
+    def _dhash(picture) -> int:
+        """Verschil-hash: helderheid van horizontaal naburige pixels op 9x8 grijs."""
+        from PIL import Image
+
+        small = picture.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+        pixels = list(small.getdata())
+        value = 0
+        for row in range(HASH_SIZE):
+            for col in range(HASH_SIZE):
+                left = pixels[row * (HASH_SIZE + 1) + col]
+                right = pixels[row * (HASH_SIZE + 1) + col + 1]
+                value = (value << 1) | (left > right)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled and self.available,
+            "requests": self.requests,
+            "resized": self.resized,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved_ratio": round(1 - self.bytes_out / self.bytes_in, 3) if self.bytes_in else 0.0
+        }
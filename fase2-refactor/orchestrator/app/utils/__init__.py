@@ -1,5 +1,20 @@
 """Utility functions."""
-from .text_normalization import normalize_for_tts, split_into_sentences
+from .text_normalization import (
+    normalize_for_tts,
+    split_into_sentences,
+    SentenceSegmenter,
+    ProsodyChunker,
+    TextNormalizer,
+    configure_normalizer,
+)
 from .debug_logger import ConversationDebugger
 
-__all__ = ["normalize_for_tts", "split_into_sentences", "ConversationDebugger"]
+__all__ = [
+    "normalize_for_tts",
+    "split_into_sentences",
+    "SentenceSegmenter",
+    "ProsodyChunker",
+    "TextNormalizer",
+    "configure_normalizer",
+    "ConversationDebugger",
+]
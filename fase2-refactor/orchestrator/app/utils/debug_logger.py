@@ -4,6 +4,7 @@ Conversation debug logging.
 Logt conversation turns met timing en details naar console en optioneel naar file.
 """
 import time
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -19,6 +20,10 @@ class ConversationDebugger:
         debugger.log_step("STT", 450.0, {"text": "hallo daar"})
         debugger.log_step("LLM", 1200.0, {"response": "Hoi!", "tools": 0})
         debugger.end_turn()
+
+    De huidige turn zit in een ContextVar: elke WebSocket message wordt in
+    een eigen task verwerkt, dus gelijktijdige turns loggen elk hun eigen
+    steps i.p.v. één gedeelde dict te overschrijven.
     """
 
     def __init__(
@@ -36,20 +41,25 @@ class ConversationDebugger:
             # Maak parent directory aan indien nodig
             self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
-        self.current_turn: dict = {}
+        self._current_turn: ContextVar[dict] = ContextVar(f"debug_turn_{id(self)}", default={})
+
+    @property
+    def current_turn(self) -> dict:
+        """Turn van de huidige task (leeg buiten een turn)."""
+        return self._current_turn.get()
 
     def start_turn(self, turn_id: str, client_id: str) -> None:
         """Start een nieuwe turn."""
         if not self.enabled:
             return
 
-        self.current_turn = {
+        self._current_turn.set({
             "turn_id": turn_id,
             "client_id": client_id,
             "started_at": time.time(),
             "timestamp": datetime.now().strftime("%H:%M:%S"),
             "steps": []
-        }
+        })
 
     def log_step(
         self,
@@ -58,10 +68,11 @@ class ConversationDebugger:
         details: Optional[dict] = None
     ) -> None:
         """Log een stap binnen de huidige turn."""
-        if not self.enabled or not self.current_turn:
+        turn = self.current_turn
+        if not self.enabled or not turn:
             return
 
-        self.current_turn["steps"].append({
+        turn["steps"].append({
             "step": step,
             "duration_ms": duration_ms,
             "details": details or {}
@@ -69,21 +80,22 @@ class ConversationDebugger:
 
     def end_turn(self) -> None:
         """Beëindig turn en schrijf output."""
-        if not self.enabled or not self.current_turn:
+        turn = self.current_turn
+        if not self.enabled or not turn:
             return
 
         # Bereken totale tijd
-        total_ms = (time.time() - self.current_turn["started_at"]) * 1000
-        self.current_turn["total_ms"] = total_ms
+        total_ms = (time.time() - turn["started_at"]) * 1000
+        turn["total_ms"] = total_ms
 
-        output = self._format_turn(self.current_turn)
+        output = self._format_turn(turn)
         print(output)
 
         if self.log_file:
             with open(self.log_file, "a", encoding="utf-8") as f:
                 f.write(output + "\n")
 
-        self.current_turn = {}
+        self._current_turn.set({})
 
     def _format_turn(self, turn: dict) -> str:
         """Format turn data als leesbare string."""
@@ -3,11 +3,15 @@ Text normalization voor TTS preprocessing.
 
 Functies:
 - Acroniemen naar Nederlandse fonetiek (API → aa-pee-ie)
-- Getallen naar woorden (150 → honderdvijftig)
+- Getallen naar woorden (150 → honderdvijftig), ook bedragen, tijden,
+  eenheden en rangtelwoorden
 - Haakjes → komma's
 - Engelse woorden → Nederlands-klinkend
+- Zinnen splitsen (in één keer of incrementeel op een token stream)
 """
 import re
+from functools import lru_cache
+from typing import Optional
 
 from num2words import num2words
 
@@ -25,63 +29,211 @@ NL_LETTER_SOUNDS = {
 # Woorden die NIET fonetisch gespeld moeten worden
 SKIP_ACRONYMS = {'OK', 'TV', 'AI', 'WC'}
 
-# Specifieke woord vervangingen (Engels → Nederlands-klinkend)
+# Specifieke woord vervangingen (Engels → Nederlands-klinkend, hoofdletterongevoelig)
 WORD_REPLACEMENTS = {
-    r'\bDocker\b': 'dokker',
-    r'\bPython\b': 'paiton',
-    r'\bdesktop\b': 'desktob',
+    'docker': 'dokker',
+    'python': 'paiton',
+    'desktop': 'desktob',
 }
 
+# Eenheden direct na een getal ("5 km", "20%")
+UNITS = {
+    'km/u': 'kilometer per uur',
+    'km': 'kilometer',
+    'm': 'meter',
+    'cm': 'centimeter',
+    'mm': 'millimeter',
+    'kg': 'kilo',
+    'g': 'gram',
+    '%': 'procent',
+    '°C': 'graden',
+    '°': 'graden',
+}
 
-def normalize_for_tts(text: str) -> str:
-    """
-    Normaliseer tekst voor betere Nederlandse TTS uitspraak.
+# Valuta symbolen vóór een bedrag ("€3,50")
+CURRENCIES = {
+    '€': 'euro',
+    '$': 'dollar',
+    '£': 'pond',
+}
 
-    Transformaties:
-    1. Haakjes → komma's
-    2. Acroniemen → fonetische spelling
-    3. Engelse woorden → Nederlands-klinkend
-    4. Getallen → Nederlandse woorden
 
-    Args:
-        text: Ruwe tekst
+@lru_cache(maxsize=4096)
+def number_to_words(number: int, ordinal: bool = False) -> str:
+    """num2words met memoization: dezelfde getallen komen steeds terug."""
+    return num2words(number, lang='nl', to='ordinal' if ordinal else 'cardinal')
 
-    Returns:
-        Genormaliseerde tekst voor TTS
+
+def _alternation(keys) -> str:
+    # Langste eerst, zodat "km/u" wint van "km" en "°C" van "°"
+    return '|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True))
+
+
+class TextNormalizer:
+    """
+    Normalisatie in één pass over de tekst.
+
+    Alle regels zitten in één gecompileerde regex (één named group per
+    regel, op volgorde van prioriteit); elke match gaat via de rule tabel
+    naar een handler. Regels die niet van toepassing zijn laten de tekst
+    staan, dus een token wordt nooit twee keer bewerkt.
+
+    Usage:
+        normalizer = TextNormalizer(words={"github": "gidhub"})
+        normalizer.normalize("De API draait om 12:30 (lokaal).")
     """
-    # 1. HAAKJES: eerste ( wordt ", ", daarna haakjes verwijderen
-    text = re.sub(r'\s*\(', ', ', text, count=1)
-    text = re.sub(r'[()]', '', text)
 
-    # 2. ACRONIEMEN: letter-voor-letter uitspreken
-    def spell_acronym(match):
+    def __init__(
+        self,
+        letters: Optional[dict] = None,
+        skip_acronyms: Optional[list] = None,
+        words: Optional[dict] = None,
+        units: Optional[dict] = None,
+        currencies: Optional[dict] = None
+    ):
+        # Config vult de ingebouwde tabellen aan (en overschrijft bij gelijke key)
+        self.letters = {**NL_LETTER_SOUNDS, **(letters or {})}
+        self.skip_acronyms = SKIP_ACRONYMS | set(skip_acronyms or [])
+        self.words = {**WORD_REPLACEMENTS, **{k.lower(): v for k, v in (words or {}).items()}}
+        self.units = {**UNITS, **(units or {})}
+        self.currencies = {**CURRENCIES, **(currencies or {})}
+
+        rules = [
+            ('paren_open', r'\s*\('),
+            ('paren_close', r'\)'),
+            ('currency', rf'(?P<cur_symbol>{_alternation(self.currencies)})\s?'
+                         r'(?P<cur_whole>\d+)(?:[.,](?P<cur_cents>\d{2}))?(?![\d.,]\d)'),
+            ('time', r'\b(?P<time_hour>[01]?\d|2[0-3]|24(?=:00)):(?P<time_minute>[0-5]\d)\b'),
+            # Geen eenheid als er een afkorting volgt ("10 m.b.t." is geen 10 meter)
+            ('unit', rf'\b(?P<unit_value>\d+(?:[.,]\d+)?)\s?(?P<unit_name>{_alternation(self.units)})(?!\w|\.\w)'),
+            ('ordinal', r'\b(?P<ordinal_value>\d+)(?:ste|de|e)\b'),
+            # Decimalen met punt of komma ("3,5"); bedragen zijn al door currency gepakt
+            ('number', r'\b\d+(?:[.,]\d+)?\b'),
+            ('acronym', r'\b[A-Z]{2,}\b'),
+        ]
+        if self.words:
+            rules.append(('word', rf'\b(?i:{_alternation(self.words)})\b'))
+
+        self.pattern = re.compile('|'.join(f'(?P<{name}>{regex})' for name, regex in rules))
+        self._handlers = {name: getattr(self, f'_{name}') for name, _ in rules}
+
+    def normalize(self, text: str) -> str:
+        """
+        Normaliseer tekst voor betere Nederlandse TTS uitspraak.
+
+        Args:
+            text: Ruwe tekst
+
+        Returns:
+            Genormaliseerde tekst voor TTS
+        """
+        state = {'first_paren': True}
+
+        def dispatch(match: re.Match) -> str:
+            return self._handlers[match.lastgroup](match, state)
+
+        return self.pattern.sub(dispatch, text)
+
+    # ------------------------------------------------------------------
+    # Rules (match, state) → vervanging
+    # ------------------------------------------------------------------
+
+    def _paren_open(self, match: re.Match, state: dict) -> str:
+        # Eerste ( wordt ", ", daarna haakjes verwijderen
+        if state['first_paren']:
+            state['first_paren'] = False
+            return ', '
+        return match.group(0)[:-1]
+
+    def _paren_close(self, match: re.Match, state: dict) -> str:
+        return ''
+
+    def _currency(self, match: re.Match, state: dict) -> str:
+        name = self.currencies[match.group('cur_symbol')]
+        spoken = f"{self._say(match.group('cur_whole'))} {name}"
+        cents = match.group('cur_cents')
+        if cents and int(cents):
+            spoken += f" {number_to_words(int(cents))}"
+        return spoken
+
+    def _time(self, match: re.Match, state: dict) -> str:
+        hour = number_to_words(int(match.group('time_hour')))
+        minute = int(match.group('time_minute'))
+        return f"{hour} uur {number_to_words(minute)}" if minute else f"{hour} uur"
+
+    def _unit(self, match: re.Match, state: dict) -> str:
+        return f"{self._say(match.group('unit_value'))} {self.units[match.group('unit_name')]}"
+
+    def _ordinal(self, match: re.Match, state: dict) -> str:
+        try:
+            return number_to_words(int(match.group('ordinal_value')), ordinal=True)
+        except (ValueError, OverflowError, NotImplementedError):
+            return match.group(0)
+
+    def _number(self, match: re.Match, state: dict) -> str:
+        return self._say(match.group(0))
+
+    def _acronym(self, match: re.Match, state: dict) -> str:
         acronym = match.group(0)
-        if acronym in SKIP_ACRONYMS:
+        if acronym in self.skip_acronyms:
             return acronym
-        return '-'.join(NL_LETTER_SOUNDS.get(c, c) for c in acronym)
+        return '-'.join(self.letters.get(c, c) for c in acronym)
 
-    text = re.sub(r'\b[A-Z]{2,}\b', spell_acronym, text)
+    def _word(self, match: re.Match, state: dict) -> str:
+        return self.words.get(match.group(0).lower(), match.group(0))
 
-    # 3. SPECIFIEKE WOORDEN
-    for pattern, replacement in WORD_REPLACEMENTS.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-
-    # 4. GETALLEN: naar Nederlandse woorden
-    def replace_number(match):
-        num_str = match.group(0)
+    @staticmethod
+    def _say(num_str: str) -> str:
+        """Geheel getal of decimaal ("3.14" of "3,14" → "drie komma een vier")."""
         try:
-            if '.' in num_str:
-                parts = num_str.split('.')
-                whole = num2words(int(parts[0]), lang='nl')
-                decimal = ' '.join(num2words(int(d), lang='nl') for d in parts[1])
-                return f"{whole} komma {decimal}"
-            return num2words(int(num_str), lang='nl')
+            whole, separator, decimals = num_str.replace(',', '.').partition('.')
+            if separator:
+                spoken = ' '.join(number_to_words(int(d)) for d in decimals)
+                return f"{number_to_words(int(whole))} komma {spoken}"
+            return number_to_words(int(num_str))
         except (ValueError, OverflowError):
             return num_str
 
-    text = re.sub(r'\b\d+(?:\.\d+)?\b', replace_number, text)
 
-    return text
+# Gedeelde normalizer (opnieuw gezet bij startup/config reload met de regels uit config.yml)
+_normalizer: Optional[TextNormalizer] = None
+
+
+def get_normalizer() -> TextNormalizer:
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = TextNormalizer()
+    return _normalizer
+
+
+def configure_normalizer(**rules) -> TextNormalizer:
+    """Vervang de gedeelde normalizer (rules: letters, skip_acronyms, words, units, currencies)."""
+    global _normalizer
+    _normalizer = TextNormalizer(**rules)
+    return _normalizer
+
+
+def normalize_for_tts(text: str) -> str:
+    """
+    Normaliseer tekst voor betere Nederlandse TTS uitspraak.
+
+    Transformaties (in één pass, zie TextNormalizer):
+    1. Haakjes → komma's
+    2. Bedragen, tijden, eenheden, rangtelwoorden en getallen → woorden
+    3. Acroniemen → fonetische spelling
+    4. Engelse woorden → Nederlands-klinkend
+
+    Args:
+        text: Ruwe tekst
+
+    Returns:
+        Genormaliseerde tekst voor TTS
+    """
+    return get_normalizer().normalize(text)
+
+
+# Zinsgrens: . ! ? gevolgd door whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
 
 
 def split_into_sentences(text: str) -> list[str]:
@@ -95,7 +247,231 @@ def split_into_sentences(text: str) -> list[str]:
         Lijst van zinnen (non-empty)
     """
     # Split op . ! ? gevolgd door spatie of einde string
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    sentences = SENTENCE_BOUNDARY.split(text.strip())
 
     # Filter lege zinnen
     return [s.strip() for s in sentences if s.strip()]
+
+
+class SentenceSegmenter:
+    """
+    Incrementele variant van split_into_sentences voor LLM token streams.
+
+    Een zin wordt pas vrijgegeven als er whitespace na de . ! ? volgt,
+    zodat bijv. "3." niet te vroeg wordt afgesplitst van "3.5".
+
+    Usage:
+        segmenter = SentenceSegmenter()
+        for delta in token_stream:
+            for sentence in segmenter.feed(delta):
+                speak(sentence)
+        for sentence in segmenter.flush():
+            speak(sentence)
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Voeg tekst toe en return alle zinnen die nu compleet zijn.
+
+        Args:
+            text: Nieuwe tekst (token delta)
+
+        Returns:
+            Lijst van complete zinnen (kan leeg zijn)
+        """
+        self._buffer += text
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        if len(parts) == 1:
+            return []
+
+        self._buffer = parts[-1]
+        return [p.strip() for p in parts[:-1] if p.strip()]
+
+    def flush(self) -> list[str]:
+        """Return de resterende tekst als laatste zin(nen) en reset."""
+        remaining = split_into_sentences(self._buffer)
+        self._buffer = ""
+        return remaining
+
+
+# Nederlandse afkortingen (zonder laatste punt, lowercase): geen zinsgrens
+ABBREVIATIONS = {
+    'bijv', 'bv', 'o.a', 'd.w.z', 'm.a.w', 'i.p.v', 't.o.v', 'a.u.b', 'z.s.m', 'e.d',
+    'enz', 'etc', 'ca', 'nr', 'blz', 'evt', 'incl', 'excl', 'resp', 'vs', 'jl', 'mln', 'mld',
+    'dhr', 'mevr', 'mr', 'dr', 'drs', 'ir', 'ing', 'prof', 'st', 'n.a.v', 'm.b.v', 'm.b.t',
+}
+
+# Kandidaat zinsgrens: . ! ? … (plus afsluitende quotes/haakjes) en dan het volgende teken
+SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s+(\S)|\s*$)')
+
+# Bijzin grens voor een snelle eerste chunk: , ; : – — gevolgd door whitespace
+CLAUSE_END = re.compile(r'[,;:–—]+(?=\s)')
+
+# Text-based tool call (zie TEXT_TOOL_CALL_PATTERN in ollama.py), ook nog open: "show_emotion[ARGS]{..."
+TEXT_TOOL_CALL = re.compile(r'\w+\[ARGS\]\{[^}]*\}?')
+
+
+def _is_sentence_end(text: str, match: re.Match, final: bool) -> bool:
+    """Echte zinsgrens, of een afkorting/initiaal/voortzetting in kleine letters?"""
+    following = match.group(1)
+    if following is None and not final:
+        return False  # Nog niet bekend wat er volgt: wachten op meer tokens
+    punctuation = match.group(0)
+    if not punctuation.startswith('.') or punctuation.startswith('...'):
+        # ! ? en … zijn altijd een grens, tenzij de zin in kleine letters doorloopt
+        return following is None or not following.islower()
+    if following is not None and following.islower():
+        return False  # "bijv. een auto", "ca. twee": loopt door
+    before = text[:match.start()].split()
+    word = before[-1].lstrip('("\'').lower() if before else ''
+    if word in ABBREVIATIONS:
+        return False
+    # Initiaal ("J. Jansen"), maar niet het woord "U" of een getal
+    return not (len(word) == 1 and word.isalpha() and word != 'u')
+
+
+class ProsodyChunker:
+    """
+    Adaptieve chunker voor TTS streaming (vervangt SentenceSegmenter).
+
+    Time-to-first-audio hangt af van de eerste chunk, de doorlooptijd van
+    het aantal Fish requests. Daarom:
+    - De eerste chunk gaat zo vroeg mogelijk weg: bij de eerste zinsgrens,
+      of als de zin lang wordt al bij een komma/bijzin grens.
+    - Daarna worden zinnen samengevoegd richting target_chars, oplopend
+      (2x de vorige target) zodat chunk 2 klaar is voordat chunk 1 uitgesproken is.
+    - Afkortingen ("bijv.", "o.a."), initialen en decimalen ("3.5")
+      splitsen niet.
+    - Nooit knippen in een text tool call (name[ARGS]{json}): die moet heel
+      blijven, anders haalt strip_text_tool_calls hem niet uit de chunk.
+
+    Zelfde interface als SentenceSegmenter:
+        chunker = ProsodyChunker()
+        for delta in token_stream:
+            for chunk in chunker.feed(delta):
+                speak(chunk)
+        for chunk in chunker.flush():
+            speak(chunk)
+    """
+
+    def __init__(
+        self,
+        first_min_chars: int = 12,
+        first_max_chars: int = 50,
+        target_chars: int = 120,
+        max_chars: int = 220
+    ):
+        self.first_min_chars = first_min_chars
+        self.first_max_chars = first_max_chars
+        self.target_chars = target_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Voeg tekst toe en return alle chunks die nu klaar zijn.
+
+        Args:
+            text: Nieuwe tekst (token delta)
+
+        Returns:
+            Lijst van chunks (kan leeg zijn)
+        """
+        self._buffer += text
+        chunks = []
+        while True:
+            end = self._next_cut(final=False)
+            if end is None:
+                break
+            chunk = self._buffer[:end].strip()
+            self._buffer = self._buffer[end:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+                self._emitted += 1
+        return chunks
+
+    def flush(self) -> list[str]:
+        """Return de resterende tekst (samengevoegd tot max_chars) en reset."""
+        chunks = []
+        while self._buffer.strip():
+            end = self._next_cut(final=True)
+            if end is None or (self._emitted and len(self._buffer.strip()) <= self.max_chars):
+                end = len(self._buffer)  # Rest past in één chunk
+            chunk = self._buffer[:end].strip()
+            self._buffer = self._buffer[end:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+                self._emitted += 1
+        self._buffer = ""
+        self._emitted = 0
+        return chunks
+
+    def _sentence_ends(self, final: bool) -> list[int]:
+        return [
+            match.end() for match in SENTENCE_END.finditer(self._buffer)
+            if _is_sentence_end(self._buffer, match, final) and not self._in_tool_call(match.end())
+        ]
+
+    def _in_tool_call(self, position: int) -> bool:
+        """Valt position binnen een (nog open) text tool call?"""
+        for match in TEXT_TOOL_CALL.finditer(self._buffer):
+            if match.start() >= position:
+                break
+            if not match.group(0).endswith('}') or position < match.end():
+                return True
+        return False
+
+    def _clause_cut(self, min_chars: int, max_chars: int) -> Optional[int]:
+        """Laatste bijzin grens tussen min_chars en max_chars."""
+        cut = None
+        for match in CLAUSE_END.finditer(self._buffer):
+            if match.end() > max_chars:
+                break
+            if match.end() >= min_chars and not self._in_tool_call(match.end()):
+                cut = match.end()
+        return cut
+
+    def _next_cut(self, final: bool) -> Optional[int]:
+        """Positie waarop de volgende chunk eindigt, of None (meer tekst nodig)."""
+        ends = self._sentence_ends(final)
+
+        if self._emitted == 0:
+            # Eerste chunk: de eerste zin, hoe kort ook (snelste eerste audio)
+            if ends:
+                first = ends[0]
+                if first <= self.first_max_chars:
+                    return first
+            if len(self._buffer) >= self.first_max_chars:
+                # Lange eerste zin: al bij een komma knippen
+                cut = self._clause_cut(self.first_min_chars, self.first_max_chars)
+                if cut is not None:
+                    return cut
+            return ends[0] if ends else self._overflow_cut()
+
+        target = min(self.target_chars, self.first_max_chars * 2 ** self._emitted)
+        if not ends:
+            return self._overflow_cut()
+        # Zoveel hele zinnen als past; minstens één, ook als die langer is dan max_chars
+        fitting = [end for end in ends if end <= self.max_chars] or ends[:1]
+        reached = [end for end in fitting if end >= target]
+        if reached:
+            return reached[0]
+        if final or fitting[-1] < ends[-1] or len(self._buffer) > self.max_chars:
+            return fitting[-1]  # Volgende zin past er niet meer bij
+        return None
+
+    def _overflow_cut(self) -> Optional[int]:
+        """Geen zinsgrens en de buffer wordt te lang: op een bijzin (of spatie) knippen."""
+        if len(self._buffer) <= self.max_chars:
+            return None
+        cut = self._clause_cut(self.first_min_chars, self.max_chars)
+        if cut is None:
+            cut = self._buffer.rfind(' ', 0, self.max_chars)
+            while cut > 0 and self._in_tool_call(cut):
+                cut = self._buffer.rfind(' ', 0, cut)
+        return cut if cut > 0 else None
+
@@ -0,0 +1,338 @@
+"""
+Span-based latency tracing per turn.
+
+Elke turn (WebSocket utterance of REST conversation) is een trace met spans
+voor STT, elke LLM round-trip, elke tool (ook remote), elke TTS zin en elke
+WebSocket send. De actieve trace/span zit in ContextVars, zodat gelijktijdige
+turns (één task per message) elkaar niet zien en child tasks (TTS pipeline)
+automatisch onder de juiste turn vallen.
+
+Per span naam wordt een histogram bijgehouden (Prometheus buckets + recente
+samples voor percentielen). Afgeronde traces kunnen als JSONL weggeschreven
+worden en later offline opnieuw ingelezen:
+
+    python -m app.utils.tracing logs/traces.jsonl
+"""
+import functools
+import json
+import sys
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
+
+# Histogram bucket grenzen in ms (Prometheus "le" labels)
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Aantal recente samples per span naam voor p50/p95/p99
+RESERVOIR_SIZE = 1024
+
+
+@dataclass
+class Span:
+    """Eén gemeten stap binnen een trace."""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float                 # Wall clock (epoch seconden)
+    duration_ms: float = 0.0
+    attrs: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class Trace:
+    """Alle spans van één turn."""
+    name: str
+    trace_id: str
+    start: float
+    attrs: dict = field(default_factory=dict)
+    spans: list[Span] = field(default_factory=list)
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Histogram:
+    """Cumulatieve bucket counts plus een reservoir van recente samples."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS_MS, reservoir: int = RESERVOIR_SIZE):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque[float] = deque(maxlen=reservoir)
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.sum += value_ms
+        self.samples.append(value_ms)
+        for i, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "p99_ms": round(self.percentile(99), 1)
+        }
+
+
+class Tracer:
+    """
+    Verzamelt traces en span histogrammen.
+
+    Usage:
+        tracer = get_tracer()
+        with tracer.trace("ws_turn", client_id="pi-1"):
+            with tracer.span("stt"):
+                text = await stt.transcribe(audio)
+            tracer.record("llm.first_token", 180.0)
+
+    Spans buiten een trace (bijv. warmup, summarizer) tellen alleen mee in
+    de histogrammen.
+    """
+
+    def __init__(self, export_path: Optional[str] = None, max_traces: int = 200):
+        self.histograms: dict[str, Histogram] = {}
+        self.recent: deque[Trace] = deque(maxlen=max_traces)
+        self.traces = 0
+        self.errors = 0
+
+        self._trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+        self._span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+        self.export_path = Path(export_path) if export_path else None
+        self._export_file = None
+        if self.export_path:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+            self._export_file = open(self.export_path, "a", encoding="utf-8", buffering=1)
+
+    @property
+    def current_trace(self) -> Optional[Trace]:
+        return self._trace.get()
+
+    @contextmanager
+    def trace(self, name: str, **attrs) -> Iterator[Trace]:
+        """Start een trace voor één turn (alle spans hieronder horen erbij)."""
+        trace = Trace(name=name, trace_id=uuid.uuid4().hex[:16], start=time.time(), attrs=attrs)
+        trace_token = self._trace.set(trace)
+        span_token = self._span.set(None)
+        t0 = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as e:
+            trace.error = type(e).__name__
+            raise
+        finally:
+            trace.duration_ms = (time.perf_counter() - t0) * 1000
+            _reset(self._span, span_token)
+            _reset(self._trace, trace_token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, activate: bool = True, **attrs) -> Iterator[Span]:
+        """
+        Meet een stap; valt onder de actieve trace (als die er is).
+
+        activate=False voor spans in async generators: die draaien in de
+        context van de consumer, dus de span mag daar niet de parent worden
+        van alles wat de consumer tussen twee yields doet.
+        """
+        parent = self._span.get()
+        span = Span(
+            name=name,
+            span_id=uuid.uuid4().hex[:8],
+            parent_id=parent.span_id if parent else None,
+            start=time.time(),
+            attrs=attrs
+        )
+        token = self._span.set(span) if activate else None
+        t0 = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - t0) * 1000
+            if token is not None:
+                _reset(self._span, token)
+            self._add_span(span)
+
+    def record(self, name: str, duration_ms: float, **attrs) -> None:
+        """Voeg een al gemeten duur toe als span (bijv. time-to-first-token)."""
+        parent = self._span.get()
+        self._add_span(Span(
+            name=name,
+            span_id=uuid.uuid4().hex[:8],
+            parent_id=parent.span_id if parent else None,
+            start=time.time() - duration_ms / 1000,
+            duration_ms=duration_ms,
+            attrs=attrs
+        ))
+
+    def annotate(self, **attrs) -> None:
+        """Zet attributen op de actieve trace (bijv. transcriptie lengte)."""
+        trace = self._trace.get()
+        if trace is not None:
+            trace.attrs.update(attrs)
+
+    def summary(self) -> dict:
+        """Percentielen per span naam (voor JSON endpoints)."""
+        return {name: hist.summary() for name, hist in sorted(self.histograms.items())}
+
+    def render_prometheus(self, prefix: str = "nerdcarx") -> str:
+        """Histogrammen in het Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_span_duration_ms Duur per span (STT, LLM, tools, TTS, WebSocket send)",
+            f"# TYPE {prefix}_span_duration_ms histogram",
+        ]
+        for name, hist in sorted(self.histograms.items()):
+            label = _escape_label(name)
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'{prefix}_span_duration_ms_bucket{{span="{label}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_span_duration_ms_bucket{{span="{label}",le="+Inf"}} {hist.count}')
+            lines.append(f'{prefix}_span_duration_ms_sum{{span="{label}"}} {hist.sum:.3f}')
+            lines.append(f'{prefix}_span_duration_ms_count{{span="{label}"}} {hist.count}')
+
+        lines += [
+            f"# HELP {prefix}_traces_total Afgeronde turns",
+            f"# TYPE {prefix}_traces_total counter",
+            f"{prefix}_traces_total {self.traces}",
+            f"# HELP {prefix}_trace_errors_total Turns die met een exception eindigden",
+            f"# TYPE {prefix}_trace_errors_total counter",
+            f"{prefix}_trace_errors_total {self.errors}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self._export_file is not None:
+            self._export_file.close()
+            self._export_file = None
+
+    @classmethod
+    def replay(cls, path: str) -> "Tracer":
+        """Bouw histogrammen opnieuw op uit een JSONL trace export."""
+        tracer = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                trace = Trace(
+                    name=data["name"],
+                    trace_id=data["trace_id"],
+                    start=data["start"],
+                    attrs=data.get("attrs", {}),
+                    spans=[Span(**span) for span in data.get("spans", [])],
+                    duration_ms=data.get("duration_ms", 0.0),
+                    error=data.get("error")
+                )
+                for span in trace.spans:
+                    tracer._observe(span.name, span.duration_ms)
+                tracer._finish(trace, export=False)
+        return tracer
+
+    def _add_span(self, span: Span) -> None:
+        self._observe(span.name, span.duration_ms)
+        trace = self._trace.get()
+        if trace is not None:
+            trace.spans.append(span)
+
+    def _observe(self, name: str, duration_ms: float) -> None:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.observe(duration_ms)
+
+    def _finish(self, trace: Trace, export: bool = True) -> None:
+        self.traces += 1
+        if trace.error:
+            self.errors += 1
+        self._observe(f"turn.{trace.name}", trace.duration_ms)
+        self.recent.append(trace)
+
+        if export and self._export_file is not None:
+            self._export_file.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+
+
+def _reset(var: ContextVar, token) -> None:
+    """Reset een ContextVar; een generator kan in een andere context sluiten."""
+    try:
+        var.reset(token)
+    except ValueError:
+        pass
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Global tracer (lazy, geconfigureerd bij startup via configure_tracer)
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def configure_tracer(export_path: Optional[str] = None, max_traces: int = 200) -> Tracer:
+    """Vervang de globale tracer (aangeroepen bij startup met de debug config)."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = Tracer(export_path=export_path, max_traces=max_traces)
+    return _tracer
+
+
+def traced(name: str):
+    """Decorator: elke call van een async functie (bijv. REST route) is één trace."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with get_tracer().trace(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def traced_stream(name: str, stream: AsyncIterator, **attrs) -> AsyncIterator:
+    """Trace rond een async generator (SSE): loopt tot de laatste event verstuurd is."""
+    with get_tracer().trace(name, **attrs):
+        async for item in stream:
+            yield item
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Gebruik: python -m app.utils.tracing <traces.jsonl>")
+        sys.exit(1)
+
+    replayed = Tracer.replay(sys.argv[1])
+    print(f"{replayed.traces} traces ({replayed.errors} met fout)\n")
+    print(f"{'span':<36} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for span_name, stats in replayed.summary().items():
+        print(
+            f"{span_name:<36} {stats['count']:>6} {stats['p50_ms']:>7.0f}ms "
+            f"{stats['p95_ms']:>7.0f}ms {stats['p99_ms']:>7.0f}ms"
+        )
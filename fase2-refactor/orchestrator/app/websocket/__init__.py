@@ -1,13 +1,39 @@
 """WebSocket support voor Pi ↔ Desktop communicatie."""
-from .protocol import MessageType, Message, AudioProcessMessage, ResponseMessage
+from .protocol import (
+    MessageType,
+    Message,
+    AudioProcessMessage,
+    AudioStartMessage,
+    AudioFrameMessage,
+    AudioEndMessage,
+    ResponseMessage,
+    HelloMessage,
+    InterruptMessage,
+    BinaryFrame,
+    FrameType,
+    AudioCodec,
+)
 from .manager import ConnectionManager
+from .streams import AudioStream, AudioStreamManager
+from .speculation import SpeculativeSTT
 from .handlers import MessageHandler
 
 __all__ = [
     "MessageType",
     "Message",
     "AudioProcessMessage",
+    "AudioStartMessage",
+    "AudioFrameMessage",
+    "AudioEndMessage",
     "ResponseMessage",
+    "HelloMessage",
+    "InterruptMessage",
+    "BinaryFrame",
+    "FrameType",
+    "AudioCodec",
     "ConnectionManager",
+    "AudioStream",
+    "AudioStreamManager",
+    "SpeculativeSTT",
     "MessageHandler",
 ]
@@ -4,25 +4,170 @@ import base64
 import json
 import time
 import uuid
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
 
 from .protocol import (
     MessageType,
     Message,
     ResponseMessage,
-    AudioChunkMessage,
     FunctionCallMessage,
     FunctionRequestMessage,
     ErrorMessage,
+    HelloMessage,
+    HeartbeatMessage,
+    InterruptMessage,
+    AudioStartMessage,
+    AudioFrameMessage,
+    AudioEndMessage,
+    BinaryFrame,
+    BINARY_VERSION,
 )
 from .manager import ConnectionManager
-from ..config import get_config
-from ..models import EmotionManager, ConversationManager, FunctionCall
-from ..services import OllamaLLM, VoxtralSTT, FishAudioTTS, ToolRegistry
+from .streams import AudioStream, AudioStreamManager
+from .speculation import SpeculativeSTT
+from ..config import get_config, SpeculationConfig
+from ..memory import ConversationStore
+from ..models import EmotionManager, FunctionCall
+from ..providers import get_llm, get_stt, get_tts, get_prompt_assembler, get_tool_scheduler, create_chunker
+from ..services import (
+    OllamaLLM,
+    FishAudioTTS,
+    ToolRegistry,
+    SentenceStream,
+    LLMPrefetch,
+    TTSPipeline,
+    StreamingTTSPipeline,
+    PromptState,
+    ToolCall,
+    parse_tool_calls,
+)
+from ..services.admission import BackendOverloaded, admission_context
 from ..utils import split_into_sentences, ConversationDebugger
+from ..utils.tracing import get_tracer
+
+
+@dataclass
+class _ActiveTurn:
+    """
+    Laatste turn per client, voor barge-in.
+
+    Blijft bewaard als de turn op de desktop al klaar is: de Pi kan dan nog
+    aan het afspelen zijn, en de history moet alsnog ingekort worden.
+    """
+    task: asyncio.Task
+    conv_id: str
+    sentences: list[str] = field(default_factory=list)  # Verstuurde audio chunks (op index)
+    user_seq: Optional[int] = None
+    assistant_seq: Optional[int] = None
+    interrupted: bool = False
+
+
+class _AudioChunkStreamer:
+    """
+    Stuurt per-zin TTS audio als audio chunks naar de Pi (binary of JSON).
+
+    speak() zet een zin in een TTSPipeline, zodat volgende zinnen al
+    gesynthetiseerd worden terwijl de vorige verstuurd wordt. Een sender
+    task stuurt de resultaten strikt op volgorde van index.
+
+    Met stream_audio gaat elk Fish segment als eigen chunk weg (StreamingTTSPipeline):
+    het begin van een lange zin speelt al terwijl de rest nog gegenereerd
+    wordt. De zin staat dan alleen bij het eerste segment.
+
+    De laatste chunk wordt vastgehouden tot finish(), zodat is_last correct
+    gezet kan worden terwijl het totaal aantal zinnen nog onbekend is.
+    """
+
+    def __init__(
+        self,
+        connections: ConnectionManager,
+        client_id: str,
+        conv_id: str,
+        tts: FishAudioTTS,
+        lookahead: int = 3,
+        sent: Optional[list[str]] = None,
+        stream_audio: bool = False
+    ):
+        self.connections = connections
+        self.client_id = client_id
+        self.conv_id = conv_id
+        self.chunks = 0
+        # Zin per verstuurde chunk (index = positie, "" voor vervolg segmenten), voor het inkorten na barge-in
+        self.sent = sent if sent is not None else []
+        self.started_at = time.perf_counter()
+        self.first_audio_ms: Optional[float] = None
+        self._pending: Optional[tuple[str, bytes]] = None
+        self._stream_audio = stream_audio
+        if stream_audio:
+            self._pipeline = StreamingTTSPipeline(tts.synthesize_stream, lookahead=lookahead)
+        else:
+            self._pipeline = TTSPipeline(tts.synthesize, lookahead=lookahead)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def speak(self, sentence: str) -> None:
+        """Bied een zin aan voor synthesis (wacht als het window vol zit)."""
+        if self._sender.done():
+            # Sender is gestopt (bijv. disconnect): gooi die fout hier op
+            await self._sender
+        await self._pipeline.submit(sentence)
+
+    async def finish(self) -> None:
+        """Wacht op alle zinnen en stuur de laatste chunk met is_last=True."""
+        self._pipeline.close()
+        await self._sender
+        await self._send_pending(is_last=True)
+
+    def cancel(self) -> None:
+        """Annuleer lopende synthesis requests en de sender (idempotent)."""
+        self._pipeline.cancel()
+        self._sender.cancel()
+
+    async def _send_loop(self) -> None:
+        try:
+            last_index = None
+            async for index, sentence, audio_bytes in self._audio():
+                if not audio_bytes:
+                    continue
+
+                if self.first_audio_ms is None:
+                    self.first_audio_ms = (time.perf_counter() - self.started_at) * 1000
+
+                await self._send_pending(is_last=False)
+                self._pending = (sentence if index != last_index else "", audio_bytes)
+                last_index = index
+        except BaseException:
+            self._pipeline.cancel()
+            raise
+
+    async def _audio(self) -> AsyncIterator[tuple[int, str, bytes]]:
+        """(index, zin, WAV) per zin, of per segment met stream_audio."""
+        if self._stream_audio:
+            async for index, sentence, segment in self._pipeline.segments():
+                yield index, sentence, segment.to_wav()
+        else:
+            async for index, sentence, result in self._pipeline.results():
+                yield index, sentence, result.audio_bytes
+
+    async def _send_pending(self, is_last: bool) -> None:
+        if self._pending is None:
+            return
+
+        sentence, audio_bytes = self._pending
+        self._pending = None
 
-# Timeout voor remote tool execution (seconden)
-REMOTE_TOOL_TIMEOUT = 30.0
+        sent = await self.connections.send_audio_chunk(
+            self.client_id,
+            self.conv_id,
+            audio_bytes,
+            sentence=sentence or None,
+            index=self.chunks,
+            is_last=is_last
+        )
+        self.chunks += 1
+        if not sent:
+            raise ConnectionError(f"Client {self.client_id} niet meer verbonden")
+        self.sent.append(sentence)
 
 
 class MessageHandler:
@@ -36,32 +181,61 @@ class MessageHandler:
         self,
         connection_manager: ConnectionManager,
         emotion_manager: EmotionManager,
-        conversation_manager: ConversationManager,
+        conversation_manager: ConversationStore,
         tool_registry: ToolRegistry,
-        debugger: Optional[ConversationDebugger] = None
+        debugger: Optional[ConversationDebugger] = None,
+        audio_streams: Optional[AudioStreamManager] = None,
+        speculation: Optional[SpeculationConfig] = None
     ):
         self.connections = connection_manager
         self.emotions = emotion_manager
         self.conversations = conversation_manager
         self.tools = tool_registry
 
+        # Lopende streaming uploads (audio_start/audio_frame/audio_end)
+        self.audio_streams = audio_streams or AudioStreamManager()
+
+        # Partials + LLM prefetch tijdens streaming uploads
+        speculation = speculation or SpeculationConfig(enabled=False)
+        self.speculator = SpeculativeSTT(
+            transcribe=lambda audio, language: get_stt().transcribe(audio, language=language),
+            prefetch=self._start_prefetch if speculation.prefetch_llm else None,
+            enabled=speculation.enabled,
+            interval_s=speculation.interval_s,
+            pause_ms=speculation.pause_ms,
+            silence_rms=speculation.silence_rms,
+            min_audio_s=speculation.min_audio_s,
+            max_partials=speculation.max_partials
+        )
+
+        # Laatste sensor waarden per conversation (gaan mee in de prompt status)
+        self.sensor_state: dict[str, dict] = {}
+
         # Debug logger (optioneel, via config)
         self.debugger = debugger or ConversationDebugger(enabled=False)
 
         # Pending remote tool requests: request_id -> (event, result_dict)
         self._pending_requests: dict[str, tuple[asyncio.Event, dict]] = {}
 
-    async def handle_message(self, client_id: str, raw_data: str) -> None:
+        # Laatste turn per client (barge-in via INTERRUPT)
+        self._turns: dict[str, _ActiveTurn] = {}
+        self.interrupts = 0
+        self.interrupts_cancelled = 0
+
+    async def handle_message(self, client_id: str, raw_data: str | bytes) -> None:
         """
         Verwerk binnenkomend message.
 
         Args:
             client_id: Client identifier
-            raw_data: Raw JSON string
+            raw_data: Raw JSON string, of een binary audio frame
         """
         try:
-            data = json.loads(raw_data)
-            message = Message.from_dict(data)
+            if isinstance(raw_data, bytes):
+                message = BinaryFrame.decode(raw_data).to_message()
+            else:
+                data = json.loads(raw_data)
+                message = Message.from_dict(data)
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             await self._send_error(client_id, "default", f"Invalid message: {e}")
             return
@@ -72,15 +246,22 @@ class MessageHandler:
         # Route naar juiste handler
         handlers = {
             MessageType.AUDIO_PROCESS: self._handle_audio_process,
+            MessageType.AUDIO_START: self._handle_audio_start,
+            MessageType.AUDIO_FRAME: self._handle_audio_frame,
+            MessageType.AUDIO_END: self._handle_audio_end,
             MessageType.WAKE_WORD: self._handle_wake_word,
             MessageType.SENSOR_UPDATE: self._handle_sensor_update,
             MessageType.HEARTBEAT: self._handle_heartbeat,
             MessageType.FUNCTION_RESULT: self._handle_function_result,
+            MessageType.HELLO: self._handle_hello,
+            MessageType.INTERRUPT: self._handle_interrupt,
         }
 
         handler = handlers.get(message.type)
         if handler:
-            await handler(client_id, message)
+            # Backend calls van dit bericht tellen voor deze client (fairness in de admission queues)
+            with admission_context(client_id=client_id):
+                await handler(client_id, message)
         else:
             await self._send_error(
                 client_id,
@@ -89,6 +270,136 @@ class MessageHandler:
             )
 
     async def _handle_audio_process(self, client_id: str, message: Message) -> None:
+        """Verwerk een complete utterance in één bericht (base64 JSON of binary frame)."""
+        conv_id = message.conversation_id
+
+        # Binary frames leveren raw bytes, JSON messages base64
+        audio_bytes = message.payload.get("audio_bytes")
+        audio_b64 = message.payload.get("audio_base64")
+        if not audio_bytes and not audio_b64:
+            await self._send_error(client_id, conv_id, "No audio data")
+            return
+
+        try:
+            if not audio_bytes:
+                audio_bytes = base64.b64decode(audio_b64)
+        except ValueError as e:
+            await self._send_error(client_id, conv_id, f"Invalid audio data: {e}")
+            return
+
+        await self._process_utterance(
+            client_id, conv_id, audio_bytes,
+            language=message.payload.get("language", "nl")
+        )
+
+    async def _handle_audio_start(self, client_id: str, message: Message) -> None:
+        """Start een streaming upload; frames volgen tijdens het spreken."""
+        start = AudioStartMessage(conversation_id=message.conversation_id, payload=message.payload)
+        if not start.stream_id:
+            await self._send_error(client_id, message.conversation_id, "audio_start zonder stream_id")
+            return
+
+        stream = self.audio_streams.start(
+            client_id,
+            message.conversation_id,
+            start.stream_id,
+            sample_rate=start.sample_rate,
+            channels=start.channels,
+            language=start.language
+        )
+        self.speculator.start(stream)
+
+    async def _handle_audio_frame(self, client_id: str, message: Message) -> None:
+        """Voeg een PCM frame toe aan de lopende upload."""
+        frame = AudioFrameMessage(conversation_id=message.conversation_id, payload=message.payload)
+
+        # Geen await vóór append: handler tasks starten FIFO, dus frames
+        # komen op volgorde in de buffer
+        pcm = message.payload.get("audio_bytes")
+        if pcm is None:
+            try:
+                pcm = base64.b64decode(message.payload.get("audio_base64") or "")
+            except ValueError:
+                pcm = b""
+
+        if not self.audio_streams.append(client_id, frame.stream_id, pcm, frame.index):
+            await self._send_error(
+                client_id, message.conversation_id, f"Unknown audio stream: {frame.stream_id}"
+            )
+            return
+        self.speculator.on_frame(self.audio_streams.get(client_id, frame.stream_id), pcm)
+
+    async def _handle_audio_end(self, client_id: str, message: Message) -> None:
+        """Einde spraak: de audio ligt al klaar, dus STT start direct."""
+        end = AudioEndMessage(conversation_id=message.conversation_id, payload=message.payload)
+
+        if end.aborted:
+            self.audio_streams.abort(client_id, end.stream_id)
+            self.speculator.discard(client_id, end.stream_id)
+            return
+
+        stream = self.audio_streams.finish(client_id, end.stream_id)
+        if stream is None:
+            await self._send_error(
+                client_id, message.conversation_id, f"Unknown audio stream: {end.stream_id}"
+            )
+            return
+        if stream.num_bytes == 0:
+            self.speculator.discard(client_id, end.stream_id)
+            await self._send_error(client_id, message.conversation_id, "No audio data")
+            return
+
+        await self._process_utterance(
+            client_id, stream.conversation_id, stream.to_wav(),
+            language=stream.language,
+            stream=stream
+        )
+
+    def _start_prefetch(self, stream: AudioStream, text: str) -> Optional[LLMPrefetch]:
+        """Start de LLM call voor een partial, zonder hem aan de history toe te voegen."""
+        config = get_config()
+        conv_id = stream.conversation_id
+        conv = self.conversations.get_or_create(conv_id, config.system_prompt)
+        tools = self.tools.get_definitions()
+        state = PromptState(
+            emotion=self.emotions.get_state(conv_id).emotion,
+            sensors=self.sensor_state.get(conv_id, {})
+        )
+        # Alleen renderen: de request telt pas mee in de prompt metrics als de prefetch gebruikt wordt
+        messages = get_prompt_assembler().render(
+            conv, config.system_prompt, state, user_message=text
+        )
+        return LLMPrefetch(text, messages, tools, get_llm().chat_stream(messages=messages, tools=tools))
+
+    async def _process_utterance(
+        self,
+        client_id: str,
+        conv_id: str,
+        audio_bytes: bytes,
+        language: str = "nl",
+        stream: Optional[AudioStream] = None
+    ) -> None:
+        """Verwerk één utterance als trace (spans: STT, LLM, tools, TTS, sends)."""
+        active = _ActiveTurn(asyncio.current_task(), conv_id)
+        self._turns[client_id] = active
+        with get_tracer().trace(
+            "ws_turn", client_id=client_id, conversation_id=conv_id,
+            streaming_upload=stream is not None
+        ) as trace:
+            await self._run_utterance(
+                trace.trace_id[:8], active, client_id, conv_id, audio_bytes, language, stream
+            )
+
+    async def _run_utterance(
+        self,
+        turn_id: str,
+        active: _ActiveTurn,
+        client_id: str,
+        conv_id: str,
+        audio_bytes: bytes,
+        language: str = "nl",
+        stream: Optional[AudioStream] = None
+    ) -> None:
         """
         Verwerk audio: STT → LLM → TTS → Response.
 
@@ -98,82 +409,131 @@ class MessageHandler:
         3. Verwerk tool calls
         4. Genereer TTS audio
         5. Stuur response en audio chunks
+
+        Met tts.streaming wordt de LLM gestreamd en gaat elke complete zin
+        direct naar TTS, zodat de eerste audio niet op de hele reply wacht.
+        Een INTERRUPT van de Pi cancelt deze coroutine (zie _handle_interrupt).
         """
         config = get_config()
-        conv_id = message.conversation_id
+        prefetch: Optional[LLMPrefetch] = None
 
-        # Start debug turn
-        turn_id = uuid.uuid4().hex[:8]
+        # Start debug turn (zelfde id als de trace)
         self.debugger.start_turn(turn_id, client_id)
 
-        audio_b64 = message.payload.get("audio_base64")
-        if not audio_b64:
-            await self._send_error(client_id, conv_id, "No audio data")
-            return
+        if stream is not None:
+            self.debugger.log_step("Audio (streaming upload)", stream.duration_s * 1000, {
+                "frames": stream.frames,
+                "gaps": stream.gaps,
+                "dropped_bytes": stream.dropped_bytes
+            })
 
         try:
-            # Decode audio
-            audio_bytes = base64.b64decode(audio_b64)
-
             # === STT ===
             t0 = time.perf_counter()
-            stt = VoxtralSTT(
-                url=config.voxtral.url,
-                model=config.voxtral.model,
-                temperature=config.voxtral.temperature
-            )
-            user_text = await stt.transcribe(
-                audio_bytes,
-                language=message.payload.get("language", "nl")
-            )
+            speculation = await self.speculator.finish(stream) if stream is not None else None
+            if speculation is not None and speculation.covers_all:
+                # Laatste partial ging al over alle audio
+                user_text = speculation.text
+            else:
+                user_text = await get_stt().transcribe(audio_bytes, language=language)
             stt_ms = (time.perf_counter() - t0) * 1000
-            self.debugger.log_step("STT", stt_ms, {"text": user_text[:80] if user_text else ""})
+            self.debugger.log_step("STT", stt_ms, {
+                "text": user_text[:80] if user_text else "",
+                "partials": speculation.partials if speculation else 0,
+                "reused_partial": bool(speculation and speculation.covers_all)
+            })
 
             if not user_text.strip():
+                self.speculator.resolve(speculation, user_text, lambda prefetch: False)
                 await self._send_error(client_id, conv_id, "Empty transcription")
                 self.debugger.end_turn()
                 return
 
             # === LLM ===
             t0 = time.perf_counter()
-            llm = OllamaLLM(
-                url=config.ollama.url,
-                model=config.ollama.model,
-                temperature=config.ollama.temperature,
-                top_p=config.ollama.top_p,
-                repeat_penalty=config.ollama.repeat_penalty,
-                num_ctx=config.ollama.num_ctx
-            )
+            llm = get_llm()
 
             # Get emotion state
             emotion_state = self.emotions.get_state(conv_id)
             current_emotion = emotion_state.emotion
 
-            # Build system prompt with emotion
-            emotion_context = f"\n\nJe huidige emotionele staat is: {current_emotion}."
-            system_prompt = config.system_prompt + emotion_context
-
             # Get or create conversation
             conv = self.conversations.get_or_create(conv_id, config.system_prompt)
-            conv.add_user_message(user_text)
 
-            messages = conv.to_ollama_messages(system_prompt)
+            # Stabiele system prompt + tools; emotie en sensoren in de status message
             tools = self.tools.get_definitions()
+            state = PromptState(emotion=current_emotion, sensors=self.sensor_state.get(conv_id, {}))
+            assembler = get_prompt_assembler()
+
+            # Prefetch alleen gebruiken als de LLM exact dezelfde context zou krijgen
+            prefetch = self.speculator.resolve(
+                speculation, user_text,
+                lambda p: p.tools == tools and p.messages == assembler.render(
+                    conv, config.system_prompt, state, user_message=p.text
+                )
+            )
+            if speculation is not None:
+                get_tracer().annotate(speculation=speculation.outcome)
+
+            active.user_seq = conv.add_user_message(user_text).seq
+            if prefetch is not None:
+                messages = prefetch.messages
+                assembler.register(conv_id, messages, tools)
+            else:
+                messages = assembler.build(conv, config.system_prompt, tools, state)
+
+            if config.tts.enabled and config.tts.streaming:
+                # LLM stream → TTS per zin terwijl de LLM nog genereert
+                streamer = _AudioChunkStreamer(
+                    self.connections, client_id, conv_id, get_tts(),
+                    lookahead=config.tts.pipeline_lookahead,
+                    sent=active.sentences,
+                    stream_audio=config.tts.stream_audio and config.tts.format == "wav"
+                )
+                try:
+                    content, function_calls = await self._stream_llm_to_tts(
+                        llm, messages, tools, conv_id, client_id, streamer, prefetch
+                    )
+                    llm_ms = (time.perf_counter() - t0) * 1000
+
+                    active.assistant_seq = conv.add_assistant_message(content).seq
+                    new_emotion = self._apply_emotion_changes(conv_id, current_emotion, function_calls)
+                    await self._send_response(client_id, conv_id, content, new_emotion, function_calls)
+
+                    # Laatste chunk pas na de response, zodat is_last de turn afsluit
+                    await streamer.finish()
+                finally:
+                    streamer.cancel()
+
+                self.debugger.log_step("LLM+TTS (streaming)", llm_ms, {
+                    "response": content,
+                    "tool_calls": ", ".join(f"{fc.name}({fc.arguments})" for fc in function_calls),
+                    "first_audio_ms": round(streamer.first_audio_ms or 0),
+                    "chunks": streamer.chunks,
+                    "prefetch": prefetch is not None
+                })
+                self.debugger.end_turn()
+                return
 
-            response = await llm.chat(messages=messages, tools=tools)
+            if prefetch is not None:
+                response = await prefetch.response()
+            else:
+                response = await llm.chat(messages=messages, tools=tools)
+            assembler.record(conv_id, response)
             content = response.content
             function_calls = []
             llm_ms = (time.perf_counter() - t0) * 1000
             self.debugger.log_step("LLM", llm_ms, {
                 "response": content[:80] if content else "",
-                "tool_calls": len(response.tool_calls or [])
+                "tool_calls": len(response.tool_calls or []),
+                "prefetch": prefetch is not None
             })
 
             # Process tool calls
             if response.tool_calls:
                 t0 = time.perf_counter()
                 content, function_calls = await self._process_tool_calls(
-                    llm, messages, response.tool_calls, conv_id, client_id
+                    llm, messages, response.tool_calls, conv_id, client_id, content
                 )
                 tools_ms = (time.perf_counter() - t0) * 1000
                 tool_details = [f"{fc.name}({fc.arguments})" for fc in function_calls]
@@ -181,75 +541,29 @@ class MessageHandler:
                 # Log final response after tool processing
                 self.debugger.log_step("LLM (final)", 0, {"response": content})
 
-            conv.add_assistant_message(content)
-
-            # Check emotion changes
-            new_emotion = current_emotion
-            for fc in function_calls:
-                if fc.name == "show_emotion":
-                    new_emotion = fc.arguments.get("emotion", current_emotion)
-                    self.emotions.update_emotion(conv_id, new_emotion)
-
-            # Send function calls to Pi
-            for fc in function_calls:
-                fc_msg = FunctionCallMessage.create(
-                    name=fc.name,
-                    arguments=fc.arguments,
-                    conversation_id=conv_id
-                )
-                await self.connections.send_json(client_id, fc_msg.to_dict())
-
-            # Send text response
-            response_msg = ResponseMessage.create(
-                text=content,
-                conversation_id=conv_id,
-                emotion=new_emotion,
-                function_calls=[{"name": fc.name, "arguments": fc.arguments} for fc in function_calls]
-            )
-            await self.connections.send_json(client_id, response_msg.to_dict())
+            active.assistant_seq = conv.add_assistant_message(content).seq
+            new_emotion = self._apply_emotion_changes(conv_id, current_emotion, function_calls)
+            await self._send_response(client_id, conv_id, content, new_emotion, function_calls)
 
             # === TTS ===
             if config.tts.enabled and content.strip():
                 t0 = time.perf_counter()
-                tts = FishAudioTTS(
-                    url=config.tts.url,
-                    reference_id=config.tts.reference_id,
-                    temperature=config.tts.temperature,
-                    top_p=config.tts.top_p,
-                    format=config.tts.format
-                )
+                tts = get_tts()
 
+                # Single audio response
                 tts_chunks = 0
-                if config.tts.streaming:
-                    # Stream per sentence
-                    sentences = split_into_sentences(content)
-                    for i, sentence in enumerate(sentences):
-                        result = await tts.synthesize(sentence)
-                        if result.audio_bytes:
-                            tts_chunks += 1
-                            audio_b64 = base64.b64encode(result.audio_bytes).decode("utf-8")
-                            chunk_msg = AudioChunkMessage.create(
-                                audio_base64=audio_b64,
-                                conversation_id=conv_id,
-                                sentence=sentence,
-                                index=i,
-                                is_last=(i == len(sentences) - 1)
-                            )
-                            await self.connections.send_json(client_id, chunk_msg.to_dict())
-                else:
-                    # Single audio response
-                    result = await tts.synthesize(content)
-                    if result.audio_bytes:
-                        tts_chunks = 1
-                        audio_b64 = base64.b64encode(result.audio_bytes).decode("utf-8")
-                        chunk_msg = AudioChunkMessage.create(
-                            audio_base64=audio_b64,
-                            conversation_id=conv_id,
-                            sentence=content,
-                            index=0,
-                            is_last=True
-                        )
-                        await self.connections.send_json(client_id, chunk_msg.to_dict())
+                result = await tts.synthesize(content)
+                if result.audio_bytes:
+                    tts_chunks = 1
+                    await self.connections.send_audio_chunk(
+                        client_id,
+                        conv_id,
+                        result.audio_bytes,
+                        sentence=content,
+                        index=0,
+                        is_last=True
+                    )
+                    active.sentences.append(content)
 
                 tts_ms = (time.perf_counter() - t0) * 1000
                 self.debugger.log_step("TTS", tts_ms, {"chunks": tts_chunks})
@@ -257,73 +571,206 @@ class MessageHandler:
             # End debug turn
             self.debugger.end_turn()
 
+        except asyncio.CancelledError:
+            # Barge-in of disconnect: LLM stream en TTS requests stoppen via de cancel
+            if prefetch is not None:
+                prefetch.cancel()
+            self.debugger.end_turn()
+            raise
+        except BackendOverloaded as e:
+            if prefetch is not None:
+                prefetch.cancel()
+            self.debugger.end_turn()
+            await self._send_error(client_id, conv_id, str(e), code="overloaded")
         except Exception as e:
+            if prefetch is not None:
+                prefetch.cancel()
             self.debugger.end_turn()
             await self._send_error(client_id, conv_id, f"Processing error: {str(e)}")
 
+    async def _stream_llm_to_tts(
+        self,
+        llm: OllamaLLM,
+        messages: list[dict],
+        tools: list[dict],
+        conv_id: str,
+        client_id: str,
+        streamer: _AudioChunkStreamer,
+        prefetch: Optional[LLMPrefetch] = None
+    ) -> tuple[str, list[FunctionCall]]:
+        """
+        Streaming variant van llm.chat + _process_tool_calls.
+
+        Elke complete zin gaat direct naar de streamer (TTS), ook in de
+        final pass na tool calls. Tekst uit de eerste pass is al uitgesproken
+        en blijft daarom onderdeel van het antwoord; bij alleen side-effect
+        tools (show_emotion, go_to_sleep) is die tekst het hele antwoord. Met een prefetch komt
+        de eerste pass uit de al lopende speculatieve LLM call.
+
+        Returns:
+            (volledige antwoord tekst, alle function calls)
+        """
+        all_calls: list[FunctionCall] = []
+        parts: list[str] = []
+
+        stream = SentenceStream(
+            llm, messages, tools=tools, source=prefetch.replay() if prefetch else None,
+            chunker=create_chunker()
+        )
+        async for sentence in stream:
+            await streamer.speak(sentence)
+        response = stream.response
+        get_prompt_assembler().record(conv_id, response)
+        parts.append(response.content)
+
+        while response.tool_calls:
+            calls = await self._execute_tool_calls(
+                messages, response.tool_calls, conv_id, client_id, response.content
+            )
+            all_calls += calls
+            if not get_tool_scheduler().needs_followup(
+                [fc.name for fc in calls], self.tools, response.content
+            ):
+                break
+            stream = SentenceStream(llm, messages, tools=None, chunker=create_chunker())
+            async for sentence in stream:
+                await streamer.speak(sentence)
+            response = stream.response
+            parts.append(response.content)
+
+        content = " ".join(part.strip() for part in parts if part.strip())
+        return content, all_calls
+
     async def _process_tool_calls(
         self,
         llm: OllamaLLM,
         messages: list[dict],
         tool_calls: list[dict],
         conv_id: str,
-        client_id: str
+        client_id: str,
+        content: str = ""
     ) -> tuple[str, list[FunctionCall]]:
         """
         Process tool calls recursief.
 
         Remote tools (is_remote=True) worden naar de Pi gestuurd.
-        Zie D016 in DECISIONS.md.
+        Zie D016 in DECISIONS.md. Bij alleen side-effect tools is content
+        (de tekst naast de tool calls) het antwoord: geen tweede LLM pass.
         """
-        all_calls = []
+        all_calls = await self._execute_tool_calls(messages, tool_calls, conv_id, client_id, content)
+        if not get_tool_scheduler().needs_followup([fc.name for fc in all_calls], self.tools, content):
+            return content, all_calls
+
+        # Get final response
+        response = await llm.chat(messages=messages, tools=None)
+
+        if response.tool_calls:
+            more_content, more_calls = await self._process_tool_calls(
+                llm, messages, response.tool_calls, conv_id, client_id, response.content
+            )
+            return more_content, all_calls + more_calls
+
+        return response.content, all_calls
+
+    async def _execute_tool_calls(
+        self,
+        messages: list[dict],
+        tool_calls: list[dict],
+        conv_id: str,
+        client_id: str,
+        content: str = ""
+    ) -> list[FunctionCall]:
+        """
+        Voer tool calls uit en voeg assistant + tool messages toe.
+
+        Remote tools (is_remote=True) worden naar de Pi gestuurd. De calls
+        lopen gelijktijdig via de ToolScheduler (timeouts en limieten uit
+        config.tools); de tool messages staan in de volgorde van de calls.
+        Fire-and-forget tools wachten niet op het resultaat van de Pi.
+        """
+        calls = parse_tool_calls(tool_calls)
 
         messages.append({
             "role": "assistant",
-            "content": "",
+            "content": content,
             "tool_calls": tool_calls
         })
 
-        for tc in tool_calls:
-            func = tc.get("function", {})
-            name = func.get("name", "")
-            args = func.get("arguments", {})
-
-            if isinstance(args, str):
-                try:
-                    args = json.loads(args)
-                except json.JSONDecodeError:
-                    args = {}
-
-            all_calls.append(FunctionCall(name=name, arguments=args))
-
+        async def execute(call: ToolCall) -> str:
             # Check of tool remote is
-            tool = self.tools.get(name)
+            tool = self.tools.get(call.name)
             is_remote = getattr(tool, 'is_remote', False) if tool else False
 
-            if is_remote:
-                # Remote tool: stuur naar Pi en wacht op resultaat
-                result, context = await self._execute_remote_tool(
-                    client_id, conv_id, name, args
-                )
-                # Voor vision tools: voer analyse uit met de ontvangen image
-                if tool and context.get("image_base64"):
-                    result = await tool.execute(args, context)
-            else:
+            if not is_remote:
                 # Lokale tool: direct uitvoeren
-                result = await self.tools.execute(name, args)
-
-            messages.append({"role": "tool", "content": result})
+                return await self.tools.execute(call.name, call.arguments)
 
-        # Get final response
-        response = await llm.chat(messages=messages, tools=None)
+            if getattr(tool, 'fire_and_forget', False):
+                # Alleen versturen; het resultaat voor de LLM komt van de tool zelf
+                await self._send_function_request(
+                    client_id, conv_id, call.name, call.arguments, str(uuid.uuid4())
+                )
+                return await tool.execute(call.arguments)
 
-        if response.tool_calls:
-            more_content, more_calls = await self._process_tool_calls(
-                llm, messages, response.tool_calls, conv_id, client_id
+            # Remote tool: stuur naar Pi en wacht op resultaat
+            with get_tracer().span(f"tool.remote.{call.name}"):
+                result, context = await self._execute_remote_tool(
+                    client_id, conv_id, call.name, call.arguments
+                )
+            # Voor vision tools: voer analyse uit met de ontvangen image
+            if tool and context.get("image_base64"):
+                with get_tracer().span(f"tool.{call.name}.analyze"):
+                    result = await tool.execute(call.arguments, context)
+            return result
+
+        results = await get_tool_scheduler().run(calls, execute)
+        for result in results:
+            messages.append({"role": "tool", "content": result.content})
+            details = {"result": result.content[:80]}
+            if result.error:
+                details["error"] = result.error
+            self.debugger.log_step(f"Tool {result.call.name}", result.duration_ms, details)
+
+        return [FunctionCall(name=call.name, arguments=call.arguments) for call in calls]
+
+    def _apply_emotion_changes(
+        self,
+        conv_id: str,
+        current_emotion: str,
+        function_calls: list[FunctionCall]
+    ) -> str:
+        """Verwerk show_emotion calls en return de (nieuwe) emotie."""
+        new_emotion = current_emotion
+        for fc in function_calls:
+            if fc.name == "show_emotion":
+                new_emotion = fc.arguments.get("emotion", current_emotion)
+                self.emotions.update_emotion(conv_id, new_emotion)
+        return new_emotion
+
+    async def _send_response(
+        self,
+        client_id: str,
+        conv_id: str,
+        content: str,
+        emotion: str,
+        function_calls: list[FunctionCall]
+    ) -> None:
+        """Stuur function call notificaties en de tekst response naar de Pi."""
+        for fc in function_calls:
+            fc_msg = FunctionCallMessage.create(
+                name=fc.name,
+                arguments=fc.arguments,
+                conversation_id=conv_id
             )
-            return more_content, all_calls + more_calls
+            await self.connections.send_json(client_id, fc_msg.to_dict())
 
-        return response.content, all_calls
+        response_msg = ResponseMessage.create(
+            text=content,
+            conversation_id=conv_id,
+            emotion=emotion,
+            function_calls=[{"name": fc.name, "arguments": fc.arguments} for fc in function_calls]
+        )
+        await self.connections.send_json(client_id, response_msg.to_dict())
 
     async def _execute_remote_tool(
         self,
@@ -336,7 +783,7 @@ class MessageHandler:
         Voer remote tool uit op Pi.
 
         1. Stuur FUNCTION_REQUEST naar Pi
-        2. Wacht op FUNCTION_RESULT
+        2. Wacht op FUNCTION_RESULT (timeout via de ToolScheduler)
         3. Return result en context (evt. met image_base64)
         """
         request_id = str(uuid.uuid4())
@@ -348,19 +795,10 @@ class MessageHandler:
 
         try:
             # Stuur request naar Pi
-            request_msg = FunctionRequestMessage.create(
-                name=name,
-                arguments=args,
-                request_id=request_id,
-                conversation_id=conv_id
-            )
-            await self.connections.send_json(client_id, request_msg.to_dict())
+            await self._send_function_request(client_id, conv_id, name, args, request_id)
 
-            # Wacht op result met timeout
-            try:
-                await asyncio.wait_for(event.wait(), timeout=REMOTE_TOOL_TIMEOUT)
-            except asyncio.TimeoutError:
-                return f"Remote tool '{name}' timeout na {REMOTE_TOOL_TIMEOUT}s", {}
+            # Wacht op result (bij een timeout cancelt de scheduler deze call)
+            await event.wait()
 
             # Haal resultaat op
             result = result_holder.get("result", "")
@@ -376,6 +814,23 @@ class MessageHandler:
             # Cleanup
             self._pending_requests.pop(request_id, None)
 
+    async def _send_function_request(
+        self,
+        client_id: str,
+        conv_id: str,
+        name: str,
+        args: dict,
+        request_id: str
+    ) -> None:
+        """Stuur FUNCTION_REQUEST naar de Pi."""
+        request_msg = FunctionRequestMessage.create(
+            name=name,
+            arguments=args,
+            request_id=request_id,
+            conversation_id=conv_id
+        )
+        await self.connections.send_json(client_id, request_msg.to_dict())
+
     async def _handle_function_result(self, client_id: str, message: Message) -> None:
         """
         Handle FUNCTION_RESULT van Pi.
@@ -386,7 +841,7 @@ class MessageHandler:
         request_id = payload.get("request_id", "")
 
         if request_id not in self._pending_requests:
-            # Onbekende request_id - negeer (misschien al getimed out)
+            # Onbekende request_id - negeer (al getimed out, of fire-and-forget)
             return
 
         event, result_holder = self._pending_requests[request_id]
@@ -408,16 +863,128 @@ class MessageHandler:
         pass
 
     async def _handle_sensor_update(self, client_id: str, message: Message) -> None:
-        """Handle sensor data update."""
-        # Voor nu: log het
-        # Later: kan gebruikt worden voor context-aware responses
-        pass
+        """
+        Bewaar de laatste sensor waarden van deze conversation.
+
+        Ze gaan bij de volgende beurt mee in de status message achter de
+        history, niet in de system prompt (die moet stabiel blijven).
+        """
+        if message.conversation_id and message.payload:
+            self.sensor_state.setdefault(message.conversation_id, {}).update(message.payload)
+
+    async def _handle_hello(self, client_id: str, message: Message) -> None:
+        """
+        Capability negotiation: activeer binary audio als beide kanten het kunnen.
+
+        Antwoordt altijd met een hello waarin staat wat actief is.
+        """
+        config = get_config()
+        hello = HelloMessage(conversation_id=message.conversation_id, payload=message.payload)
+
+        binary_audio = (
+            config.websocket.binary_audio
+            and hello.binary_audio
+            and BINARY_VERSION in hello.binary_versions
+            and "wav" in hello.codecs
+        )
+
+        connection = self.connections.get_connection(client_id)
+        if connection:
+            connection.binary_audio = binary_audio
+
+        reply = HelloMessage.create(
+            conversation_id=message.conversation_id,
+            binary_audio=binary_audio,
+            binary_versions=[BINARY_VERSION] if binary_audio else [],
+            codecs=["wav"] if binary_audio else []
+        )
+        await self.connections.send_json(client_id, reply.to_dict())
 
     async def _handle_heartbeat(self, client_id: str, message: Message) -> None:
-        """Handle heartbeat - already updated in handle_message."""
-        pass
+        """
+        Handle heartbeat - last_heartbeat is al bijgewerkt in handle_message.
+
+        Heartbeats met een request_id krijgen een echo terug (zelfde payload
+        + server_time), zodat de client de RTT kan meten.
+        """
+        if not message.payload.get("request_id"):
+            return
+
+        reply = HeartbeatMessage(
+            conversation_id=message.conversation_id,
+            payload={**message.payload, "server_time": time.time()}
+        )
+        await self.connections.send_json(client_id, reply.to_dict())
+
+    async def _handle_interrupt(self, client_id: str, message: Message) -> None:
+        """
+        Barge-in: de gebruiker praat door het antwoord heen.
+
+        Cancelt de lopende turn (Ollama stream, TTS requests, wachtende tools)
+        en kort het antwoord in de history in tot de chunks die de Pi heeft
+        afgespeeld. Het antwoord (INTERRUPT) komt na alle chunks van de turn.
+        """
+        interrupt = InterruptMessage(conversation_id=message.conversation_id, payload=message.payload)
+        active = self._turns.get(client_id)
+        cancelled = False
+        spoken = None
+
+        if active is not None and not active.interrupted:
+            active.interrupted = True
+            self.interrupts += 1
+            if not active.task.done():
+                t0 = time.perf_counter()
+                active.task.cancel()
+                await asyncio.wait({active.task})
+                get_tracer().record("interrupt.cancel", (time.perf_counter() - t0) * 1000)
+                cancelled = True
+                self.interrupts_cancelled += 1
+            spoken = self._trim_interrupted(active, interrupt.played_index, cancelled)
+
+        reply = InterruptMessage.create(
+            conversation_id=message.conversation_id,
+            played_index=interrupt.played_index,
+            cancelled=cancelled,
+            spoken=spoken
+        )
+        await self.connections.send_json(client_id, reply.to_dict())
+
+    def _trim_interrupted(
+        self,
+        active: _ActiveTurn,
+        played_index: Optional[int],
+        cancelled: bool
+    ) -> Optional[str]:
+        """Zet het antwoord in de history op de afgespeelde zinnen (… = onderbroken)."""
+        if active.user_seq is None:
+            return None  # Onderbroken vóór de transcriptie: nog niets in de history
+
+        heard = active.sentences[:played_index + 1] if played_index is not None else []
+        spoken = " ".join(sentence.strip() for sentence in heard if sentence.strip())
+        if cancelled or len(heard) < len(active.sentences):
+            spoken = f"{spoken} …".strip()
+
+        conv = self.conversations.get_or_create(active.conv_id, get_config().system_prompt)
+        if active.assistant_seq is None:
+            active.assistant_seq = conv.add_assistant_message(spoken).seq
+        else:
+            conv.replace_message(active.assistant_seq, spoken)
+        return spoken
 
-    async def _send_error(self, client_id: str, conv_id: str, error: str) -> None:
-        """Stuur error message naar client."""
-        error_msg = ErrorMessage.create(error=error, conversation_id=conv_id)
+    def drop_client(self, client_id: str) -> None:
+        """Vergeet de laatste turn van een client (bij disconnect)."""
+        self._turns.pop(client_id, None)
+
+    def interrupt_stats(self) -> dict:
+        return {"received": self.interrupts, "cancelled": self.interrupts_cancelled}
+
+    async def _send_error(
+        self,
+        client_id: str,
+        conv_id: str,
+        error: str,
+        code: Optional[str] = None
+    ) -> None:
+        """Stuur error message naar client (code bijv. "overloaded": later opnieuw proberen)."""
+        error_msg = ErrorMessage.create(error=error, conversation_id=conv_id, code=code)
         await self.connections.send_json(client_id, error_msg.to_dict())
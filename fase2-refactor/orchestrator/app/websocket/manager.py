@@ -1,5 +1,6 @@
 """WebSocket connection manager."""
 import asyncio
+import base64
 import json
 import time
 from dataclasses import dataclass, field
@@ -7,6 +8,9 @@ from typing import Optional
 
 from fastapi import WebSocket
 
+from .protocol import AudioChunkMessage, AudioCodec, BinaryFrame, FrameType
+from ..utils.tracing import get_tracer
+
 
 @dataclass
 class Connection:
@@ -16,6 +20,7 @@ class Connection:
     connected_at: float = field(default_factory=time.time)
     last_heartbeat: float = field(default_factory=time.time)
     conversation_id: str = "default"
+    binary_audio: bool = False  # Gezet na hello negotiation
 
 
 class ConnectionManager:
@@ -92,12 +97,75 @@ class ConnectionManager:
             return False
 
         try:
-            await connection.websocket.send_json(data)
+            with get_tracer().span("ws.send", kind=data.get("type", "")):
+                await connection.websocket.send_json(data)
+            return True
+        except Exception:
+            await self.disconnect(client_id)
+            return False
+
+    async def send_bytes(self, client_id: str, data: bytes) -> bool:
+        """
+        Stuur binary frame naar specifieke client.
+
+        Returns:
+            True als verzonden, False als client niet gevonden
+        """
+        connection = self.get_connection(client_id)
+        if connection is None:
+            return False
+
+        try:
+            with get_tracer().span("ws.send", kind="binary", bytes=len(data)):
+                await connection.websocket.send_bytes(data)
             return True
         except Exception:
             await self.disconnect(client_id)
             return False
 
+    async def send_audio_chunk(
+        self,
+        client_id: str,
+        conversation_id: str,
+        audio_bytes: bytes,
+        sentence: Optional[str] = None,
+        index: int = 0,
+        is_last: bool = False
+    ) -> bool:
+        """
+        Stuur TTS audio als binary frame of als base64 JSON.
+
+        Binary alleen als de client dat in zijn hello heeft aangegeven,
+        zodat oude JSON-only clients blijven werken.
+
+        Returns:
+            True als verzonden, False als client niet gevonden
+        """
+        connection = self.get_connection(client_id)
+        if connection is None:
+            return False
+
+        if connection.binary_audio:
+            frame = BinaryFrame(
+                type=FrameType.AUDIO_CHUNK,
+                conversation_id=conversation_id,
+                audio=audio_bytes,
+                index=index,
+                is_last=is_last,
+                codec=AudioCodec.WAV,
+                meta={"sentence": sentence} if sentence else {}
+            )
+            return await self.send_bytes(client_id, frame.encode())
+
+        chunk_msg = AudioChunkMessage.create(
+            audio_base64=base64.b64encode(audio_bytes).decode("utf-8"),
+            conversation_id=conversation_id,
+            sentence=sentence,
+            index=index,
+            is_last=is_last
+        )
+        return await self.send_json(client_id, chunk_msg.to_dict())
+
     async def send_to_conversation(self, conversation_id: str, data: dict) -> int:
         """
         Stuur JSON naar alle clients in een conversation.
@@ -168,7 +236,8 @@ class ConnectionManager:
                 "client_id": conn.client_id,
                 "conversation_id": conn.conversation_id,
                 "connected_at": conn.connected_at,
-                "last_heartbeat": conn.last_heartbeat
+                "last_heartbeat": conn.last_heartbeat,
+                "binary_audio": conn.binary_audio
             }
             for conn in self._connections.values()
         ]
@@ -1,7 +1,9 @@
 """WebSocket protocol definitions."""
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum, IntFlag
 from typing import Any, Optional
+import json
+import struct
 import time
 
 
@@ -10,10 +12,15 @@ class MessageType(str, Enum):
 
     # Pi → Desktop
     AUDIO_PROCESS = "audio_process"     # Audio voor transcriptie + LLM
+    AUDIO_START = "audio_start"         # Start streaming upload (tijdens spraak)
+    AUDIO_FRAME = "audio_frame"         # PCM frame van een streaming upload
+    AUDIO_END = "audio_end"             # Einde spraak (of aborted bij false start)
     WAKE_WORD = "wake_word"             # Wake word gedetecteerd
     SENSOR_UPDATE = "sensor_update"     # Sensor data
     HEARTBEAT = "heartbeat"             # Keep-alive
     FUNCTION_RESULT = "function_result" # Resultaat van remote tool executie
+    HELLO = "hello"                     # Capabilities (beide richtingen)
+    INTERRUPT = "interrupt"             # Barge-in: gebruiker praat door de robot heen (bevestigd door desktop)
 
     # Desktop → Pi
     RESPONSE = "response"               # LLM response tekst
@@ -75,6 +82,105 @@ class AudioProcessMessage(Message):
         )
 
 
+@dataclass
+class AudioStartMessage(Message):
+    """
+    Start van een streaming upload.
+
+    De Pi stuurt daarna audio_frame messages (raw PCM, of binary frames)
+    zolang de VAD spraak ziet, en sluit af met audio_end.
+    """
+    type: MessageType = field(default=MessageType.AUDIO_START, init=False)
+
+    @property
+    def stream_id(self) -> str:
+        return self.payload.get("stream_id", "")
+
+    @property
+    def sample_rate(self) -> int:
+        return self.payload.get("sample_rate", 16000)
+
+    @property
+    def channels(self) -> int:
+        return self.payload.get("channels", 1)
+
+    @property
+    def language(self) -> str:
+        return self.payload.get("language", "nl")
+
+    @classmethod
+    def create(
+        cls,
+        stream_id: str,
+        conversation_id: str = "default",
+        sample_rate: int = 16000,
+        channels: int = 1,
+        language: str = "nl"
+    ) -> "AudioStartMessage":
+        return cls(
+            conversation_id=conversation_id,
+            payload={
+                "stream_id": stream_id,
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "language": language
+            }
+        )
+
+
+@dataclass
+class AudioFrameMessage(Message):
+    """PCM frame (16-bit little-endian) van een streaming upload."""
+    type: MessageType = field(default=MessageType.AUDIO_FRAME, init=False)
+
+    @property
+    def stream_id(self) -> str:
+        return self.payload.get("stream_id", "")
+
+    @property
+    def index(self) -> Optional[int]:
+        return self.payload.get("index")
+
+    @classmethod
+    def create(
+        cls,
+        stream_id: str,
+        audio_base64: str,
+        index: int,
+        conversation_id: str = "default"
+    ) -> "AudioFrameMessage":
+        return cls(
+            conversation_id=conversation_id,
+            payload={"stream_id": stream_id, "audio_base64": audio_base64, "index": index}
+        )
+
+
+@dataclass
+class AudioEndMessage(Message):
+    """Einde van een streaming upload; aborted=True gooit de audio weg."""
+    type: MessageType = field(default=MessageType.AUDIO_END, init=False)
+
+    @property
+    def stream_id(self) -> str:
+        return self.payload.get("stream_id", "")
+
+    @property
+    def aborted(self) -> bool:
+        return bool(self.payload.get("aborted", False))
+
+    @classmethod
+    def create(
+        cls,
+        stream_id: str,
+        conversation_id: str = "default",
+        aborted: bool = False
+    ) -> "AudioEndMessage":
+        return cls(
+            conversation_id=conversation_id,
+            payload={"stream_id": stream_id, "aborted": aborted}
+        )
+
+
 @dataclass
 class WakeWordMessage(Message):
     """Wake word detection notification."""
@@ -95,6 +201,79 @@ class HeartbeatMessage(Message):
         return cls(conversation_id=conversation_id)
 
 
+@dataclass
+class HelloMessage(Message):
+    """
+    Capability negotiation, direct na connect.
+
+    De Pi stuurt zijn capabilities, de desktop antwoordt met wat er voor
+    deze connectie geactiveerd is. Clients die geen hello sturen krijgen
+    het oude JSON-only protocol.
+    """
+    type: MessageType = field(default=MessageType.HELLO, init=False)
+
+    @property
+    def binary_audio(self) -> bool:
+        return bool(self.payload.get("binary_audio", False))
+
+    @property
+    def binary_versions(self) -> list[int]:
+        return self.payload.get("binary_versions", [])
+
+    @property
+    def codecs(self) -> list[str]:
+        return self.payload.get("codecs", [])
+
+    @classmethod
+    def create(
+        cls,
+        conversation_id: str = "default",
+        binary_audio: bool = False,
+        binary_versions: Optional[list[int]] = None,
+        codecs: Optional[list[str]] = None
+    ) -> "HelloMessage":
+        return cls(
+            conversation_id=conversation_id,
+            payload={
+                "binary_audio": binary_audio,
+                "binary_versions": binary_versions or [],
+                "codecs": codecs or []
+            }
+        )
+
+
+@dataclass
+class InterruptMessage(Message):
+    """
+    Barge-in tijdens het afspelen.
+
+    De Pi stuurt played_index: de index van de audio chunk die speelde toen
+    de VAD afging (None = nog niets afgespeeld). De desktop annuleert de
+    lopende turn, kort het antwoord in de history in tot wat echt gezegd is
+    en antwoordt met hetzelfde type (na alle chunks van de oude turn).
+    """
+    type: MessageType = field(default=MessageType.INTERRUPT, init=False)
+
+    @property
+    def played_index(self) -> Optional[int]:
+        return self.payload.get("played_index")
+
+    @classmethod
+    def create(
+        cls,
+        conversation_id: str = "default",
+        played_index: Optional[int] = None,
+        cancelled: Optional[bool] = None,
+        spoken: Optional[str] = None
+    ) -> "InterruptMessage":
+        payload = {"played_index": played_index}
+        if cancelled is not None:
+            payload["cancelled"] = cancelled
+        if spoken is not None:
+            payload["spoken"] = spoken
+        return cls(conversation_id=conversation_id, payload=payload)
+
+
 @dataclass
 class ResponseMessage(Message):
     """LLM response naar Pi."""
@@ -267,3 +446,146 @@ class FunctionResultMessage(Message):
     @property
     def error(self) -> Optional[str]:
         return self.payload.get("error")
+
+
+# =============================================================================
+# Binary audio frames
+# =============================================================================
+#
+# Audio als raw bytes i.p.v. base64 in JSON (scheelt ~33% over WiFi en de
+# encode/decode op de Pi). Alleen actief na een hello met binary_audio=true.
+#
+# Frame layout (big-endian):
+#
+#   offset  size  veld
+#   0       2     magic b"NX"
+#   2       1     versie (BINARY_VERSION)
+#   3       1     frame type (FrameType)
+#   4       1     flags (FrameFlag)
+#   5       1     codec (AudioCodec)
+#   6       4     index (uint32)
+#   10      2     lengte conversation_id (uint16)
+#   12      2     lengte meta (uint16)
+#   14      n     conversation_id (utf-8)
+#   14+n    m     meta (utf-8 JSON object, bijv. sentence/language; mag leeg)
+#   14+n+m  ...   audio bytes
+
+BINARY_MAGIC = b"NX"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct(">2sBBBBIHH")
+
+
+class FrameType(IntEnum):
+    """Binary frame types (zelfde betekenis als de JSON varianten)."""
+    AUDIO_PROCESS = 1   # Pi → Desktop
+    AUDIO_CHUNK = 2     # Desktop → Pi
+    AUDIO_FRAME = 3     # Pi → Desktop (streaming upload, meta: stream_id)
+
+
+class FrameFlag(IntFlag):
+    """Binary frame flags."""
+    NONE = 0
+    IS_LAST = 1
+
+
+class AudioCodec(IntEnum):
+    """Audio formaat van de payload."""
+    WAV = 0
+    PCM_S16LE = 1
+    OPUS = 2
+
+
+# Codec namen zoals ze in de hello negotiation staan
+CODEC_NAMES = {
+    AudioCodec.WAV: "wav",
+    AudioCodec.PCM_S16LE: "pcm_s16le",
+    AudioCodec.OPUS: "opus",
+}
+
+
+@dataclass
+class BinaryFrame:
+    """Een binary audio frame (header + raw audio)."""
+    type: FrameType
+    conversation_id: str
+    audio: bytes
+    index: int = 0
+    is_last: bool = False
+    codec: AudioCodec = AudioCodec.WAV
+    meta: dict = field(default_factory=dict)
+
+    def encode(self) -> bytes:
+        conv_bytes = self.conversation_id.encode("utf-8")
+        meta_bytes = json.dumps(self.meta).encode("utf-8") if self.meta else b""
+        flags = FrameFlag.IS_LAST if self.is_last else FrameFlag.NONE
+
+        header = _BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            BINARY_VERSION,
+            self.type,
+            flags,
+            self.codec,
+            self.index,
+            len(conv_bytes),
+            len(meta_bytes)
+        )
+        return b"".join((header, conv_bytes, meta_bytes, self.audio))
+
+    @classmethod
+    def decode(cls, data: bytes) -> "BinaryFrame":
+        """
+        Parse een binary frame.
+
+        Raises:
+            ValueError: Bij onbekende magic/versie/type of een afgekapt frame
+        """
+        if len(data) < _BINARY_HEADER.size:
+            raise ValueError("Binary frame te kort")
+
+        magic, version, frame_type, flags, codec, index, conv_len, meta_len = \
+            _BINARY_HEADER.unpack_from(data)
+
+        if magic != BINARY_MAGIC:
+            raise ValueError("Geen NerdCarX binary frame")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Binary frame versie {version} niet ondersteund")
+
+        offset = _BINARY_HEADER.size
+        if len(data) < offset + conv_len + meta_len:
+            raise ValueError("Binary frame header afgekapt")
+
+        conversation_id = data[offset:offset + conv_len].decode("utf-8")
+        offset += conv_len
+        meta = json.loads(data[offset:offset + meta_len]) if meta_len else {}
+        offset += meta_len
+
+        return cls(
+            type=FrameType(frame_type),
+            conversation_id=conversation_id or "default",
+            audio=data[offset:],
+            index=index,
+            is_last=bool(flags & FrameFlag.IS_LAST),
+            codec=AudioCodec(codec),
+            meta=meta
+        )
+
+    def to_message(self) -> Message:
+        """
+        Zet een binnenkomend frame om naar een Message voor de handlers.
+
+        De raw audio staat in payload["audio_bytes"] i.p.v. "audio_base64".
+        """
+        message_type = {
+            FrameType.AUDIO_PROCESS: MessageType.AUDIO_PROCESS,
+            FrameType.AUDIO_CHUNK: MessageType.AUDIO_CHUNK,
+            FrameType.AUDIO_FRAME: MessageType.AUDIO_FRAME,
+        }[self.type]
+
+        payload = dict(self.meta)
+        payload.update({
+            "audio_bytes": self.audio,
+            "codec": CODEC_NAMES[self.codec],
+            "index": self.index,
+            "is_last": self.is_last
+        })
+        return Message(type=message_type, conversation_id=self.conversation_id, payload=payload)
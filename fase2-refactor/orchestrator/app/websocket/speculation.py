@@ -0,0 +1,278 @@
+"""
+Speculatieve STT tijdens een streaming upload.
+
+Terwijl de frames binnenkomen wordt de audio tot nu toe alvast
+getranscribeerd (partials): periodiek, en direct zodra de spreker even stil
+is. Bij een nieuwe partial start de LLM call al (LLMPrefetch). Bij audio_end
+wordt de finale transcriptie vergeleken met de laatste partial; komen ze
+overeen, dan loopt het LLM antwoord al en is de STT → LLM stap weg.
+"""
+import asyncio
+import re
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from .streams import AudioStream
+from ..services import LLMPrefetch
+from ..utils.tracing import get_tracer
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_transcript(text: str) -> str:
+    """Vergelijkingssleutel: kleine letters, zonder leestekens en dubbele spaties."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def frame_rms(pcm: bytes) -> float:
+    """RMS van een 16-bit little-endian PCM frame."""
+    samples = array("h", pcm[:len(pcm) - len(pcm) % 2])
+    if not samples:
+        return 0.0
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return (sum(sample * sample for sample in samples) / len(samples)) ** 0.5
+
+
+@dataclass
+class Speculation:
+    """Speculatie state van één upload."""
+    stream: AudioStream
+    partials: int = 0
+    text: str = ""                 # Laatste partial
+    covered_bytes: int = 0         # Ontvangen bytes die de laatste partial dekt
+    requested_bytes: int = 0       # Ontvangen bytes bij de laatst gestarte partial
+    quiet_s: float = 0.0           # Aaneengesloten stilte aan het eind
+    paused: bool = False           # Partial voor de huidige pauze al gestart
+    task: Optional[asyncio.Task] = None
+    prefetch: Optional[LLMPrefetch] = None
+    outcome: str = "none"          # Na resolve(): "hit", "miss" of "none" (geen prefetch)
+
+    @property
+    def received_bytes(self) -> int:
+        # Incl. bytes die bij overflow uit de buffer vielen: blijft oplopen
+        return self.stream.num_bytes + self.stream.dropped_bytes
+
+    @property
+    def covers_all(self) -> bool:
+        """True als de laatste partial alle ontvangen audio dekt (= finale transcriptie)."""
+        return bool(self.text) and self.covered_bytes == self.received_bytes
+
+
+class SpeculativeSTT:
+    """
+    Partials + LLM prefetch per streaming upload.
+
+    transcribe(wav, language) levert de partials; prefetch(stream, text)
+    start een LLM call voor een partial (of None als dat niet kan).
+
+    Usage:
+        speculator = SpeculativeSTT(transcribe, prefetch, interval_s=1.0)
+        speculator.start(stream)
+        speculator.on_frame(stream, pcm)       # per audio_frame
+        speculation = await speculator.finish(stream)
+        prefetch = speculator.resolve(speculation, final_text, still_valid)
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[bytes, str], Awaitable[str]],
+        prefetch: Optional[Callable[[AudioStream, str], Optional[LLMPrefetch]]] = None,
+        enabled: bool = True,
+        interval_s: float = 1.0,
+        pause_ms: float = 300,
+        silence_rms: float = 300,
+        min_audio_s: float = 0.5,
+        max_partials: int = 10
+    ):
+        self.transcribe = transcribe
+        self.prefetch = prefetch
+        self.enabled = enabled
+        self.interval_s = interval_s
+        self.pause_ms = pause_ms
+        self.silence_rms = silence_rms
+        self.min_audio_s = min_audio_s
+        self.max_partials = max_partials
+        self._active: dict[tuple[str, str], Speculation] = {}
+
+        # Metrics
+        self.partials = 0
+        self.partial_errors = 0
+        self.prefetches = 0
+        self.hits = 0          # Prefetch hergebruikt
+        self.misses = 0        # Finale transcriptie (of context) week af
+        self.discarded = 0     # Ingehaald door een nieuwere partial, of upload afgebroken
+        self.stt_reused = 0    # Laatste partial dekte alle audio: geen finale STT nodig
+
+    def start(self, stream: AudioStream) -> None:
+        """Begin speculatie voor een nieuwe upload."""
+        if not self.enabled:
+            return
+        self._cleanup_stale()
+        self.discard(stream.client_id, stream.stream_id)
+        self._active[(stream.client_id, stream.stream_id)] = Speculation(stream)
+
+    def on_frame(self, stream: AudioStream, pcm: bytes) -> None:
+        """Na elk frame: start een partial als er genoeg nieuwe audio of een pauze is."""
+        speculation = self._active.get((stream.client_id, stream.stream_id))
+        if speculation is None:
+            return
+
+        bytes_per_second = stream.sample_rate * stream.sample_width * stream.channels
+        if frame_rms(pcm) < self.silence_rms:
+            speculation.quiet_s += len(pcm) / bytes_per_second
+        else:
+            speculation.quiet_s = 0.0
+            speculation.paused = False
+
+        if speculation.task is not None and not speculation.task.done():
+            return
+        if speculation.partials >= self.max_partials or stream.duration_s < self.min_audio_s:
+            return
+
+        received = speculation.received_bytes
+        if received == speculation.requested_bytes:
+            return
+        pause = not speculation.paused and speculation.quiet_s * 1000 >= self.pause_ms
+        due = self.interval_s > 0 and (received - speculation.requested_bytes) / bytes_per_second >= self.interval_s
+        if not (pause or due):
+            return
+
+        if pause:
+            speculation.paused = True
+        speculation.partials += 1
+        speculation.requested_bytes = received
+        speculation.task = asyncio.create_task(
+            self._run_partial(speculation, stream.to_wav(), received)
+        )
+
+    async def finish(self, stream: AudioStream) -> Optional[Speculation]:
+        """
+        Einde upload: geef de speculatie terug.
+
+        Een lopende partial die alle audio dekt wordt afgewacht (die is dan
+        de finale transcriptie); een partial op oudere audio wordt gestopt.
+        """
+        speculation = self._active.pop((stream.client_id, stream.stream_id), None)
+        if speculation is None:
+            return None
+
+        task = speculation.task
+        if task is not None and not task.done():
+            if speculation.requested_bytes == speculation.received_bytes:
+                await asyncio.wait([task])
+            else:
+                task.cancel()
+
+        if speculation.covers_all:
+            self.stt_reused += 1
+        return speculation
+
+    def resolve(
+        self,
+        speculation: Optional[Speculation],
+        text: str,
+        still_valid: Callable[[LLMPrefetch], bool]
+    ) -> Optional[LLMPrefetch]:
+        """
+        Vergelijk de finale transcriptie met de prefetch.
+
+        still_valid controleert de rest van de context (history, emotie,
+        sensoren, tools): de prefetch wordt alleen gebruikt als de LLM exact
+        dezelfde messages zou krijgen.
+
+        Returns:
+            De prefetch bij een hit, anders None (prefetch gestopt)
+        """
+        prefetch = speculation.prefetch if speculation else None
+        if prefetch is None:
+            return None
+        speculation.prefetch = None
+
+        if (
+            not prefetch.failed
+            and normalize_transcript(prefetch.text) == normalize_transcript(text)
+            and still_valid(prefetch)
+        ):
+            self.hits += 1
+            speculation.outcome = "hit"
+            return prefetch
+
+        prefetch.cancel()
+        self.misses += 1
+        speculation.outcome = "miss"
+        return None
+
+    def discard(self, client_id: str, stream_id: str) -> None:
+        """Upload afgebroken: stop de lopende partial en prefetch."""
+        speculation = self._active.pop((client_id, stream_id), None)
+        if speculation is not None:
+            self._stop(speculation)
+
+    def drop_client(self, client_id: str) -> None:
+        """Stop alle speculatie van een client (bij disconnect)."""
+        for key in [key for key in self._active if key[0] == client_id]:
+            self._stop(self._active.pop(key))
+
+    def stats(self) -> dict:
+        resolved = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "active": len(self._active),
+            "partials": self.partials,
+            "partial_errors": self.partial_errors,
+            "prefetches": self.prefetches,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "stt_reused": self.stt_reused,
+            "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0
+        }
+
+    async def _run_partial(self, speculation: Speculation, wav: bytes, received: int) -> None:
+        stream = speculation.stream
+        try:
+            with get_tracer().span("stt.partial", audio_s=round(stream.duration_s, 2)):
+                text = await self.transcribe(wav, stream.language)
+        except Exception:
+            self.partial_errors += 1
+            return
+
+        self.partials += 1
+        speculation.text = text
+        speculation.covered_bytes = received
+
+        if not normalize_transcript(text) or self.prefetch is None:
+            return
+        current = speculation.prefetch
+        if current is not None:
+            if normalize_transcript(current.text) == normalize_transcript(text):
+                return
+            current.cancel()
+            self.discarded += 1
+
+        try:
+            speculation.prefetch = self.prefetch(stream, text)
+        except Exception:
+            speculation.prefetch = None
+        if speculation.prefetch is not None:
+            self.prefetches += 1
+
+    def _stop(self, speculation: Speculation) -> None:
+        if speculation.task is not None:
+            speculation.task.cancel()
+        if speculation.prefetch is not None:
+            speculation.prefetch.cancel()
+            self.discarded += 1
+
+    def _cleanup_stale(self, stale_after: float = 60.0) -> None:
+        """Vergeten uploads (geen audio_end, geen disconnect) opruimen."""
+        now = time.time()
+        for key in [
+            key for key, speculation in self._active.items()
+            if now - speculation.stream.last_frame_at > stale_after
+        ]:
+            self._stop(self._active.pop(key))
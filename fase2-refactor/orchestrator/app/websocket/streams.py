@@ -0,0 +1,187 @@
+"""Streaming microfoon upload: audio_start → audio_frame* → audio_end."""
+import io
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class AudioStream:
+    """
+    Eén lopende upload van een utterance.
+
+    Frames (raw PCM) worden direct aan een begrensde buffer toegevoegd terwijl
+    de gebruiker nog praat. Bij audio_end ligt de audio dus al klaar en kan
+    STT meteen starten. Bij overflow blijven de laatste max_bytes bewaard.
+    """
+    stream_id: str
+    client_id: str
+    conversation_id: str
+    sample_rate: int = 16000
+    channels: int = 1
+    sample_width: int = 2
+    language: str = "nl"
+    max_bytes: int = 16000 * 2 * 30
+    started_at: float = field(default_factory=time.time)
+    last_frame_at: float = field(default_factory=time.time)
+    frames: int = 0
+    gaps: int = 0
+    dropped_bytes: int = 0
+    _next_index: int = 0
+    _buffer: bytearray = field(default_factory=bytearray)
+
+    def append(self, pcm: bytes, index: Optional[int] = None) -> None:
+        """
+        Voeg een PCM frame toe.
+
+        Frames komen op volgorde binnen (één WebSocket, handlers starten
+        FIFO); een ontbrekende index wordt alleen geteld.
+        """
+        if index is not None:
+            if index > self._next_index:
+                self.gaps += index - self._next_index
+            self._next_index = index + 1
+
+        self._buffer.extend(pcm)
+        self.frames += 1
+        self.last_frame_at = time.time()
+
+        overflow = len(self._buffer) - self.max_bytes
+        if overflow > 0:
+            # Altijd hele samples weggooien
+            frame_size = self.sample_width * self.channels
+            overflow += (-overflow) % frame_size
+            del self._buffer[:overflow]
+            self.dropped_bytes += overflow
+
+    @property
+    def num_bytes(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def duration_s(self) -> float:
+        return len(self._buffer) / (self.sample_rate * self.sample_width * self.channels)
+
+    def to_wav(self) -> bytes:
+        """Verpak de gebufferde PCM als WAV (voor STT)."""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(bytes(self._buffer))
+        return buffer.getvalue()
+
+
+class AudioStreamManager:
+    """
+    Beheert lopende audio uploads per (client, stream_id).
+
+    Usage:
+        streams = AudioStreamManager(max_seconds=30)
+        streams.start("pi-1", "default", "a1b2", sample_rate=16000)
+        streams.append("pi-1", "a1b2", pcm_bytes, index=0)
+        stream = streams.finish("pi-1", "a1b2")
+        wav = stream.to_wav()
+    """
+
+    def __init__(self, max_seconds: float = 30.0, stale_after: float = 60.0):
+        self.max_seconds = max_seconds
+        self.stale_after = stale_after
+        self._streams: dict[tuple[str, str], AudioStream] = {}
+
+        # Metrics
+        self.completed = 0
+        self.aborted = 0
+        self.expired = 0
+
+    def start(
+        self,
+        client_id: str,
+        conversation_id: str,
+        stream_id: str,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2,
+        language: str = "nl"
+    ) -> AudioStream:
+        """Begin een nieuwe upload (een bestaande met hetzelfde ID wordt vervangen)."""
+        self.cleanup_stale()
+
+        stream = AudioStream(
+            stream_id=stream_id,
+            client_id=client_id,
+            conversation_id=conversation_id,
+            sample_rate=sample_rate,
+            channels=channels,
+            sample_width=sample_width,
+            language=language,
+            max_bytes=int(self.max_seconds * sample_rate * sample_width * channels)
+        )
+        self._streams[(client_id, stream_id)] = stream
+        return stream
+
+    def get(self, client_id: str, stream_id: str) -> Optional[AudioStream]:
+        return self._streams.get((client_id, stream_id))
+
+    def append(
+        self,
+        client_id: str,
+        stream_id: str,
+        pcm: bytes,
+        index: Optional[int] = None
+    ) -> bool:
+        """
+        Voeg een frame toe aan een lopende upload.
+
+        Returns:
+            False als de stream niet bestaat
+        """
+        stream = self.get(client_id, stream_id)
+        if stream is None:
+            return False
+        stream.append(pcm, index)
+        return True
+
+    def finish(self, client_id: str, stream_id: str) -> Optional[AudioStream]:
+        """Rond een upload af en geef hem terug (None als onbekend)."""
+        stream = self._streams.pop((client_id, stream_id), None)
+        if stream is not None:
+            self.completed += 1
+        return stream
+
+    def abort(self, client_id: str, stream_id: str) -> bool:
+        """Gooi een upload weg (bijv. false start van de VAD)."""
+        stream = self._streams.pop((client_id, stream_id), None)
+        if stream is not None:
+            self.aborted += 1
+        return stream is not None
+
+    def drop_client(self, client_id: str) -> int:
+        """Verwijder alle uploads van een client (bij disconnect)."""
+        keys = [key for key in self._streams if key[0] == client_id]
+        for key in keys:
+            del self._streams[key]
+        self.aborted += len(keys)
+        return len(keys)
+
+    def cleanup_stale(self) -> int:
+        """Verwijder uploads zonder frames sinds stale_after seconden."""
+        now = time.time()
+        stale = [
+            key for key, stream in self._streams.items()
+            if now - stream.last_frame_at > self.stale_after
+        ]
+        for key in stale:
+            del self._streams[key]
+        self.expired += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._streams),
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "expired": self.expired
+        }
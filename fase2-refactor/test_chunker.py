@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests voor de ProsodyChunker (TTS chunking van de LLM token stream).
+Geen server nodig: de chunker wordt direct gevoed met antwoorden in de
+stijl van de system prompt (kort, Nederlands, lopende zinnen).
+
+Gebruik:
+    cd fase2-refactor
+    python test_chunker.py        # of: python -m pytest test_chunker.py
+"""
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "orchestrator"))
+
+from app.services.llm.ollama import strip_text_tool_calls  # noqa: E402
+from app.utils.text_normalization import ProsodyChunker, split_into_sentences  # noqa: E402
+
+
+def stream(text: str, chunker=None) -> list[str]:
+    """Voer de tekst token voor token in (woord + whitespace, zoals Ollama deltas)."""
+    chunker = chunker or ProsodyChunker()
+    chunks = []
+    for token in re.findall(r"\S+\s*", text):
+        chunks += chunker.feed(token)
+    return chunks + chunker.flush()
+
+
+def joined(chunks: list[str]) -> str:
+    return " ".join(chunks)
+
+
+def test_first_chunk_is_first_sentence():
+    """Korte eerste zin gaat direct als eigen chunk weg."""
+    text = "Hoi! Ik ben NerdCarX, een kleine robotauto. Ik kan rijden, kijken en praten."
+    chunks = stream(text)
+    assert chunks[0] == "Hoi!", chunks
+    assert joined(chunks) == text
+
+
+def test_long_first_sentence_splits_on_clause():
+    """Lange eerste zin: eerste chunk al bij een komma (snellere eerste audio)."""
+    text = ("Ik heb een camera met autofocus, een ultrasone sensor vooraan en twee "
+            "afstandssensoren aan de zijkanten. Wil je weten hoe die werken?")
+    chunks = stream(text)
+    assert chunks[0] == "Ik heb een camera met autofocus,", chunks
+    assert joined(chunks) == text
+
+
+def test_later_sentences_are_merged():
+    """Na de eerste chunk worden korte zinnen samengevoegd (minder Fish requests)."""
+    text = "Oké. Ja. Dat kan ik. Ik rijd even naar voren. Daarna kijk ik rond. Zeg maar wanneer."
+    chunks = stream(text)
+    assert chunks[0] == "Oké.", chunks
+    assert len(chunks) < len(split_into_sentences(text)), chunks
+    assert all(len(chunk) > 10 for chunk in chunks[1:]), chunks
+    assert joined(chunks) == text
+
+
+def test_chunks_respect_max_chars():
+    sentence = "Ik ben een kleine robotauto ter grootte van een schoenendoos. "
+    text = (sentence * 8).strip()
+    chunker = ProsodyChunker(max_chars=140)
+    chunks = stream(text, chunker)
+    assert all(len(chunk) <= 140 for chunk in chunks), [len(chunk) for chunk in chunks]
+    assert joined(chunks) == text
+
+
+def test_dutch_abbreviations_do_not_split():
+    text = ("Ik zie o.a. een laptop en bijv. een plant. Het is ca. twintig graden, "
+            "d.w.z. lekker warm. Vraag het maar aan dr. Jansen of J. de Vries.")
+    chunks = stream(text, ProsodyChunker(first_max_chars=200, target_chars=1))
+    assert chunks == [
+        "Ik zie o.a. een laptop en bijv. een plant.",
+        "Het is ca. twintig graden, d.w.z. lekker warm.",
+        "Vraag het maar aan dr. Jansen of J. de Vries.",
+    ], chunks
+
+
+def test_decimals_do_not_split():
+    text = "De batterij staat op 3.5 volt. Dat is 1.2 volt minder dan vol."
+    chunks = stream(text, ProsodyChunker(target_chars=1))
+    assert chunks == ["De batterij staat op 3.5 volt.", "Dat is 1.2 volt minder dan vol."], chunks
+
+
+def test_lowercase_continuation_does_not_split():
+    """Punt gevolgd door een kleine letter is geen zinsgrens (onbekende afkorting)."""
+    text = "We rijden om 3 u. naar de keuken. Daar kijk ik rond."
+    chunks = stream(text, ProsodyChunker(target_chars=1))
+    assert chunks[0] == "We rijden om 3 u. naar de keuken.", chunks
+
+
+def test_waits_for_next_token_before_splitting():
+    """Zonder volgend teken is nog niet te zien of "bijv." een zinsgrens is."""
+    chunker = ProsodyChunker()
+    assert chunker.feed("Ik kan bijv. ") == []
+    assert chunker.feed("rijden. ") == []
+    assert chunker.feed("Wil") == ["Ik kan bijv. rijden."]
+    assert chunker.flush() == ["Wil"]
+
+
+def test_sleep_reply():
+    text = "Oké, ik ga slapen. Zeg 'hey Jarvis' als je me weer nodig hebt."
+    assert stream(text) == ["Oké, ik ga slapen.", "Zeg 'hey Jarvis' als je me weer nodig hebt."]
+
+
+def test_text_tool_call_is_not_split():
+    """Komma's en dubbele punten in de JSON van een text tool call zijn geen bijzin grens."""
+    tool_call = 'show_emotion[ARGS]{"emotion": "happy", "intensity": "high"}'
+    text = f"Oké, ik ben blij! {tool_call} Leuk dat je er bent, wat gaan we vandaag samen doen?"
+    chunks = stream(text)
+    assert any(tool_call in chunk for chunk in chunks), chunks
+    assert joined(chunks) == text
+    # SentenceStream stript per chunk: van de JSON mag niets overblijven
+    spoken = [strip_text_tool_calls(chunk) for chunk in chunks]
+    assert not any("[ARGS]" in chunk or "intensity" in chunk for chunk in spoken), spoken
+
+
+def test_no_punctuation_is_cut_at_max_chars():
+    """LLM vergeet leestekens: niet eindeloos bufferen."""
+    text = " ".join(["woord"] * 80)
+    chunks = stream(text, ProsodyChunker(max_chars=100))
+    assert all(len(chunk) <= 100 for chunk in chunks), [len(chunk) for chunk in chunks]
+    assert joined(chunks) == text
+
+
+def test_flush_resets_state():
+    chunker = ProsodyChunker()
+    assert stream("Hoi! Wat wil je vandaag doen?", chunker)[0] == "Hoi!"
+    # Nieuwe stream met dezelfde chunker begint weer met een snelle eerste chunk
+    assert stream("Ja! Dat is goed.", chunker)[0] == "Ja!"
+
+
+def main():
+    tests = [(name, func) for name, func in globals().items() if name.startswith("test_") and callable(func)]
+    passed = 0
+    for name, func in tests:
+        try:
+            func()
+            print(f"  ✅ {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {name}: {e}")
+
+    print(f"\nResultaat: {passed}/{len(tests)} tests geslaagd")
+    if passed != len(tests):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Camera Service voor NerdCarX
+Houdt Camera Module 3 (IMX708) continu draaiend voor snelle take_photo calls
+
+Per foto Picamera2 openen, configureren, 1s op autofocus wachten en weer
+sluiten kost ruim een seconde. Deze service draait de sensor in een lage
+framerate video configuratie met continuous autofocus en bewaart de laatste
+frames (met hun focus score) in een ring buffer. take_photo() kiest het
+scherpste recente frame en encodeert alleen dat naar JPEG.
+
+JPEG encoding via simplejpeg (libjpeg-turbo, komt mee met picamera2; de Pi 5
+heeft geen hardware JPEG encoder), anders Pillow.
+
+Gebruik:
+    from camera_service import CameraService
+
+    camera = CameraService()
+    camera.start()
+    jpeg_bytes = camera.take_photo()
+    camera.stop()
+"""
+
+import io
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+
+@dataclass
+class Frame:
+    """Eén frame uit de ring buffer."""
+    array: np.ndarray        # RGB, (hoogte, breedte, 3)
+    timestamp: float         # time.monotonic() bij ontvangst
+    sharpness: float         # FocusFoM van de ISP, of Laplacian variantie
+    af_state: Optional[int] = None
+
+
+def laplacian_variance(array: np.ndarray, step: int = 4) -> float:
+    """Scherpte schatting zonder ISP metadata (grijs, elke step-de pixel)."""
+    gray = array[::step, ::step].mean(axis=2)
+    lap = (
+        gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1]
+        - 4 * gray[1:-1, 1:-1]
+    )
+    return float(lap.var())
+
+
+class CameraService:
+    """Continue capture met ring buffer; take_photo() in milliseconden."""
+
+    def __init__(
+        self,
+        size: tuple[int, int] = (640, 480),
+        fps: float = 10.0,
+        buffer_frames: int = 6,
+        jpeg_quality: int = 85
+    ):
+        self.size = size
+        self.fps = fps
+        self.jpeg_quality = jpeg_quality
+        self._frames: deque[Frame] = deque(maxlen=buffer_frames)
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.camera = None
+        self.available = False
+
+        # Metrics
+        self.frames = 0
+        self.photos = 0
+
+    def start(self) -> bool:
+        """Open de camera en start de capture thread (False als dat niet lukt)."""
+        try:
+            from picamera2 import Picamera2
+
+            self.camera = Picamera2()
+            controls = {"FrameRate": self.fps}
+            try:
+                from libcamera import controls as lc
+                controls["AfMode"] = lc.AfModeEnum.Continuous
+                controls["AfSpeed"] = lc.AfSpeedEnum.Fast
+            except ImportError:
+                pass  # Geen autofocus controls: vaste focus
+
+            # BGR888 = RGB volgorde in de numpy array (zie picamera2 docs)
+            config = self.camera.create_video_configuration(
+                main={"size": self.size, "format": "BGR888"},
+                controls=controls,
+                buffer_count=4
+            )
+            self.camera.configure(config)
+            self.camera.start()
+        except Exception as e:
+            print(f"[Camera] Niet beschikbaar: {e}")
+            self._close_camera()
+            return False
+
+        self.available = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Stop capture en geef de camera vrij (ook nodig vóór os.execv)."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._close_camera()
+        self.available = False
+        with self._lock:
+            self._frames.clear()
+
+    def take_photo(self, max_age_s: float = 0.5, timeout: float = 2.0) -> Optional[bytes]:
+        """
+        JPEG van het scherpste frame van de laatste max_age_s seconden.
+
+        Direct na start() wacht dit op het eerste frame (max timeout s).
+        Returns None als er geen frame is.
+        """
+        frame = self._best_frame(max_age_s, timeout)
+        if frame is None:
+            return None
+        self.photos += 1
+        return self._encode(frame.array)
+
+    def stats(self) -> dict:
+        with self._lock:
+            buffered = len(self._frames)
+        return {"available": self.available, "frames": self.frames, "buffered": buffered, "photos": self.photos}
+
+    def _best_frame(self, max_age_s: float, timeout: float) -> Optional[Frame]:
+        deadline = time.monotonic() + timeout
+        with self._new_frame:
+            while self.available:
+                cutoff = time.monotonic() - max_age_s
+                recent = [frame for frame in self._frames if frame.timestamp >= cutoff]
+                if recent:
+                    # Scherpste wint; bij gelijke score het nieuwste
+                    return max(reversed(recent), key=lambda frame: frame.sharpness)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._new_frame.wait(remaining)
+            # Camera hapert: liever een ouder frame dan niets
+            return self._frames[-1] if self._frames else None
+
+    def _capture_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                request = self.camera.capture_request()
+                try:
+                    array = request.make_array("main")
+                    metadata = request.get_metadata()
+                finally:
+                    request.release()
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"[Camera] Capture fout: {e}")
+                    time.sleep(0.5)
+                continue
+
+            sharpness = metadata.get("FocusFoM")
+            if sharpness is None:
+                sharpness = laplacian_variance(array)
+            frame = Frame(array, time.monotonic(), float(sharpness), metadata.get("AfState"))
+            with self._new_frame:
+                self._frames.append(frame)
+                self.frames += 1
+                self._new_frame.notify_all()
+
+    def _encode(self, array: np.ndarray) -> bytes:
+        if simplejpeg is not None:
+            return simplejpeg.encode_jpeg(
+                np.ascontiguousarray(array), quality=self.jpeg_quality, colorspace="RGB"
+            )
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.fromarray(array).save(buffer, format="JPEG", quality=self.jpeg_quality)
+        return buffer.getvalue()
+
+    def _close_camera(self) -> None:
+        if self.camera is None:
+            return
+        try:
+            self.camera.stop()
+        except Exception:
+            pass
+        try:
+            self.camera.close()
+        except Exception:
+            pass
+        self.camera = None
+
+
+if __name__ == "__main__":
+    service = CameraService()
+    if not service.start():
+        raise SystemExit(1)
+    try:
+        time.sleep(1.5)  # Autofocus laten settelen
+        for i in range(3):
+            t0 = time.perf_counter()
+            jpeg = service.take_photo()
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"Foto {i + 1}: {len(jpeg) // 1024} KB in {ms:.1f} ms")
+            time.sleep(0.5)
+        print(service.stats())
+    finally:
+        service.stop()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Orchestrator Session voor NerdCarX
+Eén persistente WebSocket connectie naar de desktop orchestrator
+
+- Draait op een eigen asyncio loop in een achtergrond thread
+- Reconnect automatisch met exponential backoff
+- Routeert berichten op request_id (antwoorden) en conversation_id (inbox)
+- Stuurt heartbeats en meet daarmee de RTT naar de desktop
+- Binary audio frames na hello negotiation
+
+De audio loop op de Pi blijft sync en praat via queues met de sessie.
+
+Gebruik:
+    from orchestrator_session import OrchestratorSession
+
+    session = OrchestratorSession("ws://192.168.1.161:8200/ws", "pi-123")
+    session.start()
+    session.wait_connected(timeout=5)
+
+    session.send_json("audio_process", {"audio_base64": ..., "language": "nl"})
+    inbox = session.inbox()
+    msg = inbox.get(timeout=60)     # {"type": "response", "payload": {...}}
+
+    print(session.rtt_stats())
+    session.stop()
+"""
+
+import asyncio
+import json
+import queue
+import random
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+
+# ============================================================================
+# BINARY AUDIO FRAMES (zie orchestrator websocket/protocol.py)
+# ============================================================================
+
+# magic, versie, frame type, flags, codec, index, len(conv_id), len(meta)
+BINARY_MAGIC = b"NX"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct(">2sBBBBIHH")
+FRAME_AUDIO_PROCESS = 1
+FRAME_AUDIO_CHUNK = 2
+FRAME_AUDIO_FRAME = 3
+FLAG_IS_LAST = 1
+CODEC_WAV = 0
+CODEC_PCM_S16LE = 1
+
+
+def encode_audio_frame(audio_bytes: bytes, conv_id: str, meta: dict,
+                       frame_type: int = FRAME_AUDIO_PROCESS, codec: int = CODEC_WAV,
+                       index: int = 0) -> bytes:
+    """Maak een binary audio frame (audio_process of streaming audio_frame)."""
+    conv = conv_id.encode("utf-8")
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, frame_type, 0, codec,
+        index, len(conv), len(meta_bytes)
+    )
+    return header + conv + meta_bytes + audio_bytes
+
+
+def decode_audio_frame(data: bytes) -> dict:
+    """Parse een binary audio_chunk frame naar een message dict zoals de JSON variant."""
+    magic, version, frame_type, flags, codec, index, conv_len, meta_len = \
+        BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Onbekend binary frame")
+
+    offset = BINARY_HEADER.size
+    conv_id = data[offset:offset + conv_len].decode("utf-8")
+    offset += conv_len
+    meta = json.loads(data[offset:offset + meta_len]) if meta_len else {}
+    offset += meta_len
+
+    return {
+        "type": "audio_chunk",
+        "conversation_id": conv_id or "default",
+        "payload": {
+            "audio_bytes": data[offset:],
+            "sentence": meta.get("sentence"),
+            "index": index,
+            "is_last": bool(flags & FLAG_IS_LAST)
+        }
+    }
+
+
+# ============================================================================
+# SESSION
+# ============================================================================
+
+class OrchestratorSession:
+    """Persistente, auto-reconnecting WebSocket sessie (thread-safe API)."""
+
+    def __init__(self, url: str, conversation_id: str, binary_audio: bool = True,
+                 heartbeat_interval: float = 10.0, heartbeat_timeout: float = 5.0,
+                 reconnect_min: float = 0.5, reconnect_max: float = 10.0):
+        self.url = url
+        self.conversation_id = conversation_id
+        self.want_binary_audio = binary_audio
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+
+        # Status (gelezen vanuit de audio thread)
+        self.binary_audio = False
+        self.reconnects = 0
+        self._connected = threading.Event()
+        self._stopping = False
+
+        # Inboxen per conversation_id (sync queues voor de audio loop)
+        self._inboxes = {}
+        self._inbox_lock = threading.Lock()
+
+        # RTT metingen (ms) via heartbeat echo
+        self._rtts = deque(maxlen=50)
+
+        # Alleen binnen de sessie loop gebruikt
+        self._loop = None
+        self._thread = None
+        self._ws = None
+        self._outgoing = None
+        self._pending = {}  # request_id -> Future
+
+    # ------------------------------------------------------------------
+    # Publieke (sync) API - aan te roepen vanuit de audio thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start de achtergrond thread met de event loop."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._thread_main, name="orchestrator-session", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop de sessie en sluit de connectie."""
+        if self._loop is None:
+            return
+        self._stopping = True
+        asyncio.run_coroutine_threadsafe(self._close_ws(), self._loop)
+        self._thread.join(timeout)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout: float = None) -> bool:
+        """Blokkeer tot de sessie verbonden is (True) of de timeout verloopt."""
+        return self._connected.wait(timeout)
+
+    def inbox(self, conversation_id: str = None) -> queue.Queue:
+        """Queue met binnenkomende berichten voor een conversation."""
+        conversation_id = conversation_id or self.conversation_id
+        with self._inbox_lock:
+            if conversation_id not in self._inboxes:
+                self._inboxes[conversation_id] = queue.Queue()
+            return self._inboxes[conversation_id]
+
+    def send(self, data) -> bool:
+        """
+        Zet een bericht (str of bytes) in de verzendqueue.
+
+        Returns:
+            False als er geen connectie is (bericht wordt dan niet verstuurd)
+        """
+        if not self.connected:
+            return False
+        self._loop.call_soon_threadsafe(self._outgoing.put_nowait, data)
+        return True
+
+    def send_json(self, msg_type: str, payload: dict, conversation_id: str = None) -> bool:
+        """Verstuur een protocol bericht."""
+        return self.send(json.dumps(self._message(msg_type, payload, conversation_id)))
+
+    def request(self, msg_type: str, payload: dict, timeout: float = 10.0) -> dict:
+        """
+        Verstuur een bericht met request_id en wacht op het antwoord met dezelfde request_id.
+
+        Raises:
+            TimeoutError / ConnectionError
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(msg_type, payload, timeout), self._loop
+        )
+        return future.result(timeout + 1)
+
+    def probe_latency(self, count: int = 5) -> dict:
+        """Meet RTT met een paar heartbeats achter elkaar (latency probe)."""
+        for _ in range(count):
+            try:
+                self._record_rtt(self.request("heartbeat", self._heartbeat_payload(), self.heartbeat_timeout))
+            except Exception:
+                pass
+        return self.rtt_stats()
+
+    def rtt_stats(self) -> dict:
+        """RTT statistieken over de laatste heartbeats."""
+        rtts = sorted(self._rtts)
+        if not rtts:
+            return {"samples": 0}
+        return {
+            "samples": len(rtts),
+            "last_ms": round(self._rtts[-1], 1),
+            "min_ms": round(rtts[0], 1),
+            "avg_ms": round(sum(rtts) / len(rtts), 1),
+            "p95_ms": round(rtts[min(len(rtts) - 1, int(len(rtts) * 0.95))], 1),
+            "max_ms": round(rtts[-1], 1),
+            "reconnects": self.reconnects
+        }
+
+    # ------------------------------------------------------------------
+    # Sessie loop (achtergrond thread)
+    # ------------------------------------------------------------------
+
+    def _thread_main(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._outgoing = asyncio.Queue()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self) -> None:
+        """Connect → hello → reader/writer/heartbeat, en bij fouten reconnect met backoff."""
+        import websockets
+
+        backoff = self.reconnect_min
+        first = True
+
+        while not self._stopping:
+            try:
+                async with websockets.connect(
+                    f"{self.url}?conversation_id={self.conversation_id}",
+                    ping_interval=None  # Eigen heartbeats (met RTT meting)
+                ) as ws:
+                    self._ws = ws
+                    if not first:
+                        self.reconnects += 1
+                    first = False
+                    backoff = self.reconnect_min
+
+                    await self._session(ws)
+
+            except Exception as e:
+                if not self._stopping:
+                    print(f"  ⚠️ Orchestrator connectie: {e}")
+
+            self._on_disconnect()
+            if self._stopping:
+                break
+
+            # Exponential backoff met jitter
+            await asyncio.sleep(backoff * (0.5 + random.random() / 2))
+            backoff = min(backoff * 2, self.reconnect_max)
+
+    async def _session(self, ws) -> None:
+        reader = asyncio.create_task(self._reader(ws))
+
+        self.binary_audio = await self._negotiate()
+        self._connected.set()
+
+        tasks = [reader, asyncio.create_task(self._writer(ws)), asyncio.create_task(self._heartbeats())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # Exception doorgeven → reconnect
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _negotiate(self) -> bool:
+        """Hello met capabilities; oude orchestrators antwoorden met een error."""
+        if not self.want_binary_audio:
+            return False
+
+        payload = {"binary_audio": True, "binary_versions": [BINARY_VERSION], "codecs": ["wav"]}
+        try:
+            reply = await self._request("hello", payload, timeout=5.0, reply_type="hello")
+        except (asyncio.TimeoutError, ConnectionError):
+            return False
+        return bool(reply.get("payload", {}).get("binary_audio"))
+
+    async def _reader(self, ws) -> None:
+        async for raw in ws:
+            try:
+                message = decode_audio_frame(raw) if isinstance(raw, bytes) else json.loads(raw)
+            except ValueError:
+                continue
+            self._route(message)
+
+    async def _writer(self, ws) -> None:
+        while True:
+            data = await self._outgoing.get()
+            await ws.send(data)
+
+    async def _heartbeats(self) -> None:
+        """
+        Heartbeat per interval; twee gemiste antwoorden → reconnect.
+
+        Oudere orchestrators echoën heartbeats niet; zolang er nog nooit een
+        antwoord kwam, tellen gemiste antwoorden dus niet.
+        """
+        missed = 0
+        echoes = False
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                reply = await self._request("heartbeat", self._heartbeat_payload(), self.heartbeat_timeout)
+                self._record_rtt(reply)
+                echoes = True
+                missed = 0
+            except asyncio.TimeoutError:
+                missed += 1
+                if echoes and missed >= 2:
+                    raise ConnectionError("Geen heartbeat antwoord van orchestrator")
+
+    async def _request(self, msg_type: str, payload: dict, timeout: float,
+                       reply_type: str = None) -> dict:
+        if self._ws is None:
+            raise ConnectionError("Niet verbonden")
+
+        # Hello heeft geen request_id in het protocol: route op type
+        request_id = reply_type or uuid.uuid4().hex[:8]
+        if not reply_type:
+            payload = dict(payload, request_id=request_id)
+
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send(json.dumps(self._message(msg_type, payload)))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _route(self, message: dict) -> None:
+        """Antwoorden op een request naar de wachtende future, de rest naar de inbox."""
+        msg_type = message.get("type")
+        payload = message.get("payload", {})
+
+        # function_request heeft ook een request_id, maar is geen antwoord
+        if msg_type != "function_request":
+            for key in (payload.get("request_id"), msg_type):
+                future = self._pending.get(key)
+                if future is not None and not future.done():
+                    future.set_result(message)
+                    return
+
+        self.inbox(message.get("conversation_id")).put(message)
+
+    def _on_disconnect(self) -> None:
+        was_connected = self._connected.is_set()
+        self._connected.clear()
+        self._ws = None
+        self.binary_audio = False
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Verbinding verbroken"))
+        self._pending.clear()
+
+        # Niet verstuurde berichten horen bij de oude connectie
+        while not self._outgoing.empty():
+            self._outgoing.get_nowait()
+
+        # Wachtende turns laten weten dat er geen antwoord meer komt
+        if was_connected:
+            with self._inbox_lock:
+                inboxes = list(self._inboxes.items())
+            for conv_id, inbox in inboxes:
+                inbox.put({
+                    "type": "error",
+                    "conversation_id": conv_id,
+                    "payload": {"error": "Verbinding met orchestrator verbroken", "code": "disconnected"}
+                })
+
+    async def _close_ws(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+
+    def _message(self, msg_type: str, payload: dict, conversation_id: str = None) -> dict:
+        return {
+            "type": msg_type,
+            "conversation_id": conversation_id or self.conversation_id,
+            "timestamp": time.time(),
+            "payload": payload
+        }
+
+    @staticmethod
+    def _heartbeat_payload() -> dict:
+        return {"sent_at": time.perf_counter()}
+
+    def _record_rtt(self, reply: dict) -> None:
+        sent_at = reply.get("payload", {}).get("sent_at")
+        if sent_at is not None:
+            self._rtts.append((time.perf_counter() - sent_at) * 1000)
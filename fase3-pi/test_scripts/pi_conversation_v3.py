@@ -10,6 +10,15 @@ Dit script is een vereenvoudigde versie van v2:
 Flow:
     [Start] -> [Wake word] -> [VAD Loop: luisteren -> opnemen -> verwerken -> afspelen]
 
+Audio playback: één persistente output stream met jitter buffer (zie
+playback_engine.py). Audio chunks spelen af zodra ze binnenkomen, niet pas
+als de hele reply er is.
+
+Barge-in: tijdens het afspelen blijft de VAD op de microfoon luisteren. Praat
+de gebruiker erdoorheen, dan stopt het afspelen, krijgt de orchestrator een
+interrupt (lopende LLM/TTS wordt gecanceld, history ingekort) en begint
+direct de volgende opname.
+
 Debug info (timing STT/LLM/TTS) wordt getoond via:
     docker compose logs orchestrator -f
 
@@ -19,25 +28,34 @@ Gebruik op Pi:
     python pi_conversation_v3.py
 """
 
-import asyncio
 import base64
 import io
-import json
 import os
+import queue
 import signal
 import subprocess
 import sys
 import termios
 import time
+import uuid
 import wave
 from collections import deque
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pyaudio
 import onnxruntime as ort
 from openwakeword.model import Model as WakeWordModel
 
+from orchestrator_session import (
+    OrchestratorSession,
+    encode_audio_frame,
+    FRAME_AUDIO_FRAME,
+    CODEC_PCM_S16LE,
+)
+from playback_engine import PlaybackEngine
+
 # OLED Display (optioneel - werkt ook zonder)
 try:
     from oled_display import OLEDDisplay
@@ -52,6 +70,18 @@ _shutdown_requested = False
 # Global OLED display
 _oled_display = None
 
+# Global camera service (continu draaiend, zie camera_service.py)
+_camera_service = None
+
+# Global playback engine (persistente speaker stream, zie playback_engine.py)
+_playback = None
+
+# Barge-in detector op de mic (alleen actief tijdens het afspelen)
+_barge_in = None
+
+# Barge-in: tijdstip van het laatste interrupt zolang de bevestiging nog niet binnen is
+_interrupt_sent_at = None
+
 
 def _signal_handler(signum, frame):
     """Handle Ctrl+C."""
@@ -69,6 +99,14 @@ def _signal_handler(signum, frame):
 DESKTOP_IP = "192.168.1.161"
 WEBSOCKET_URL = f"ws://{DESKTOP_IP}:8200/ws"
 
+# Binary audio frames i.p.v. base64 JSON (valt terug op JSON als de
+# orchestrator het niet ondersteunt)
+BINARY_AUDIO = True
+
+# Streaming upload: audio frames al tijdens het spreken versturen over één
+# persistente connectie (False = hele opname na afloop in één bericht)
+STREAMING_UPLOAD = True
+
 # Audio hardware (Pi specifiek)
 MIC_DEVICE_NAME = "USB PnP Sound Device"
 SPEAKER_DEVICE_NAME = "hifiberry"
@@ -97,6 +135,16 @@ SILENCE_DURATION = 1.5
 MIN_SPEECH_DURATION = 0.3
 PRE_SPEECH_BUFFER = 0.3
 
+# Barge-in (VAD tijdens afspelen). Strenger dan VAD_THRESHOLD: de mic hoort de speaker ook
+BARGE_IN = True
+BARGE_IN_THRESHOLD = 0.8
+BARGE_IN_MIN_MS = 240           # Zoveel ms spraak achter elkaar voordat we stoppen
+INTERRUPT_ACK_TIMEOUT = 2.0     # Oudere orchestrators bevestigen een interrupt niet
+
+# Playback (jitter buffer)
+PLAYBACK_PREBUFFER_MS = 120     # Zoveel audio klaar voordat een reply begint te spelen
+PLAYBACK_POLL = 0.02            # Inbox/barge-in poll interval tijdens het afspelen
+
 # Audio gain
 AUDIO_GAIN = 10.0
 
@@ -108,10 +156,16 @@ VAD_MODEL_PATH = os.path.expanduser("~/silero_vad_v4.onnx")
 CAMERA_AVAILABLE = False
 try:
     from picamera2 import Picamera2
+    from camera_service import CameraService
     CAMERA_AVAILABLE = True
 except ImportError:
     print("⚠️ picamera2 niet beschikbaar, take_photo gebruikt mock foto")
 
+# Camera continu laten draaien (ring buffer, foto in ms i.p.v. >1s per foto)
+CAMERA_CONTINUOUS = True
+CAMERA_SIZE = (640, 480)  # Klein voor snelle transfer
+CAMERA_FPS = 10
+
 # Fallback mock photo
 MOCK_PHOTO_PATH = Path(__file__).parent / "mock_photo.jpg"
 
@@ -222,10 +276,9 @@ def audio_to_wav_bytes(audio: np.ndarray, sample_rate: int = MODEL_SAMPLE_RATE)
     return buffer.getvalue()
 
 
-def play_audio_base64(audio_base64: str, p: pyaudio.PyAudio) -> None:
-    """Play base64 encoded WAV audio."""
+def play_audio_bytes(audio_bytes: bytes, p: pyaudio.PyAudio) -> None:
+    """Play WAV audio bytes."""
     try:
-        audio_bytes = base64.b64decode(audio_base64)
         with wave.open(io.BytesIO(audio_bytes), 'rb') as wf:
             stream = p.open(
                 format=p.get_format_from_width(wf.getsampwidth()),
@@ -241,6 +294,43 @@ def play_audio_base64(audio_base64: str, p: pyaudio.PyAudio) -> None:
         print(f"  ⚠️ Audio error: {e}")
 
 
+class BargeInDetector:
+    """
+    VAD op de microfoon terwijl de speaker speelt (barge-in).
+
+    Mic frames gaan ook in pre_buffer: daarmee begint de volgende opname met
+    het begin van de onderbreking.
+    """
+
+    def __init__(self, mic_stream, vad: SileroVAD, chunk_size: int, pre_buffer: deque):
+        self.mic_stream = mic_stream
+        self.vad = vad
+        self.chunk_size = chunk_size
+        self.pre_buffer = pre_buffer
+        self.speech_needed = max(1, int(BARGE_IN_MIN_MS / VAD_CHUNK_MS))
+        self.speech = 0
+
+    def reset(self) -> None:
+        """Nieuwe turn: VAD state en mic audio van tijdens de opname/upload weg."""
+        self.vad.reset_state()
+        self.speech = 0
+        while self.mic_stream.get_read_available() >= self.chunk_size:
+            self.mic_stream.read(self.chunk_size, exception_on_overflow=False)
+
+    def heard_speech(self) -> bool:
+        """Verwerk alle beschikbare mic frames; True bij BARGE_IN_MIN_MS spraak achter elkaar."""
+        while self.mic_stream.get_read_available() >= self.chunk_size:
+            data = self.mic_stream.read(self.chunk_size, exception_on_overflow=False)
+            self.pre_buffer.append(data)
+            audio = np.frombuffer(data, dtype=np.int16)
+            if MIC_SAMPLE_RATE != MODEL_SAMPLE_RATE:
+                audio = resample_audio(audio, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE)
+            self.speech = self.speech + 1 if self.vad.process(audio) > BARGE_IN_THRESHOLD else 0
+            if self.speech >= self.speech_needed:
+                return True
+        return False
+
+
 def resample_audio(audio: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
     if orig_rate == target_rate:
         return audio
@@ -273,7 +363,6 @@ def find_device_by_name(p: pyaudio.PyAudio, name_pattern: str, need_input: bool
 def play_camera_shutter() -> None:
     """Speel camera shutter geluid."""
     try:
-        p = pyaudio.PyAudio()
         sample_rate = SPEAKER_SAMPLE_RATE or 44100
         # Kort "klik" geluid - hoge freq, zeer kort
         duration = 0.08
@@ -282,6 +371,12 @@ def play_camera_shutter() -> None:
         wave1 = np.sin(2 * np.pi * 1200 * t) * np.exp(-t * 40)  # Decay
         audio = (wave1 * 20000).astype(np.int16)
 
+        # De playback engine houdt de speaker open: via de buffer afspelen
+        if _playback and _playback.running:
+            _playback.enqueue_pcm(audio)
+            return
+
+        p = pyaudio.PyAudio()
         stream = p.open(format=FORMAT, channels=1, rate=sample_rate,
                        output=True, output_device_index=SPEAKER_DEVICE_INDEX)
         stream.write(audio.tobytes())
@@ -294,6 +389,16 @@ def play_camera_shutter() -> None:
 
 def execute_take_photo() -> tuple[str, str]:
     """Execute take_photo - maak foto met Camera Module 3."""
+    if _camera_service and _camera_service.available:
+        t0 = time.perf_counter()
+        jpeg = _camera_service.take_photo()
+        if jpeg:
+            ms = (time.perf_counter() - t0) * 1000
+            play_camera_shutter()
+            print(f"  📷 Photo from camera buffer ({len(jpeg) // 1024} KB, {ms:.0f}ms)")
+            return "Photo captured", base64.b64encode(jpeg).decode('utf-8')
+        print("  ⚠️ Camera buffer leeg, losse capture")
+
     if CAMERA_AVAILABLE:
         try:
             from PIL import Image
@@ -341,7 +446,7 @@ def execute_take_photo() -> tuple[str, str]:
         return "No camera available", ""
 
 
-async def handle_function_request(ws, payload: dict, conv_id: str) -> tuple[bool, str]:
+def handle_function_request(session: OrchestratorSession, payload: dict, conv_id: str) -> tuple[bool, str]:
     """
     Handle FUNCTION_REQUEST from orchestrator.
 
@@ -378,80 +483,246 @@ async def handle_function_request(ws, payload: dict, conv_id: str) -> tuple[bool
         result_text = f"Unknown tool: {name}"
 
     # Send result back
-    msg = {
-        "type": "function_result",
-        "conversation_id": conv_id,
-        "timestamp": time.time(),
-        "payload": {"name": name, "request_id": request_id, "result": result_text}
-    }
+    result_payload = {"name": name, "request_id": request_id, "result": result_text}
     if image_base64:
-        msg["payload"]["image_base64"] = image_base64
+        result_payload["image_base64"] = image_base64
 
-    await ws.send(json.dumps(msg))
+    session.send_json("function_result", result_payload, conversation_id=conv_id)
     return should_sleep, result_text
 
 
 # ============================================================================
-# WEBSOCKET CLIENT
+# ORCHESTRATOR CLIENT
 # ============================================================================
 
-async def send_audio_and_receive(audio_bytes: bytes, conv_id: str) -> dict:
-    """Send audio, receive response."""
-    import websockets
+def _empty_result() -> dict:
+    return {
+        "text": "", "chunks": [], "chunk_count": 0, "emotion": "neutral", "should_sleep": False,
+        "interrupted": False, "played_index": None
+    }
+
+
+def drain_inbox(session: OrchestratorSession) -> None:
+    """Gooi achtergebleven berichten van een vorige turn weg."""
+    inbox = session.inbox()
+    while not inbox.empty():
+        skip_interrupted(inbox.get_nowait().get("type", ""))
+
+
+def send_interrupt(session: OrchestratorSession, played_index: Optional[int]) -> None:
+    """Barge-in melden: de orchestrator cancelt de turn en kort de history in."""
+    global _interrupt_sent_at
+    if session.send_json("interrupt", {"played_index": played_index}):
+        _interrupt_sent_at = time.monotonic()
+
+
+def skip_interrupted(msg_type: str) -> bool:
+    """
+    True voor berichten van een onderbroken turn.
+
+    De orchestrator bevestigt een interrupt pas na de laatste chunk van die
+    turn; tot die bevestiging (of INTERRUPT_ACK_TIMEOUT) hoort alles bij de
+    oude turn.
+    """
+    global _interrupt_sent_at
+    if msg_type == "interrupt":
+        _interrupt_sent_at = None
+        return True
+    if _interrupt_sent_at is None:
+        return False
+    if time.monotonic() - _interrupt_sent_at > INTERRUPT_ACK_TIMEOUT:
+        _interrupt_sent_at = None
+        return False
+    return True
 
-    result = {"text": "", "chunks": [], "emotion": "neutral", "should_sleep": False}
+
+def barge_in_detected() -> bool:
+    """Praat de gebruiker door de reply heen? (alleen als er echt audio speelt)"""
+    return _barge_in is not None and _playback.playing and _barge_in.heard_speech()
+
+
+def interrupt_playback(result: dict) -> None:
+    """Stop het afspelen direct en onthoud tot welke chunk het gehoord is."""
+    result["interrupted"] = True
+    result["played_index"] = _playback.clear()
+
+
+def wait_playback(result: dict) -> None:
+    """Speel de rest van de jitter buffer uit (barge-in blijft actief)."""
+    while _playback.busy and not _shutdown_requested:
+        if barge_in_detected():
+            interrupt_playback(result)
+            return
+        time.sleep(PLAYBACK_POLL)
+
+
+def receive_turn(session: OrchestratorSession, conv_id: str) -> dict:
+    """
+    Ontvang response, audio chunks en function requests tot de laatste chunk.
+
+    Met de playback engine gaan audio chunks direct de jitter buffer in (de
+    eerste zin speelt terwijl de rest nog binnenkomt) en wordt tussen de
+    berichten door op barge-in gecontroleerd. Zonder engine worden de chunks
+    verzameld in result["chunks"].
+    """
+    result = _empty_result()
+    inbox = session.inbox(conv_id)
+    streaming = _playback is not None and _playback.running
+    if streaming:
+        _playback.begin_turn()
+        if _barge_in:
+            _barge_in.reset()
+    deadline = time.monotonic() + 60.0
 
     try:
-        async with websockets.connect(f"{WEBSOCKET_URL}?conversation_id={conv_id}", ping_timeout=30) as ws:
-            # Send audio
-            msg = {
-                "type": "audio_process",
-                "conversation_id": conv_id,
-                "timestamp": time.time(),
-                "payload": {"audio_base64": base64.b64encode(audio_bytes).decode(), "language": "nl"}
-            }
-            await ws.send(json.dumps(msg))
-
-            # Receive responses
-            while True:
-                try:
-                    raw = await asyncio.wait_for(ws.recv(), timeout=60.0)
-                    data = json.loads(raw)
-                    msg_type = data.get("type", "")
-
-                    if msg_type == "response":
-                        payload = data.get("payload", {})
-                        result["text"] = payload.get("text", "")
-                        emotion = payload.get("emotion", "neutral")
-                        if isinstance(emotion, dict):
-                            emotion = emotion.get("current", "neutral")
-                        result["emotion"] = emotion
-
-                    elif msg_type == "audio_chunk":
-                        payload = data.get("payload", {})
-                        result["chunks"].append(payload.get("audio_base64"))
-                        if payload.get("is_last"):
-                            break
-
-                    elif msg_type == "function_request":
-                        should_sleep, _ = await handle_function_request(ws, data.get("payload", {}), conv_id)
-                        if should_sleep:
-                            result["should_sleep"] = True
-
-                    elif msg_type == "error":
-                        print(f"  ❌ {data.get('payload', {}).get('error', 'Error')}")
-                        break
+        while True:
+            if streaming and barge_in_detected():
+                interrupt_playback(result)
+                break
 
-                except asyncio.TimeoutError:
-                    print("  ⚠️ Timeout")
+            try:
+                data = inbox.get(timeout=PLAYBACK_POLL if streaming else 60.0)
+            except queue.Empty:
+                if time.monotonic() < deadline:
+                    continue
+                print("  ⚠️ Timeout")
+                break
+
+            msg_type = data.get("type", "")
+            payload = data.get("payload", {})
+
+            if skip_interrupted(msg_type):
+                continue
+
+            if msg_type == "response":
+                result["text"] = payload.get("text", "")
+                emotion = payload.get("emotion", "neutral")
+                if isinstance(emotion, dict):
+                    emotion = emotion.get("current", "neutral")
+                result["emotion"] = emotion
+
+            elif msg_type == "audio_chunk":
+                # Binary frames zijn al gedecodeerd door de sessie
+                audio = payload.get("audio_bytes")
+                if not audio and payload.get("audio_base64"):
+                    audio = base64.b64decode(payload["audio_base64"])
+                if audio:
+                    result["chunk_count"] += 1
+                    if streaming:
+                        try:
+                            _playback.enqueue(audio, payload.get("index"))
+                        except Exception as e:
+                            print(f"  ⚠️ Audio error: {e}")
+                    else:
+                        result["chunks"].append(audio)
+                if payload.get("is_last"):
                     break
 
-    except Exception as e:
-        print(f"  ❌ Connection error: {e}")
+            elif msg_type == "function_request":
+                should_sleep, _ = handle_function_request(session, payload, conv_id)
+                if should_sleep:
+                    result["should_sleep"] = True
+
+            elif msg_type == "error":
+                print(f"  ❌ {payload.get('error', 'Error')}")
+                break
+    finally:
+        if streaming:
+            # Ook bij timeout/fout: wat er al is mag uitspelen
+            _playback.end_turn()
 
     return result
 
 
+def send_audio_and_receive(session: OrchestratorSession, audio_bytes: bytes, conv_id: str) -> dict:
+    """Send audio (één bericht), receive response."""
+    drain_inbox(session)
+
+    if session.binary_audio:
+        sent = session.send(encode_audio_frame(audio_bytes, conv_id, {"language": "nl"}))
+    else:
+        sent = session.send_json("audio_process", {
+            "audio_base64": base64.b64encode(audio_bytes).decode(),
+            "language": "nl"
+        })
+
+    if not sent:
+        print("  ❌ Niet verbonden met orchestrator")
+        return _empty_result()
+    return receive_turn(session, conv_id)
+
+
+class StreamingUplink:
+    """
+    Streaming upload via de OrchestratorSession.
+
+    audio_start bij begin spraak, audio_frame per VAD chunk (gain en
+    resampling per frame), audio_end na de stilte. De orchestrator heeft de
+    audio dan al binnen en start STT direct.
+    """
+
+    def __init__(self, session: OrchestratorSession, conv_id: str):
+        self.session = session
+        self.conv_id = conv_id
+        self.stream_id = None
+        self.index = 0
+        self.failed = False
+
+    def start(self) -> None:
+        """Begin spraak: open een nieuwe upload."""
+        drain_inbox(self.session)
+        self.stream_id = uuid.uuid4().hex[:8]
+        self.index = 0
+        self.failed = not self.session.send_json("audio_start", {
+            "stream_id": self.stream_id,
+            "sample_rate": MODEL_SAMPLE_RATE,
+            "channels": CHANNELS,
+            "language": "nl"
+        })
+        if self.failed:
+            print("  ❌ Niet verbonden met orchestrator")
+
+    def send_frame(self, data: bytes) -> None:
+        """Verstuur één mic chunk (gain + resampling naar 16kHz per frame)."""
+        if self.stream_id is None or self.failed:
+            return
+
+        audio = apply_gain(np.frombuffer(data, dtype=np.int16))
+        if MIC_SAMPLE_RATE != MODEL_SAMPLE_RATE:
+            audio = resample_audio(audio, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE)
+        pcm = audio.tobytes()
+
+        if self.session.binary_audio:
+            sent = self.session.send(encode_audio_frame(
+                pcm, self.conv_id, {"stream_id": self.stream_id},
+                frame_type=FRAME_AUDIO_FRAME, codec=CODEC_PCM_S16LE, index=self.index
+            ))
+        else:
+            sent = self.session.send_json("audio_frame", {
+                "stream_id": self.stream_id,
+                "index": self.index,
+                "audio_base64": base64.b64encode(pcm).decode()
+            })
+        self.failed = not sent
+        self.index += 1
+
+    def end(self, aborted: bool = False) -> None:
+        """Einde spraak (aborted=True bij een false start)."""
+        if self.stream_id is None:
+            return
+        if not self.failed:
+            self.failed = not self.session.send_json(
+                "audio_end", {"stream_id": self.stream_id, "aborted": aborted}
+            )
+        self.stream_id = None
+
+    def receive(self) -> dict:
+        """Wacht op de response van de laatste upload."""
+        if self.failed:
+            return _empty_result()
+        return receive_turn(self.session, self.conv_id)
+
+
 # ============================================================================
 # CONVERSATION
 # ============================================================================
@@ -493,8 +764,13 @@ def wait_for_wake_word(p: pyaudio.PyAudio, wake_model) -> bool:
         return False
 
 
-def record_speech(stream, vad: SileroVAD, pre_buffer: deque, chunk_size: int) -> tuple:
-    """Record speech using VAD."""
+def record_speech(stream, vad: SileroVAD, pre_buffer: deque, chunk_size: int,
+                  uplink: "StreamingUplink" = None) -> tuple:
+    """
+    Record speech using VAD.
+
+    Met een uplink gaan frames al tijdens het spreken naar de orchestrator.
+    """
     global _shutdown_requested
     vad.reset_state()
     chunks_per_second = MIC_SAMPLE_RATE / chunk_size
@@ -522,16 +798,29 @@ def record_speech(stream, vad: SileroVAD, pre_buffer: deque, chunk_size: int) ->
                 print("  🔴 Speech detected")
                 is_speaking = True
                 audio_buffer = list(pre_buffer)
+                if uplink:
+                    uplink.start()
+                    for pre_data in audio_buffer:
+                        uplink.send_frame(pre_data)
             audio_buffer.append(data)
+            if uplink:
+                uplink.send_frame(data)
             speech_chunks += 1
             silence_count = 0
         else:
             if is_speaking:
                 audio_buffer.append(data)
+                if uplink:
+                    uplink.send_frame(data)
                 silence_count += 1
                 if silence_count >= silence_chunks:
                     if speech_chunks >= min_speech_chunks:
+                        if uplink:
+                            uplink.end()
                         break
+                    # False start: upload weggooien
+                    if uplink:
+                        uplink.end(aborted=True)
                     is_speaking = False
                     speech_chunks = 0
                     audio_buffer = []
@@ -539,6 +828,8 @@ def record_speech(stream, vad: SileroVAD, pre_buffer: deque, chunk_size: int) ->
                 pre_buffer.append(data)
 
     if _shutdown_requested:
+        if uplink:
+            uplink.end(aborted=True)
         return np.array([], dtype=np.int16), 0.0
 
     all_audio = np.frombuffer(b''.join(audio_buffer), dtype=np.int16)
@@ -574,6 +865,18 @@ def main():
         else:
             print("⚠️ OLED niet beschikbaar")
 
+    # Camera continu starten: autofocus staat al goed als take_photo komt
+    global _camera_service
+    if CAMERA_AVAILABLE and CAMERA_CONTINUOUS:
+        _camera_service = CameraService(size=CAMERA_SIZE, fps=CAMERA_FPS)
+        if _camera_service.start():
+            print("✅ Camera draait (ring buffer)")
+
+    # Orchestrator sessie: verbindt op de achtergrond terwijl de modellen laden
+    conv_id = f"pi-{int(time.time())}"
+    session = OrchestratorSession(WEBSOCKET_URL, conv_id, binary_audio=BINARY_AUDIO)
+    session.start()
+
     # Load models
     print("Loading models...")
     wake_model = WakeWordModel()
@@ -595,6 +898,14 @@ def main():
 
     print(f"✅ Mic: {MIC_SAMPLE_RATE}Hz, Speaker: {SPEAKER_SAMPLE_RATE}Hz")
 
+    # Latency probe naar de desktop
+    if session.wait_connected(timeout=5):
+        rtt = session.probe_latency()
+        audio_mode = "binary" if session.binary_audio else "base64"
+        print(f"✅ Orchestrator: RTT {rtt.get('avg_ms', '?')}ms (p95 {rtt.get('p95_ms', '?')}ms), audio {audio_mode}")
+    else:
+        print("⚠️ Orchestrator nog niet bereikbaar (blijft op de achtergrond proberen)")
+
     # Startup sound + OLED animatie
     play_startup_sound(p)
     if _oled_display and _oled_display.available:
@@ -605,7 +916,6 @@ def main():
         return
 
     # Start conversation
-    conv_id = f"pi-{int(time.time())}"
     turn = 0
     chunk_size = int(MIC_SAMPLE_RATE * VAD_CHUNK_MS / 1000)
     pre_buffer = deque(maxlen=int(PRE_SPEECH_BUFFER * MIC_SAMPLE_RATE / chunk_size))
@@ -613,6 +923,17 @@ def main():
     stream = p.open(format=FORMAT, channels=CHANNELS, rate=MIC_SAMPLE_RATE,
                     input=True, input_device_index=MIC_DEVICE_INDEX, frames_per_buffer=chunk_size)
 
+    # Speaker stream blijft de hele conversatie open (pas na de wake word beep)
+    global _playback, _barge_in
+    _playback = PlaybackEngine(p, device_index=SPEAKER_DEVICE_INDEX, sample_rate=SPEAKER_SAMPLE_RATE,
+                               prebuffer_ms=PLAYBACK_PREBUFFER_MS)
+    if not _playback.start():
+        _playback = None
+    if BARGE_IN and _playback:
+        _barge_in = BargeInDetector(stream, vad, chunk_size, pre_buffer)
+
+    uplink = StreamingUplink(session, conv_id) if STREAMING_UPLOAD else None
+
     print("\n🎙️ Conversation started! (no wake word needed)")
 
     try:
@@ -623,7 +944,7 @@ def main():
             print("  🎧 Listening...")
 
             # Record
-            audio, duration = record_speech(stream, vad, pre_buffer, chunk_size)
+            audio, duration = record_speech(stream, vad, pre_buffer, chunk_size, uplink)
 
             # Check for shutdown or empty audio
             if _shutdown_requested or len(audio) == 0:
@@ -631,33 +952,55 @@ def main():
 
             print(f"  ✅ Recorded ({duration:.1f}s)")
 
-            # Process
-            audio = apply_gain(audio)
-            if MIC_SAMPLE_RATE != MODEL_SAMPLE_RATE:
-                audio = resample_audio(audio, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE)
+            if uplink:
+                # Audio is al tijdens het spreken verstuurd
+                result = uplink.receive()
+            else:
+                # Process
+                audio = apply_gain(audio)
+                if MIC_SAMPLE_RATE != MODEL_SAMPLE_RATE:
+                    audio = resample_audio(audio, MIC_SAMPLE_RATE, MODEL_SAMPLE_RATE)
 
-            print("  📡 Sending...")
-            result = asyncio.run(send_audio_and_receive(audio_to_wav_bytes(audio), conv_id))
+                print("  📡 Sending...")
+                result = send_audio_and_receive(session, audio_to_wav_bytes(audio), conv_id)
 
             # Show response
             if result["text"]:
                 emoji = EMOTION_EMOJIS.get(result["emotion"], "🤖")
                 print(f"  {emoji} {result['text'][:80]}...")
 
-            # Play audio
-            if result["chunks"]:
+            # Play audio (met de engine speelt de reply al sinds de eerste chunk)
+            if _playback:
+                if not result["interrupted"]:
+                    wait_playback(result)
+                if result["interrupted"]:
+                    # Gebruiker praat erdoorheen: direct weer luisteren (ook geen sleep)
+                    played = result["played_index"]
+                    print(f"  ✋ Onderbroken bij chunk {played + 1 if played is not None else 0}/{result['chunk_count']}")
+                    send_interrupt(session, played)
+                    continue
+                stats = _playback.stats()
+                print(f"  🔊 Played ({result['chunk_count']} chunks, underruns {stats['underruns']}, "
+                      f"buffer delay avg {stats['delay_avg_ms']}ms)")
+            elif result["chunks"]:
                 print(f"  🔊 Playing ({len(result['chunks'])} chunks)")
                 for chunk in result["chunks"]:
                     if chunk:
-                        play_audio_base64(chunk, p)
+                        play_audio_bytes(chunk, p)
 
             # Check for sleep command - restart script for clean state
             if result.get("should_sleep"):
                 print("\n😴 Going to sleep (restarting in 2s...)")
+                # Speaker vrijgeven voor de beeps (die openen een eigen stream)
+                if _playback:
+                    _playback.close()
                 play_beep(p, freq=660, duration=0.1)
                 time.sleep(0.05)
                 play_beep(p, freq=440, duration=0.15)
                 # Cleanup
+                session.stop()
+                if _camera_service:
+                    _camera_service.stop()
                 stream.stop_stream()
                 stream.close()
                 p.terminate()
@@ -681,6 +1024,24 @@ def main():
             except Exception:
                 pass
 
+        try:
+            session.stop()
+        except Exception:
+            pass
+
+        if _camera_service:
+            try:
+                _camera_service.stop()
+            except Exception:
+                pass
+
+        if _playback:
+            try:
+                print(f"🔊 Playback: {_playback.stats()}")
+                _playback.close()
+            except Exception:
+                pass
+
         # Cleanup audio - met try/except om te zorgen dat termios altijd hersteld wordt
         if stream:
             try:
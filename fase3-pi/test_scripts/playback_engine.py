@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Playback Engine voor NerdCarX
+Eén persistente output stream met een jitter buffer voor TTS audio chunks
+
+Per chunk een PyAudio stream openen kost bij elke zin een device-open gap,
+en verzamelen-dan-afspelen laat de eerste zin wachten op de hele reply.
+De engine houdt één callback stream open op de speaker sample rate; audio
+chunks gaan in een thread-safe buffer zodra ze binnenkomen en spelen direct
+achter elkaar. Resampling gebeurt één keer per chunk (NumPy) bij enqueue,
+niet in de audio callback.
+
+Jitter buffer: een turn begint pas als er prebuffer_ms audio klaarstaat (of
+de turn compleet is). Loopt de buffer midden in een turn leeg (de volgende
+zin is er nog niet), dan telt dat als underrun en wordt er opnieuw
+gebufferd in plaats van haperend af te spelen.
+
+Gebruik:
+    from playback_engine import PlaybackEngine
+
+    engine = PlaybackEngine(p, device_index=SPEAKER_DEVICE_INDEX, sample_rate=48000)
+    engine.start()
+    engine.begin_turn()
+    engine.enqueue(wav_bytes, index=0)      # per audio_chunk
+    engine.end_turn()                       # na is_last
+    engine.wait_idle()
+    print(engine.stats())
+    engine.close()
+"""
+
+import io
+import threading
+import time
+import wave
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pyaudio
+
+
+def resample(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Lineaire interpolatie naar target_rate (int16 in, int16 uit)."""
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+    new_length = int(round(len(samples) * target_rate / orig_rate))
+    positions = np.linspace(0, len(samples) - 1, new_length)
+    resampled = np.interp(positions, np.arange(len(samples)), samples.astype(np.float32))
+    return np.clip(resampled, -32768, 32767).astype(np.int16)
+
+
+def decode_wav(wav_bytes: bytes) -> tuple[np.ndarray, int]:
+    """WAV bytes → (mono int16 samples, sample rate)."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("Alleen 16-bit WAV wordt ondersteund")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+@dataclass
+class _Segment:
+    """Eén chunk in de buffer (al op de output sample rate)."""
+    samples: np.ndarray
+    index: Optional[int]      # audio_chunk index (None voor losse geluiden)
+    enqueued_at: float
+    offset: int = 0
+    started_at: Optional[float] = None
+
+
+class PlaybackEngine:
+    """Persistente output stream + jitter buffer; thread-safe enqueue vanuit de audio loop."""
+
+    def __init__(
+        self,
+        p: pyaudio.PyAudio,
+        device_index: Optional[int] = None,
+        sample_rate: int = 44100,
+        block_ms: int = 20,
+        prebuffer_ms: int = 120
+    ):
+        self.p = p
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.block_frames = int(sample_rate * block_ms / 1000)
+        self.prebuffer_samples = int(sample_rate * prebuffer_ms / 1000)
+
+        self._segments: deque[_Segment] = deque()
+        self._buffered = 0             # Samples in de buffer (nog niet afgespeeld)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._open_turn = False        # Tussen begin_turn() en end_turn(): er kan nog audio komen
+        self._buffering = True
+        self._underrun_at: Optional[float] = None
+        self._last_index: Optional[int] = None
+        self._stream = None
+
+        # Metrics
+        self.chunks = 0
+        self.underruns = 0
+        self.underrun_ms = 0.0
+        self.dropped_chunks = 0
+        self._delays_ms: deque[float] = deque(maxlen=200)   # enqueue → start afspelen
+
+    @property
+    def running(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def busy(self) -> bool:
+        """Audio in de buffer, of een turn die nog chunks kan krijgen."""
+        with self._lock:
+            return bool(self._segments) or self._open_turn
+
+    @property
+    def playing(self) -> bool:
+        """Er komt nu turn audio uit de speaker (niet aan het bufferen)."""
+        with self._lock:
+            return bool(self._segments) and not self._buffering
+
+    @property
+    def current_index(self) -> Optional[int]:
+        """Index van de chunk die nu speelt (of als laatste speelde)."""
+        with self._lock:
+            return self._current_index()
+
+    def start(self) -> bool:
+        """Open de output stream (False als de speaker niet beschikbaar is)."""
+        try:
+            self._stream = self.p.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.sample_rate,
+                output=True,
+                output_device_index=self.device_index,
+                frames_per_buffer=self.block_frames,
+                stream_callback=self._callback
+            )
+            self._stream.start_stream()
+        except Exception as e:
+            print(f"[Playback] Output stream niet beschikbaar: {e}")
+            self._stream = None
+            return False
+        return True
+
+    def close(self) -> None:
+        """Stop de stream en gooi resterende audio weg."""
+        self.clear()
+        if self._stream is None:
+            return
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        except Exception:
+            pass
+        self._stream = None
+
+    def begin_turn(self) -> None:
+        """Nieuwe reply: wacht met afspelen tot de jitter buffer gevuld is."""
+        with self._lock:
+            self._open_turn = True
+            self._buffering = True
+            self._underrun_at = None
+
+    def end_turn(self) -> None:
+        """Laatste chunk is binnen: de rest mag zonder prebuffer uitspelen."""
+        with self._lock:
+            self._open_turn = False
+
+    def enqueue(self, wav_bytes: bytes, index: Optional[int] = None) -> None:
+        """Voeg een WAV chunk toe (decode + resample hier, niet in de callback)."""
+        samples, rate = decode_wav(wav_bytes)
+        self.enqueue_pcm(resample(samples, rate, self.sample_rate), index)
+
+    def enqueue_pcm(self, samples: np.ndarray, index: Optional[int] = None) -> None:
+        """Voeg mono int16 samples op de output sample rate toe (bijv. een geluidje)."""
+        if len(samples) == 0:
+            return
+        with self._lock:
+            self._segments.append(_Segment(samples, index, time.monotonic()))
+            self._buffered += len(samples)
+            self.chunks += 1
+
+    def clear(self) -> Optional[int]:
+        """
+        Stop direct (barge-in): gooi de buffer weg en sluit de turn.
+
+        Returns:
+            Index van de chunk die speelde
+        """
+        with self._lock:
+            index = self._current_index()
+            self.dropped_chunks += len(self._segments)
+            self._segments.clear()
+            self._buffered = 0
+            self._open_turn = False
+            self._buffering = True
+            self._underrun_at = None
+            self._idle.notify_all()
+            return index
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blokkeer tot alles afgespeeld is (False bij timeout)."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._segments and not self._open_turn, timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            delays = sorted(self._delays_ms)
+            buffered_ms = self._buffered * 1000 / self.sample_rate
+        latency_ms = None
+        if self._stream is not None:
+            try:
+                latency_ms = round(self._stream.get_output_latency() * 1000, 1)
+            except Exception:
+                pass
+        return {
+            "running": self.running,
+            "chunks": self.chunks,
+            "underruns": self.underruns,
+            "underrun_ms": round(self.underrun_ms),
+            "dropped_chunks": self.dropped_chunks,
+            "buffered_ms": round(buffered_ms),
+            "delay_avg_ms": round(sum(delays) / len(delays)) if delays else None,
+            "delay_p95_ms": round(delays[min(len(delays) - 1, int(len(delays) * 0.95))]) if delays else None,
+            "output_latency_ms": latency_ms
+        }
+
+    # ------------------------------------------------------------------
+    # Audio callback (PortAudio thread)
+    # ------------------------------------------------------------------
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        out = np.zeros(frame_count, dtype=np.int16)
+        now = time.monotonic()
+
+        with self._lock:
+            if self._buffering and self._segments:
+                if self._buffered >= self.prebuffer_samples or not self._open_turn:
+                    self._buffering = False
+                    if self._underrun_at is not None:
+                        self.underrun_ms += (now - self._underrun_at) * 1000
+                        self._underrun_at = None
+
+            filled = 0
+            while not self._buffering and filled < frame_count and self._segments:
+                segment = self._segments[0]
+                if segment.started_at is None:
+                    segment.started_at = now
+                    self._delays_ms.append((now - segment.enqueued_at) * 1000)
+                count = min(frame_count - filled, len(segment.samples) - segment.offset)
+                out[filled:filled + count] = segment.samples[segment.offset:segment.offset + count]
+                segment.offset += count
+                filled += count
+                if segment.offset >= len(segment.samples):
+                    self._segments.popleft()
+                    if segment.index is not None:
+                        self._last_index = segment.index
+            self._buffered -= filled
+
+            if not self._segments:
+                if self._open_turn and not self._buffering:
+                    # Leeg terwijl er nog zinnen komen: opnieuw bufferen
+                    self.underruns += 1
+                    self._underrun_at = now
+                    self._buffering = True
+                elif not self._open_turn:
+                    self._idle.notify_all()
+
+        return out.tobytes(), pyaudio.paContinue
+
+    def _current_index(self) -> Optional[int]:
+        if self._segments and self._segments[0].started_at is not None and self._segments[0].index is not None:
+            return self._segments[0].index
+        return self._last_index
@@ -6,7 +6,10 @@ import numpy as np
 import torch
 from loguru import logger
 
-from fish_speech.inference_engine.reference_loader import ReferenceLoader
+from fish_speech.inference_engine.reference_loader import (
+    ReferenceLoader,
+    codec_fingerprint,
+)
 from fish_speech.inference_engine.utils import InferenceResult, wav_chunk_header
 from fish_speech.inference_engine.vq_manager import VQManager
 from fish_speech.models.dac.modded_dac import DAC
@@ -27,6 +30,7 @@ class TTSInferenceEngine(ReferenceLoader, VQManager):
         decoder_model: DAC,
         precision: torch.dtype,
         compile: bool,
+        decoder_checkpoint_path: str | None = None,
     ) -> None:
 
         super().__init__()
@@ -36,6 +40,9 @@ class TTSInferenceEngine(ReferenceLoader, VQManager):
         self.precision = precision
         self.compile = compile
 
+        # Key for the on-disk reference token cache (None disables it)
+        self.codec_fingerprint = codec_fingerprint(decoder_checkpoint_path)
+
     @torch.inference_mode()
     def inference(self, req: ServeTTSRequest) -> Generator[InferenceResult, None, None]:
         """
@@ -1,8 +1,12 @@
 import io
+import os
+import re
+from collections import OrderedDict
 from hashlib import sha256
 from pathlib import Path
 from typing import Callable, Literal, Tuple
 
+import numpy as np
 import torch
 import torchaudio
 from loguru import logger
@@ -17,14 +21,71 @@ from fish_speech.utils.file import (
 from fish_speech.utils.schema import ServeReferenceAudio
 
 
+class LRUCache(OrderedDict):
+    """
+    A dict that keeps at most `maxsize` entries, dropping the least recently used.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def codec_fingerprint(checkpoint_path: str | None) -> str | None:
+    """
+    Identify a codec checkpoint without hashing the whole file.
+
+    Prompt tokens are only valid for the codec that produced them, so the
+    on-disk token cache is keyed by this. Returns None if the checkpoint is
+    unknown, which disables the on-disk cache.
+    """
+    if checkpoint_path is None or not Path(checkpoint_path).exists():
+        return None
+
+    path = Path(checkpoint_path).resolve()
+    stat = path.stat()
+    key = f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return sha256(key.encode()).hexdigest()
+
+
 class ReferenceLoader:
+    # Bounds for the in-memory caches (encoded prompts are small, but not free)
+    max_cached_ids: int = 32
+    max_cached_hashes: int = 128
+
     def __init__(self) -> None:
         """
         Component of the TTSInferenceEngine class.
         Loads and manages the cache for the reference audio and text.
+
+        Encoded prompt tokens are cached in three tiers: in memory per
+        reference id / audio hash (bounded LRU), and on disk as a `.npy`
+        file next to each reference audio, keyed by the audio hash and the
+        codec checkpoint. The disk tier survives restarts, so a cold start
+        only has to load the tokens instead of running the VQ encoder.
         """
-        self.ref_by_id: dict = {}
-        self.ref_by_hash: dict = {}
+        self.ref_by_id: LRUCache = LRUCache(self.max_cached_ids)
+        self.ref_by_hash: LRUCache = LRUCache(self.max_cached_hashes)
+
+        # Set by the TTSInferenceEngine, None disables the on-disk token cache
+        self.codec_fingerprint: str | None = None
+
+        # Reference folder -> (mtimes of the folder and its subfolders, audio files)
+        self._listings: dict[Path, Tuple[dict, list[Path]]] = {}
+        # Audio file -> (size, mtime, sha256), so unchanged files are not re-read
+        self._audio_hashes: dict[Path, Tuple[int, int, str]] = {}
 
         # Make Pylance happy (attribut/method not defined...)
         self.decoder_model: DAC
@@ -45,30 +106,26 @@ class ReferenceLoader:
         # Load the references audio and text by id
         ref_folder = Path("references") / id
         ref_folder.mkdir(parents=True, exist_ok=True)
-        ref_audios = list_files(
-            ref_folder, AUDIO_EXTENSIONS, recursive=True, sort=False
-        )
-
-        if use_cache == "off" or id not in self.ref_by_id:
-            # If the references are not already loaded, encode them
-            prompt_tokens = [
-                self.encode_reference(
-                    # decoder_model=self.decoder_model,
-                    reference_audio=audio_to_bytes(str(ref_audio)),
-                    enable_reference_audio=True,
-                )
-                for ref_audio in ref_audios
-            ]
-            prompt_texts = [
-                read_ref_text(str(ref_audio.with_suffix(".lab")))
-                for ref_audio in ref_audios
-            ]
-            self.ref_by_id[id] = (prompt_tokens, prompt_texts)
+        ref_audios = self._list_reference_audios(ref_folder)
+        hashes = [self._audio_hash(ref_audio) for ref_audio in ref_audios]
 
-        else:
-            # Reuse already encoded references
+        cached = self.ref_by_id.get(id)
+        if use_cache == "on" and cached is not None and cached[0] == hashes:
+            # Reuse already encoded references (same audio files as last time)
             logger.info("Use same references")
-            prompt_tokens, prompt_texts = self.ref_by_id[id]
+            _, prompt_tokens, prompt_texts = cached
+            return prompt_tokens, prompt_texts
+
+        # Encode the references, or load their tokens from the on-disk cache
+        prompt_tokens = [
+            self._load_reference_tokens(ref_audio, audio_hash)
+            for ref_audio, audio_hash in zip(ref_audios, hashes)
+        ]
+        prompt_texts = [
+            read_ref_text(str(ref_audio.with_suffix(".lab")))
+            for ref_audio in ref_audios
+        ]
+        self.ref_by_id[id] = (hashes, prompt_tokens, prompt_texts)
 
         return prompt_tokens, prompt_texts
 
@@ -83,7 +140,8 @@ class ReferenceLoader:
         cache_used = False
         prompt_tokens, prompt_texts = [], []
         for i, ref in enumerate(references):
-            if use_cache == "off" or audio_hashes[i] not in self.ref_by_hash:
+            cached = self.ref_by_hash.get(audio_hashes[i])
+            if use_cache == "off" or cached is None:
                 # If the references are not already loaded, encode them
                 prompt_tokens.append(
                     self.encode_reference(
@@ -96,7 +154,7 @@ class ReferenceLoader:
 
             else:
                 # Reuse already encoded references
-                cached_token, cached_text = self.ref_by_hash[audio_hashes[i]]
+                cached_token, cached_text = cached
                 prompt_tokens.append(cached_token)
                 prompt_texts.append(cached_text)
                 cache_used = True
@@ -106,6 +164,98 @@ class ReferenceLoader:
 
         return prompt_tokens, prompt_texts
 
+    def _list_reference_audios(self, ref_folder: Path) -> list[Path]:
+        """
+        List the audio files of a reference folder, cached until a directory changes.
+
+        Adding or removing a file changes the mtime of the directory it is in,
+        so the listing is reused as long as the mtimes of the folder and all
+        its subfolders are unchanged.
+        """
+        cached = self._listings.get(ref_folder)
+        if cached is not None:
+            mtimes, ref_audios = cached
+            try:
+                if all(
+                    os.stat(folder).st_mtime_ns == mtime
+                    for folder, mtime in mtimes.items()
+                ):
+                    return ref_audios
+            except FileNotFoundError:
+                pass
+
+        ref_audios = list_files(
+            ref_folder, AUDIO_EXTENSIONS, recursive=True, sort=False
+        )
+        folders = [ref_folder] + [p for p in ref_folder.rglob("*") if p.is_dir()]
+        mtimes = {folder: os.stat(folder).st_mtime_ns for folder in folders}
+        self._listings[ref_folder] = (mtimes, ref_audios)
+        return ref_audios
+
+    def _audio_hash(self, audio_path: Path) -> str:
+        """
+        sha256 of an audio file, only re-read when its size or mtime changed.
+        """
+        stat = audio_path.stat()
+        cached = self._audio_hashes.get(audio_path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        audio_hash = sha256(audio_path.read_bytes()).hexdigest()
+        self._audio_hashes[audio_path] = (stat.st_size, stat.st_mtime_ns, audio_hash)
+        return audio_hash
+
+    def _token_cache_path(self, audio_path: Path, audio_hash: str) -> Path | None:
+        if self.codec_fingerprint is None:
+            return None
+        # Full file name (with suffix): sample.wav and sample.mp3 get separate caches
+        key = f"{audio_hash[:16]}-{self.codec_fingerprint[:16]}"
+        return audio_path.parent / f"{audio_path.name}.{key}.npy"
+
+    def _load_reference_tokens(self, audio_path: Path, audio_hash: str):
+        """
+        Prompt tokens of a reference audio, from the on-disk cache if possible.
+        """
+        cache_path = self._token_cache_path(audio_path, audio_hash)
+        if cache_path is not None and cache_path.exists():
+            try:
+                tokens = torch.from_numpy(np.load(cache_path))
+                logger.info(f"Loaded cached prompt tokens from {cache_path}")
+                return tokens.to(self.decoder_model.device)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring broken token cache {cache_path}: {e}")
+
+        tokens = self.encode_reference(
+            reference_audio=audio_to_bytes(str(audio_path)),
+            enable_reference_audio=True,
+        )
+
+        if cache_path is not None and tokens is not None:
+            self._save_reference_tokens(cache_path, audio_path, tokens)
+
+        return tokens
+
+    def _save_reference_tokens(
+        self, cache_path: Path, audio_path: Path, tokens: torch.Tensor
+    ) -> None:
+        try:
+            # Write to a temporary file first, a crash must not leave a partial .npy
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, tokens.cpu().numpy())
+            os.replace(tmp_path, cache_path)
+
+            # Tokens of an older version of this audio (or another codec) are stale
+            pattern = re.compile(
+                rf"^{re.escape(audio_path.name)}\.[0-9a-f]{{16}}-[0-9a-f]{{16}}\.npy$"
+            )
+            for stale in audio_path.parent.iterdir():
+                if stale != cache_path and pattern.match(stale.name):
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            # E.g. a read-only references mount: still works, just without disk cache
+            logger.warning(f"Could not write token cache {cache_path}: {e}")
+
     def load_audio(self, reference_audio: bytes | str, sr: int):
         """
         Load the audio data from a file or bytes.
@@ -179,8 +329,6 @@ class ReferenceLoader:
             OSError: If file operations fail
         """
         # Validate ID format
-        import re
-
         if not re.match(r"^[a-zA-Z0-9\-_ ]+$", id):
             raise ValueError(
                 "Reference ID contains invalid characters. Only alphanumeric, hyphens, underscores, and spaces are allowed."
@@ -225,8 +373,8 @@ class ReferenceLoader:
                 f.write(reference_text)
 
             # Clear cache for this ID if it exists
-            if id in self.ref_by_id:
-                del self.ref_by_id[id]
+            self.ref_by_id.pop(id, None)
+            self._listings.pop(ref_dir, None)
 
             logger.info(f"Successfully added reference voice with ID: {id}")
 
@@ -261,8 +409,8 @@ class ReferenceLoader:
             shutil.rmtree(ref_dir)
 
             # Clear cache for this ID if it exists
-            if id in self.ref_by_id:
-                del self.ref_by_id[id]
+            self.ref_by_id.pop(id, None)
+            self._listings.pop(ref_dir, None)
 
             logger.info(f"Successfully deleted reference voice with ID: {id}")
 
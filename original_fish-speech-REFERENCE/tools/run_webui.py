@@ -79,6 +79,7 @@ if __name__ == "__main__":
         decoder_model=decoder_model,
         compile=args.compile,
         precision=args.precision,
+        decoder_checkpoint_path=args.decoder_checkpoint_path,
     )
 
     # Dry run to check if the model is loaded correctly and avoid the first-time latency
@@ -47,6 +47,7 @@ class ModelManager:
             decoder_model=self.decoder_model,
             precision=self.precision,
             compile=self.compile,
+            decoder_checkpoint_path=decoder_checkpoint_path,
         )
 
         # Warm up the models